@@ -0,0 +1,7 @@
+import sys
+
+from .core.config import ML_DIR
+
+# The sign_to_text scripts import each other as top-level modules (keypoints, micro_batcher, ...)
+if ML_DIR not in sys.path:
+    sys.path.insert(0, ML_DIR)
@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse
+
+from metrics import log
+
+router = APIRouter()
+
+
+async def _receive(websocket, session, frames):
+    """Read frames as fast as the client sends them; when the session falls behind, drop the oldest."""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+        data = message.get("bytes")
+        if data is None:
+            data = message.get("text")
+        if frames.full():
+            frames.get_nowait()
+            session.dropped += 1
+            session.metrics.inc("dropped_frames_total")
+        frames.put_nowait((session.received, data, time.perf_counter()))
+        session.received += 1
+
+
+async def _process(websocket, session, frames):
+    while True:
+        frame, data, received_at = await frames.get()
+        try:
+            replies = await session.process(frame, data, received_at)
+        except (ValueError, KeyError, TypeError) as exc:
+            session.metrics.inc("bad_frames_total")
+            replies = [{"type": "error", "frame": frame, "error": f"bad frame: {exc}"}]
+        for reply in replies:
+            await websocket.send_json(reply)
+
+
+@router.websocket("/ws/recognize")
+async def recognize(websocket: WebSocket):
+    """One recognition session per connection.
+
+    Client -> server, one message per video frame:
+      binary JPEG bytes, or 126 little-endian float32 keypoints (left hand
+      [0:63], right hand [63:126], zeros for a missing hand, as in
+      keypoints.extract_keypoints), or text {"keypoints": [126 numbers]}.
+      Text {"type": "reset"} clears the window. Every message is numbered
+      from 0 in arrival order.
+    Server -> client, JSON:
+      {"type": "ready", "labels", "sequence_length", "stride"} once, then
+      {"type": "prediction", "frame", "label", "confidence", "latency_ms", "dropped"}
+      whenever the classifier ran, and {"type": "sign" | "word", "value",
+      "confidence", "text"} when something was recognized.
+    """
+    service = websocket.app.state.recognition
+    await websocket.accept()
+    session = service.open_session()
+    frames = asyncio.Queue(service.settings.queue_frames)
+    worker = asyncio.create_task(_process(websocket, session, frames))
+    receiver = None
+    try:
+        await websocket.send_json(session.hello())
+        receiver = asyncio.create_task(_receive(websocket, session, frames))
+        done, _ = await asyncio.wait({receiver, worker}, return_when=asyncio.FIRST_COMPLETED)
+        if worker in done:
+            # The worker only stops by raising: close rather than keep reading frames nobody processes
+            log.warning("Session ended with an error: %r", worker.exception())
+            try:
+                await websocket.close(code=1011)
+            except RuntimeError:  # the client is already gone
+                pass
+        else:
+            receiver.result()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in (receiver, worker):
+            if task is not None:
+                task.cancel()
+        service.close_session(session)
+
+
+@router.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+
+@router.get("/stats")
+async def stats(request: Request):
+    return request.app.state.recognition.stats()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics(request: Request):
+    return request.app.state.recognition.metrics.prometheus_text()
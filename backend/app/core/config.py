@@ -0,0 +1,42 @@
+import os
+
+ENV_PREFIX = "SIGNBRIDGE_"
+# The sign_to_text scripts the backend serves; override with SIGNBRIDGE_ML_DIR
+ML_DIR = os.environ.get(
+    ENV_PREFIX + "ML_DIR",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "ml-models", "sign_to_text")),
+)
+
+
+def _env(name, default, cast=str):
+    value = os.environ.get(ENV_PREFIX + name)
+    return default if value is None else cast(value)
+
+
+def _flag(value):
+    return value.lower() not in ("0", "false", "no")
+
+
+class Settings:
+    """Backend settings; each one can be overridden by a SIGNBRIDGE_<NAME> environment variable."""
+
+    def __init__(self):
+        self.model_path = _env("MODEL_PATH", os.path.join(ML_DIR, "lstm_sign_model.h5"))
+        self.actions_path = _env("ACTIONS_PATH", os.path.join(ML_DIR, "actions.json"))
+        self.prefer_tflite = _env("PREFER_TFLITE", True, _flag)
+        self.num_threads = _env("NUM_THREADS", None, int)  # TFLite interpreter threads
+
+        # Shared model worker: one batch per max_batch_size windows or max_latency_ms, whichever comes first
+        self.max_batch_size = _env("MAX_BATCH_SIZE", 64, int)
+        self.max_latency_ms = _env("MAX_LATENCY_MS", 5.0, float)
+
+        # Per-session recognition, as in predict_sign.py
+        self.stride = _env("STRIDE", 3, int)  # frames between classifier runs
+        self.threshold = _env("THRESHOLD", 0.8, float)
+        self.queue_frames = _env("QUEUE_FRAMES", 8, int)  # waiting frames per session before the oldest is dropped
+
+        # JPEG sessions: MediaPipe runs on a thread pool shared by every session
+        self.jpeg_workers = _env("JPEG_WORKERS", os.cpu_count() or 1, int)
+        self.mirror_jpeg = _env("MIRROR_JPEG", True, _flag)
+
+        self.cors_origins = _env("CORS_ORIGINS", "http://localhost:8080").split(",")
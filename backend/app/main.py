@@ -0,0 +1,69 @@
+"""FastAPI entrypoint: WebSocket sign recognition for the React frontend.
+
+Run one process (`python -m app.main` from backend/, or `uvicorn app.main:app`);
+every session in it shares one batched model worker, so more uvicorn workers
+would each load their own model and batch less.
+"""
+import argparse
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+from .api import stream
+from .core.config import Settings
+from .services.sessions import RecognitionService
+from .utils.limits import raise_open_file_limit
+
+
+def create_app(settings=None):
+    settings = settings or Settings()
+
+    @asynccontextmanager
+    async def lifespan(app):
+        # The model loads (and warms up) before the first connection is accepted
+        app.state.recognition = RecognitionService(settings)
+        yield
+        app.state.recognition.close()
+
+    app = FastAPI(title="SignBridge", lifespan=lifespan)
+    app.add_middleware(CORSMiddleware, allow_origins=settings.cors_origins, allow_methods=["GET"])
+    app.include_router(stream.router)
+    return app
+
+
+app = create_app()
+
+
+def main():
+    settings = Settings()
+    parser = argparse.ArgumentParser(description="WebSocket sign recognition backend (one shared batched model).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model", default=settings.model_path, help=".h5/.keras or .tflite model")
+    parser.add_argument("--actions", default=settings.actions_path)
+    parser.add_argument("--max-batch-size", type=int, default=settings.max_batch_size)
+    parser.add_argument("--max-latency-ms", type=float, default=settings.max_latency_ms,
+                        help="longest a window waits for its batch to fill before it is dispatched")
+    parser.add_argument("--jpeg-workers", type=int, default=settings.jpeg_workers,
+                        help="threads running MediaPipe for JPEG sessions")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    args = parser.parse_args()
+
+    settings.model_path = args.model
+    settings.actions_path = args.actions
+    settings.max_batch_size = args.max_batch_size
+    settings.max_latency_ms = args.max_latency_ms
+    settings.jpeg_workers = args.jpeg_workers
+    logging.basicConfig(level=getattr(logging, args.log_level), format="[%(levelname)s] %(message)s")
+    raise_open_file_limit()  # one descriptor per session
+
+    import uvicorn
+    # Per-message compression costs more CPU than it saves on small keypoint frames
+    uvicorn.run(create_app(settings), host=args.host, port=args.port, ws_per_message_deflate=False,
+                log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import os
+import asyncio
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from ..core.config import ML_DIR
+from keypoints import extract_keypoints
+from micro_batcher import MicroBatcher
+from model_runtime import load_actions
+from warm_start import PREPARED_DIR, load_windowed
+
+
+class SharedSignModel:
+    """One sign classifier for every session, behind a single MicroBatcher worker thread.
+
+    Sessions await predict(); windows from concurrent sessions are stacked into
+    one predict_batch() call, so the model runs a few large batches instead of
+    one small call per client.
+    """
+
+    def __init__(self, settings):
+        # A cached TFLite conversion when the model allows it (see warm_start.py), else Keras
+        classifier = load_windowed(settings.model_path, cache_dir=os.path.join(ML_DIR, PREPARED_DIR),
+                                   prefer_tflite=settings.prefer_tflite, num_threads=settings.num_threads)
+        self.batcher = MicroBatcher(classifier.predict_batch, settings.max_batch_size, settings.max_latency_ms)
+        self.window_shape = tuple(classifier.input_shape)
+        # Warm up so the first client does not pay for graph tracing
+        self.batcher.predict(np.zeros(self.window_shape, dtype=np.float32))
+        # Prefer the labels embedded in an exported .tflite over actions.json
+        metadata = getattr(classifier, "metadata", None)
+        self.actions = metadata["labels"] if metadata else load_actions(settings.actions_path)
+        self.name = os.path.basename(settings.model_path)
+
+    @property
+    def sequence_length(self):
+        return self.window_shape[0]
+
+    async def predict(self, window):
+        """Class probabilities for one (sequence_length, 126) window, from the next shared batch."""
+        return await asyncio.wrap_future(self.batcher.submit(window))
+
+    def close(self):
+        self.batcher.close()
+
+
+class JpegLandmarks:
+    """Decodes JPEG frames and runs MediaPipe Hands on a thread pool shared by all sessions.
+
+    Frames from many clients interleave on the workers, so each worker keeps
+    its own Hands graph in static-image mode rather than one tracking graph
+    per session. cv2 and MediaPipe are only imported once a JPEG arrives.
+    """
+
+    def __init__(self, workers, mirror=True):
+        self.mirror = mirror
+        self.available = all(importlib.util.find_spec(name) for name in ("cv2", "mediapipe"))
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="jpeg-landmarks")
+        self.local = threading.local()
+
+    def _hands(self):
+        hands = getattr(self.local, "hands", None)
+        if hands is None:
+            from mediapipe.python.solutions.hands import Hands
+            hands = self.local.hands = Hands(static_image_mode=True, max_num_hands=2, min_detection_confidence=0.5)
+        return hands
+
+    def _extract(self, data):
+        import cv2
+        frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            raise ValueError("frame is not a decodable JPEG")
+        if self.mirror:
+            frame = cv2.flip(frame, 1)  # the training data was recorded from a mirrored webcam
+        return extract_keypoints(self._hands().process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+
+    async def keypoints(self, data):
+        """126-value keypoint row for one JPEG frame."""
+        if not self.available:
+            raise ValueError("JPEG frames need opencv-python and mediapipe on the server; send keypoints instead")
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self._extract, data)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
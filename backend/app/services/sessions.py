@@ -0,0 +1,114 @@
+import json
+import time
+
+import numpy as np
+
+from ..ml.sign_model import JpegLandmarks, SharedSignModel
+from continuous_recognizer import ContinuousRecognizer
+from keypoints import NUM_FEATURES
+from metrics import Metrics, log
+
+JPEG_MAGIC = b"\xff\xd8"
+KEYPOINT_BYTES = NUM_FEATURES * 4  # one little-endian float32 keypoint row
+
+
+class RecognitionService:
+    """Everything the sessions share: the batched model, the JPEG workers and the metrics."""
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.metrics = Metrics()
+        started = time.perf_counter()
+        self.model = SharedSignModel(settings)
+        self.landmarks = JpegLandmarks(settings.jpeg_workers, mirror=settings.mirror_jpeg)
+        self.sessions = set()
+        self.metrics.set_gauge("sessions", lambda: len(self.sessions))
+        self.metrics.set_gauge("mean_batch_size", lambda: self.model.batcher.stats.snapshot()["mean_batch_size"])
+        log.info("Loaded %s (%d signs) in %.1f s", self.model.name, len(self.model.actions),
+                 time.perf_counter() - started)
+
+    def open_session(self):
+        session = RecognitionSession(self)
+        self.sessions.add(session)
+        return session
+
+    def close_session(self, session):
+        self.sessions.discard(session)
+
+    def stats(self):
+        return {"sessions": len(self.sessions), "model": self.model.name,
+                "batcher": self.model.batcher.stats.snapshot()}
+
+    def close(self):
+        self.landmarks.close()
+        self.model.close()
+
+
+class RecognitionSession:
+    """One client stream: its keypoint window and continuous decoder.
+
+    Frames are processed strictly in order; only frames due a prediction
+    wait, for the shared batch, so a session costs almost nothing between
+    classifier runs.
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self.metrics = service.metrics
+        self.recognizer = ContinuousRecognizer(service.model.actions, sequence_length=service.model.sequence_length,
+                                               stride=service.settings.stride,
+                                               threshold=service.settings.threshold)
+        self.received = 0  # frame numbers are assigned on arrival, so clients can match replies to sends
+        self.dropped = 0
+
+    def hello(self):
+        return {"type": "ready", "labels": self.service.model.actions,
+                "sequence_length": self.service.model.sequence_length, "stride": self.recognizer.stride}
+
+    async def keypoints(self, data):
+        """Keypoint row for one client message: JPEG bytes, raw float32 bytes or JSON {"keypoints": [...]}.
+
+        Returns None for control messages ({"type": "reset"}); raises ValueError for anything else.
+        """
+        if isinstance(data, bytes):
+            if data.startswith(JPEG_MAGIC):
+                self.metrics.inc("frames_total", kind="jpeg")
+                return await self.service.landmarks.keypoints(data)
+            if len(data) != KEYPOINT_BYTES:
+                raise ValueError(f"binary frames must be a JPEG or {KEYPOINT_BYTES} bytes of float32 keypoints")
+            self.metrics.inc("frames_total", kind="binary")
+            return np.frombuffer(data, dtype="<f4")
+        message = json.loads(data)
+        if not isinstance(message, dict):
+            raise ValueError("text frames must be a JSON object")
+        if message.get("type") == "reset":
+            self.recognizer.reset()
+            return None
+        row = np.asarray(message["keypoints"], dtype=np.float32)
+        if row.shape != (NUM_FEATURES,):
+            raise ValueError(f"keypoints must have {NUM_FEATURES} values, got {row.size}")
+        self.metrics.inc("frames_total", kind="json")
+        return row
+
+    async def process(self, frame, data, received_at):
+        """Feed one frame; returns the messages to send back (often none)."""
+        row = await self.keypoints(data)
+        if row is None:
+            return []
+        recognizer = self.recognizer
+        recognizer.observe_keypoints(row)
+        events, replies = [], []
+        if recognizer.segment(events):
+            # The window is a view into the ring buffer; it stays untouched while this session awaits
+            probs = await self.service.model.predict(recognizer.window.window())
+            recognizer.decode(probs, events)
+            label, confidence = recognizer.current
+            latency = time.perf_counter() - received_at
+            self.metrics.observe("prediction_latency_seconds", latency)
+            replies.append({"type": "prediction", "frame": frame, "label": label, "confidence": confidence,
+                            "latency_ms": latency * 1000, "dropped": self.dropped})
+        for event in events:
+            self.metrics.inc("recognized_total", kind=event.kind)
+            replies.append({"type": event.kind, "value": event.value, "confidence": event.confidence,
+                            "text": recognizer.text})
+        return replies
@@ -0,0 +1,14 @@
+def raise_open_file_limit():
+    """Lift the soft open-file limit to the hard limit (Linux/macOS); every WebSocket is one descriptor.
+
+    Returns the new soft limit, or None where the resource module is unavailable.
+    """
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard != resource.RLIM_INFINITY and soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        return hard
+    return soft
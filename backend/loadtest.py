@@ -0,0 +1,166 @@
+"""Simulate many WebSocket recognition sessions against the backend from one machine.
+
+Each session streams keypoint frames at --fps (real sequences from
+processed_sequences/ when available, separated by short hand-less gaps so
+signs open and close), and measures, for every prediction the server
+returns, the time from sending that frame to receiving the prediction.
+Sessions are spread over --processes client processes so the client's own
+event loop does not become the bottleneck.
+
+    python -m app.main &
+    python loadtest.py --sessions 300 --fps 30 --seconds 30 --processes 4
+"""
+import os
+import glob
+import json
+import time
+import asyncio
+import argparse
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import websockets
+
+from app.core.config import ML_DIR
+from app.utils.limits import raise_open_file_limit
+
+NUM_FEATURES = 126
+GAP_FRAMES = 15  # hand-less frames between replayed sequences, enough to end a segment
+
+
+def load_frames(data_path, limit=200, seed=0):
+    """A long keypoint stream to replay: recorded sequences if any, else synthetic moving hands."""
+    paths = sorted(glob.glob(os.path.join(data_path, "*", "*.npy")))
+    rng = np.random.default_rng(seed)
+    if paths:
+        chosen = rng.choice(len(paths), size=min(limit, len(paths)), replace=False)
+        pieces = []
+        for i in chosen:
+            sequence = np.load(paths[i]).astype(np.float32)
+            if sequence.ndim == 2 and sequence.shape[1] == NUM_FEATURES:
+                pieces += [sequence, np.zeros((GAP_FRAMES, NUM_FEATURES), dtype=np.float32)]
+        if pieces:
+            return np.concatenate(pieces), f"{len(pieces) // 2} sequences from {data_path}"
+    steps = rng.normal(0, 0.01, size=(2000, NUM_FEATURES)).astype(np.float32)
+    return np.clip(0.5 + np.cumsum(steps, axis=0), 0.0, 1.0), "synthetic random-walk hands"
+
+
+async def run_session(index, url, frames, fps, seconds, binary, start_delay, offset, result):
+    await asyncio.sleep(start_delay)
+    total = int(fps * seconds)
+    sent_at = np.zeros(total)
+    try:
+        async with websockets.connect(url, compression=None, max_size=None, open_timeout=30) as ws:
+            json.loads(await ws.recv())  # "ready"
+            result["connected"] += 1
+
+            async def read():
+                async for message in ws:
+                    reply = json.loads(message)
+                    if reply["type"] == "prediction":
+                        result["latencies"].append(time.perf_counter() - sent_at[reply["frame"]])
+                        result["server_ms"].append(reply["latency_ms"])
+                        result["dropped"][index] = reply["dropped"]  # running total per session
+                    elif reply["type"] in ("sign", "word"):
+                        result["recognized"] += 1
+                    elif reply["type"] == "error":
+                        result["errors"] += 1
+
+            reader = asyncio.create_task(read())
+            next_send = time.perf_counter()
+            for i in range(total):
+                row = frames[(offset + i) % len(frames)]
+                sent_at[i] = time.perf_counter()
+                await ws.send(row.tobytes() if binary else json.dumps({"keypoints": row.tolist()}))
+                result["sent"] += 1
+                next_send += 1.0 / fps
+                await asyncio.sleep(max(0.0, next_send - time.perf_counter()))
+            await asyncio.sleep(0.5)  # let the last predictions arrive
+            reader.cancel()
+    except Exception as exc:  # refused, timed out or closed mid-run: all count against the server
+        result["failed"] += 1
+        result["failures"].append(f"{type(exc).__name__}: {exc}")
+
+
+async def run_client(args, sessions, first, frames):
+    result = {"connected": 0, "failed": 0, "sent": 0, "recognized": 0, "errors": 0,
+              "latencies": [], "server_ms": [], "dropped": {}, "failures": []}
+    rng = np.random.default_rng(first)
+    await asyncio.gather(*(
+        run_session(first + i, args.url, frames, args.fps, args.seconds, not args.json,
+                    (first + i) * args.ramp_ms / 1000.0, int(rng.integers(len(frames))), result)
+        for i in range(sessions)
+    ))
+    return result
+
+
+def client_process(args, sessions, first):
+    """One client process: its share of the sessions on its own event loop."""
+    raise_open_file_limit()
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    frames, _ = load_frames(args.data_path)
+    return asyncio.run(run_client(args, sessions, first, frames))
+
+
+def fetch_stats(url):
+    http_url = url.replace("ws://", "http://").replace("wss://", "https://").split("/ws/")[0] + "/stats"
+    try:
+        with urllib.request.urlopen(http_url, timeout=5) as response:
+            return json.loads(response.read())
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the WebSocket recognition backend with many sessions.")
+    parser.add_argument("--url", default="ws://127.0.0.1:8000/ws/recognize")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--fps", type=float, default=30.0, help="frames per second per session")
+    parser.add_argument("--seconds", type=float, default=20.0, help="streaming time per session")
+    parser.add_argument("--processes", type=int, default=max(1, min(4, (os.cpu_count() or 2) // 2)),
+                        help="client processes to spread the sessions over")
+    parser.add_argument("--ramp-ms", type=float, default=10.0, help="delay between session starts")
+    parser.add_argument("--json", action="store_true", help="send JSON keypoints instead of raw float32 bytes")
+    parser.add_argument("--data-path", default=os.path.join(ML_DIR, "processed_sequences"))
+    args = parser.parse_args()
+
+    _, description = load_frames(args.data_path)
+    print(f"[INFO] {args.sessions} sessions x {args.fps:g} fps for {args.seconds:g}s over {args.processes} "
+          f"processes, replaying {description}")
+    shares = [args.sessions // args.processes + (i < args.sessions % args.processes) for i in range(args.processes)]
+    firsts = np.cumsum([0] + shares[:-1])
+    started = time.perf_counter()
+    with ProcessPoolExecutor(args.processes) as pool:
+        results = list(pool.map(client_process, [args] * args.processes, shares, firsts.tolist()))
+    elapsed = time.perf_counter() - started
+
+    latencies = np.array([x for r in results for x in r["latencies"]]) * 1000
+    server_ms = np.array([x for r in results for x in r["server_ms"]])
+    sent = sum(r["sent"] for r in results)
+    print(f"  sessions     {sum(r['connected'] for r in results)} connected, {sum(r['failed'] for r in results)} failed")
+    print(f"  frames       {sent} sent ({sent / elapsed:.0f}/s), "
+          f"{sum(sum(r['dropped'].values()) for r in results)} dropped by the server, "
+          f"{sum(r['errors'] for r in results)} rejected")
+    print(f"  predictions  {len(latencies)} ({len(latencies) / elapsed:.0f}/s), "
+          f"{sum(r['recognized'] for r in results)} signs/words recognized")
+    if len(latencies):
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(f"  round trip   p50 {p50:.1f} ms  p95 {p95:.1f} ms  p99 {p99:.1f} ms  max {latencies.max():.1f} ms "
+              f"(server side p50 {np.percentile(server_ms, 50):.1f} ms)")
+    failures = [f for r in results for f in r["failures"]]
+    if failures:
+        print(f"  first failure: {failures[0]}")
+    stats = fetch_stats(args.url)
+    if stats:
+        batcher = stats["batcher"]
+        print(f"  server       {batcher['requests']} windows in {batcher['batches']} batches "
+              f"(mean batch {batcher['mean_batch_size']:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,36 @@
+import os
+import sys
+import time
+import argparse
+
 import cv2
 import mediapipe as mp
 import numpy as np
 import tensorflow as tf
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "sign_to_text"))
+from keypoints import KeypointRingBuffer  # noqa: E402
+from model_runtime import read_tflite_metadata  # noqa: E402
+from pipeline import Pipeline  # noqa: E402
+from frame_sources import add_source_arguments, source_from_args, sink_from_args  # noqa: E402
+
+REPORT_INTERVAL = 5  # seconds between pipeline FPS / queue reports
+
+parser = argparse.ArgumentParser(description="Live sign detection with model.tflite.")
+add_source_arguments(parser)
+args = parser.parse_args()
+
 SEQUENCE_LENGTH = 10
-sequence = []
 predictions = []
 labels = ['hello', 'thankyou', 'sorry']  # update with your labels
 
+# Models exported by convert_model.py carry their own labels and window length
+metadata = read_tflite_metadata('model.tflite')
+if metadata:
+    labels = metadata["labels"]
+    SEQUENCE_LENGTH = metadata["sequence_length"]
+sequence = KeypointRingBuffer(SEQUENCE_LENGTH)
+
 interpreter = tf.lite.Interpreter(model_path='model.tflite')
 interpreter.allocate_tensors()
 input_details = interpreter.get_input_details()
@@ -16,32 +39,19 @@ output_details = interpreter.get_output_details()
 mp_hands = mp.solutions.hands
 hands = mp_hands.Hands(static_image_mode=False, max_num_hands=2, min_detection_confidence=0.7)
 
-cap = cv2.VideoCapture(0)
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        continue
 
+def landmarks(frame):
     frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
     result = hands.process(frame_rgb)
+    return result, None
 
-    keypoints = np.zeros(126)
 
-    if result.multi_hand_landmarks:
-        for hand_idx, hand_landmarks in enumerate(result.multi_hand_landmarks):
-            for i, lm in enumerate(hand_landmarks.landmark):
-                if hand_idx == 0:
-                    keypoints[i*3:i*3+3] = [lm.x, lm.y, lm.z]
-                elif hand_idx == 1:
-                    offset = 63
-                    keypoints[offset + i*3:offset + i*3+3] = [lm.x, lm.y, lm.z]
+def classify(packet):
+    # Handedness-slotted keypoints, written straight into the window
+    packet.keypoints = sequence.push(packet.results)
 
-    sequence.append(keypoints)
-    if len(sequence) > SEQUENCE_LENGTH:
-        sequence.pop(0)
-
-    if len(sequence) == SEQUENCE_LENGTH:
-        input_data = np.expand_dims(sequence, axis=0).astype(np.float32)
+    if sequence.full:
+        input_data = sequence.window()[np.newaxis]
         interpreter.set_tensor(input_details[0]['index'], input_data)
         interpreter.invoke()
         output = interpreter.get_tensor(output_details[0]['index'])
@@ -49,11 +59,32 @@ while True:
         prob = np.max(output)
 
         if prob > 0.8:
-            cv2.putText(frame, f'{labels[pred]} ({prob:.2f})', (20, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,0), 2)
+            return labels[pred], prob
+    return None
+
+
+source = source_from_args(args)
+sink = sink_from_args(args, "Sign Detection")
+pipeline = Pipeline(source, landmarks, classify, flip=False).start()
+last_report = time.time()
+
+try:
+    for packet in pipeline:
+        frame = packet.frame
+        if packet.prediction is not None:
+            label, prob = packet.prediction
+            cv2.putText(frame, f'{label} ({prob:.2f})', (20, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,0), 2)
+            if args.headless:
+                print(f"[{packet.index}] {label} ({prob:.2f})")
 
-    cv2.imshow("Sign Detection", frame)
-    if cv2.waitKey(10) & 0xFF == 27:
-        break
+        if time.time() - last_report >= REPORT_INTERVAL:
+            print("[PIPELINE]", pipeline.format_report())
+            last_report = time.time()
 
-cap.release()
-cv2.destroyAllWindows() 
\ No newline at end of file
+        if sink.show(frame, 10) == 27:
+            break
+finally:
+    pipeline.stop()
+    print("[PIPELINE]", pipeline.format_report())
+    source.release()
+    sink.close()
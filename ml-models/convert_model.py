@@ -1,10 +1,155 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+
+import numpy as np
 import tensorflow as tf
 
-model = tf.keras.models.load_model('lstm_sign_model.h5')
-converter = tf.lite.TFLiteConverter.from_keras_model(model)
-tflite_model = converter.convert()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "sign_to_text"))
+from dataset_shard import scan_sequences  # noqa: E402
+from model_runtime import TFLiteClassifier, write_tflite_model  # noqa: E402
+from split_dataset import add_split_argument, train_val_indices  # noqa: E402
+
+VARIANTS = ["float32", "float16", "dynamic", "int8"]
+
+
+def load_validation_data(data_path, actions, input_shape, split_path=None):
+    """Training windows (for int8 calibration) and the held-out windows with their labels.
+
+    Pass the split manifest train_model.py was trained with, or the calibration
+    and accuracy numbers include training windows. Without one this is the
+    seeded 80/20 split, which only matches training when both saw the same files.
+    """
+    X, y, rel_paths = [], [], []
+    label_ids = {label: i for i, label in enumerate(actions)}
+    for label, path in scan_sequences(data_path):
+        sequence = np.load(path)
+        if sequence.shape == input_shape and label in label_ids:
+            X.append(sequence)
+            y.append(label_ids[label])
+            rel_paths.append(os.path.relpath(path, data_path))
+    X, y = np.asarray(X, dtype=np.float32), np.asarray(y)
+    if len(X) == 0:
+        raise ValueError(f"No {input_shape} sequences found in '{data_path}'")
+    train_idx, val_idx = train_val_indices(rel_paths, split_path)
+    if len(val_idx) == 0:
+        raise ValueError(f"No validation sequences of '{data_path}' in the split")
+    return X[train_idx], X[val_idx], y[val_idx]
+
+
+def convert(model, variant, representative):
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if variant == "float16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif variant == "dynamic":
+        # int8 weights, float activations
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    elif variant == "int8":
+        # int8 weights and activations calibrated on real sequences; ops without an
+        # int8 kernel fall back to float, and the model keeps float32 input/output
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = lambda: ([window[np.newaxis]] for window in representative)
+    return converter.convert()
+
+
+def measure(model_path, X_val, y_val, runs, num_threads):
+    classifier = TFLiteClassifier(model_path, num_threads=num_threads)
+    window = X_val[:1]
+    for _ in range(10):
+        classifier.predict_batch(window)  # warm-up
+    latencies = []
+    for i in range(runs):
+        window = X_val[i % len(X_val)][np.newaxis]
+        started = time.perf_counter()
+        classifier.predict_batch(window)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    correct = 0
+    for window, label in zip(X_val, y_val):
+        correct += int(np.argmax(classifier.predict_batch(window[np.newaxis])[0]) == label)
+
+    p50, p99 = np.percentile(latencies, [50, 99])
+    return {
+        "size_bytes": os.path.getsize(model_path),
+        "latency_ms_p50": float(p50),
+        "latency_ms_p99": float(p99),
+        "val_accuracy": correct / len(y_val),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the Keras sign model to TFLite variants and compare them.")
+    parser.add_argument("--model", default="lstm_sign_model.h5")
+    parser.add_argument("--actions", default="actions.json")
+    parser.add_argument("--data-path", default="processed_sequences",
+                        help="sequences for int8 calibration and validation accuracy")
+    add_split_argument(parser)
+    parser.add_argument("--out-dir", default="tflite")
+    parser.add_argument("--variants", nargs="+", choices=VARIANTS, default=VARIANTS)
+    parser.add_argument("--representative-samples", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=200, help="timed single-window invokes per variant")
+    parser.add_argument("--num-threads", type=int, default=1)
+    parser.add_argument("--accuracy-bar", type=float, default=None,
+                        help="copy the fastest variant with at least this validation accuracy to --output")
+    parser.add_argument("--output", default="model.tflite")
+    args = parser.parse_args()
+
+    model = tf.keras.models.load_model(args.model)
+    with open(args.actions, "r") as f:
+        actions = json.load(f)
+    input_shape = tuple(model.input_shape[1:])
+
+    X_train, X_val, y_val = load_validation_data(args.data_path, actions, input_shape, args.split)
+    rng = np.random.default_rng(0)
+    representative = X_train[rng.permutation(len(X_train))[:args.representative_samples]]
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    report = {"model": args.model, "validation_windows": len(X_val), "variants": {}}
+    for variant in args.variants:
+        path = os.path.join(args.out_dir, f"model_{variant}.tflite")
+        try:
+            tflite_model = convert(model, variant, representative)
+        except Exception as exc:  # some TF builds cannot quantize every LSTM op
+            print(f"[SKIPPED] {variant}: conversion failed ({exc})")
+            report["variants"][variant] = {"error": str(exc)}
+            continue
+        write_tflite_model(path, tflite_model, {
+            "labels": actions,
+            "input_shape": list(input_shape),
+            "sequence_length": input_shape[0],
+            "variant": variant,
+            "source_model": os.path.basename(args.model),
+        })
+        stats = measure(path, X_val, y_val, args.runs, args.num_threads)
+        report["variants"][variant] = dict(stats, path=path)
+        print(f"✅ {variant:8s} {stats['size_bytes'] / 1024:8.1f} KiB  "
+              f"p50 {stats['latency_ms_p50']:.3f} ms  p99 {stats['latency_ms_p99']:.3f} ms  "
+              f"val acc {stats['val_accuracy'] * 100:.1f}%")
+
+    if args.accuracy_bar is not None:
+        eligible = [(stats["latency_ms_p50"], name) for name, stats in report["variants"].items()
+                    if "error" not in stats and stats["val_accuracy"] >= args.accuracy_bar]
+        if eligible:
+            _, best = min(eligible)
+            shutil.copyfile(report["variants"][best]["path"], args.output)
+            report["selected"] = best
+            print(f"✅ {args.output} saved ({best}: fastest variant with accuracy >= {args.accuracy_bar})")
+        else:
+            print(f"❌ No variant reached validation accuracy {args.accuracy_bar}; {args.output} not written")
+    elif "path" in report["variants"].get("float32", {}):
+        # Without an accuracy bar, keep the old behaviour of shipping the float32 model
+        shutil.copyfile(report["variants"]["float32"]["path"], args.output)
+        report["selected"] = "float32"
+        print(f"✅ {args.output} saved (float32)")
+
+    with open(os.path.join(args.out_dir, "report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[INFO] Report written to {os.path.join(args.out_dir, 'report.json')}")
 
-with open('model.tflite', 'wb') as f:
-    f.write(tflite_model)
 
-print("✅ model.tflite saved") 
\ No newline at end of file
+if __name__ == "__main__":
+    main()
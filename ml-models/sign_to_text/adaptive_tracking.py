@@ -0,0 +1,266 @@
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+from keypoints import KeypointRingBuffer
+
+# Modes reported per frame by AdaptiveHandTracker.process()
+FULL = "full"        # whole frame through MediaPipe
+ROI = "roi"          # cropped (and downscaled) around the previous hands
+SKIPPED = "skipped"  # no MediaPipe call; previous landmarks reused
+
+
+class TrackedResults:
+    """MediaPipe-compatible results (multi_hand_landmarks / multi_handedness) plus how they were produced."""
+
+    __slots__ = ("multi_hand_landmarks", "multi_handedness", "mode")
+
+    def __init__(self, multi_hand_landmarks, multi_handedness, mode):
+        self.multi_hand_landmarks = multi_hand_landmarks
+        self.multi_handedness = multi_handedness
+        self.mode = mode
+
+
+class AdaptiveHandTracker:
+    """Cheaper per-frame hand tracking around a MediaPipe Hands graph.
+
+    roi:    run MediaPipe on a crop around the previous frame's landmarks
+            (plus roi_margin on each side), downscaled so its long side is at
+            most roi_max_side pixels. Crops go through roi_hands, a separate
+            static_image_mode=True graph: the tracking state of `hands` refers
+            to full frames and would point at the wrong place in a crop (and
+            vice versa). The crop only moves when the hands get close to its edge.
+    skip:   when a thumbnail of the frame barely changed since the last
+            processed frame (mean absolute difference below motion_threshold,
+            in 0-255 grey levels), reuse the previous landmarks for up to
+            max_skip frames in a row. KeypointRingBuffer.interpolate_gap()
+            replaces those held frames once the next real detection arrives.
+    Tracking falls back to a full-frame scan whenever the ROI finds no hands,
+    and every full_scan_every frames so a second hand entering is noticed.
+    Returned landmarks are always in full-frame normalized coordinates.
+    """
+
+    def __init__(self, hands, roi_hands=None, roi=True, roi_margin=0.35, roi_max_side=320, roi_min_side=96,
+                 skip=True, motion_threshold=1.5, max_skip=2, full_scan_every=15):
+        if roi and roi_hands is None:
+            raise ValueError("roi=True needs roi_hands, a separate static_image_mode=True Hands graph for crops")
+        self.hands = hands
+        self.roi_hands = roi_hands
+        self.roi = roi
+        self.roi_margin = roi_margin
+        self.roi_max_side = roi_max_side
+        self.roi_min_side = roi_min_side
+        self.skip = skip
+        self.motion_threshold = motion_threshold
+        self.max_skip = max_skip
+        self.full_scan_every = full_scan_every
+        self.counts = {FULL: 0, ROI: 0, SKIPPED: 0}
+        self.reset()
+
+    def reset(self):
+        self.last = None        # last TrackedResults with hands
+        self.box = None         # current ROI (x0, y0, x1, y1) in pixels
+        self.thumbnail = None   # grey thumbnail of the last processed frame
+        self.skipped = 0
+        self.since_full = 0
+
+    def _motion(self, frame):
+        thumbnail = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), (32, 24),
+                               interpolation=cv2.INTER_AREA).astype(np.int16)
+        if self.thumbnail is None:
+            return thumbnail, float("inf")
+        return thumbnail, float(np.abs(thumbnail - self.thumbnail).mean())
+
+    def _run(self, frame, box):
+        height, width = frame.shape[:2]
+        if box is None:
+            results = self.hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            return results.multi_hand_landmarks, results.multi_handedness
+
+        x0, y0, x1, y1 = box
+        crop = frame[y0:y1, x0:x1]
+        scale = self.roi_max_side / max(crop.shape[:2])
+        if scale < 1.0:
+            crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        results = self.roi_hands.process(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB))
+        if results.multi_hand_landmarks:
+            # Crop-normalized -> frame-normalized, in place so drawing utils still get protobufs
+            crop_w, crop_h = x1 - x0, y1 - y0
+            for hand in results.multi_hand_landmarks:
+                for lm in hand.landmark:
+                    lm.x = (x0 + lm.x * crop_w) / width
+                    lm.y = (y0 + lm.y * crop_h) / height
+                    lm.z = lm.z * crop_w / width
+        return results.multi_hand_landmarks, results.multi_handedness
+
+    def _update_box(self, hands, width, height):
+        xs = [lm.x for hand in hands for lm in hand.landmark]
+        ys = [lm.y for hand in hands for lm in hand.landmark]
+        hx0, hx1 = min(xs) * width, max(xs) * width
+        hy0, hy1 = min(ys) * height, max(ys) * height
+
+        if self.box is not None:
+            # Keep the crop while the hands stay inside its inner area
+            x0, y0, x1, y1 = self.box
+            inset_x, inset_y = (x1 - x0) * 0.1, (y1 - y0) * 0.1
+            if hx0 > x0 + inset_x and hx1 < x1 - inset_x and hy0 > y0 + inset_y and hy1 < y1 - inset_y:
+                return
+
+        side = max(hx1 - hx0, hy1 - hy0, self.roi_min_side)
+        pad = side * self.roi_margin
+        cx, cy = (hx0 + hx1) / 2, (hy0 + hy1) / 2
+        half = side / 2 + pad
+        box = (int(max(0, cx - half)), int(max(0, cy - half)),
+               int(min(width, cx + half)), int(min(height, cy + half)))
+        # A crop that covers most of the frame saves nothing
+        self.box = None if (box[2] - box[0]) * (box[3] - box[1]) > 0.6 * width * height else box
+
+    def process(self, frame):
+        """TrackedResults for one BGR frame (already flipped, if the caller flips)."""
+        height, width = frame.shape[:2]
+        thumbnail, motion = self._motion(frame) if self.skip else (None, float("inf"))
+
+        if (self.skip and self.last is not None and self.skipped < self.max_skip
+                and motion < self.motion_threshold):
+            self.skipped += 1
+            self.counts[SKIPPED] += 1
+            return TrackedResults(self.last.multi_hand_landmarks, self.last.multi_handedness, SKIPPED)
+
+        self.skipped = 0
+        self.thumbnail = thumbnail
+        self.since_full += 1
+        hands = handedness = None
+        mode = FULL
+        if self.roi and self.box is not None and self.since_full < self.full_scan_every:
+            hands, handedness = self._run(frame, self.box)
+            mode = ROI
+        if not hands:
+            # Tracking lost (or time for a periodic check): scan the whole frame
+            hands, handedness = self._run(frame, None)
+            mode = FULL
+            self.since_full = 0
+        self.counts[mode] += 1
+
+        results = TrackedResults(hands, handedness, mode)
+        if hands:
+            self.last = results
+            if self.roi:
+                self._update_box(hands, width, height)
+        else:
+            self.last = None
+            self.box = None
+        return results
+
+
+# --- BENCHMARK ---
+def read_frames(source, limit, flip=True):
+    from frame_sources import open_source
+    capture = open_source(source)
+    frames = []
+    while len(frames) < limit:
+        ret, frame = capture.read()
+        if not ret:
+            break
+        frames.append(cv2.flip(frame, 1) if flip else frame)
+    capture.release()
+    return frames
+
+
+def track_sequence(frames, **options):
+    """Keypoints as predict_sign.py would window them, and the tracker's throughput."""
+    from mediapipe.python.solutions.hands import Hands
+
+    buffer = KeypointRingBuffer(len(frames))
+    with Hands(static_image_mode=False, max_num_hands=2,
+               min_detection_confidence=0.3, min_tracking_confidence=0.3) as hands, \
+            Hands(static_image_mode=True, max_num_hands=2, min_detection_confidence=0.3) as roi_hands:
+        if options.pop("baseline", False):
+            process = lambda frame: hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))  # noqa: E731
+            tracker = None
+        else:
+            tracker = AdaptiveHandTracker(hands, roi_hands, **options)
+            process = tracker.process
+        started = time.perf_counter()
+        gap = 0
+        for frame in frames:
+            results = process(frame)
+            buffer.push(results)
+            if getattr(results, "mode", None) == SKIPPED:
+                gap += 1
+            elif gap:
+                buffer.interpolate_gap(gap)
+                gap = 0
+        elapsed = time.perf_counter() - started
+    return buffer.window().copy(), len(frames) / elapsed, tracker.counts if tracker else None
+
+
+def compare_keypoints(reference, candidate):
+    """Hand-presence agreement and mean landmark error (in frame-normalized units) against full-frame tracking."""
+    ref_present = reference.reshape(len(reference), 2, -1).any(axis=2)
+    cand_present = candidate.reshape(len(candidate), 2, -1).any(axis=2)
+    both = ref_present & cand_present
+    error = np.abs(reference.reshape(len(reference), 2, -1) - candidate.reshape(len(candidate), 2, -1)).mean(axis=2)
+    return {
+        "presence_agreement": float((ref_present == cand_present).mean()),
+        "mean_abs_error": float(error[both].mean()) if both.any() else 0.0,
+    }
+
+
+def window_agreement(classifier, reference, candidate, sequence_length=50, stride=5):
+    """Fraction of sliding windows where the sign model picks the same class for both keypoint tracks."""
+    starts = range(0, len(reference) - sequence_length + 1, stride)
+    if not starts:
+        return None
+    ref = np.stack([reference[s:s + sequence_length] for s in starts])
+    cand = np.stack([candidate[s:s + sequence_length] for s in starts])
+    return float((classifier.predict_batch(ref).argmax(1) == classifier.predict_batch(cand).argmax(1)).mean())
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure FPS and accuracy of ROI cropping and frame skipping on a recorded video or image folder.")
+    parser.add_argument("source", help="video file or image folder (e.g. data/A)")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--no-flip", action="store_true")
+    parser.add_argument("--model", default=None, help="also report window argmax agreement with this sign model")
+    args = parser.parse_args()
+
+    frames = read_frames(args.source, args.frames, flip=not args.no_flip)
+    if not frames:
+        print(f"[ERROR] No frames could be read from {args.source}")
+        return
+
+    configs = {
+        "full frame": dict(baseline=True),
+        "roi": dict(roi=True, skip=False),
+        "skip": dict(roi=False, skip=True),
+        "roi + skip": dict(roi=True, skip=True),
+        "roi 192px + skip 3": dict(roi=True, roi_max_side=192, skip=True, max_skip=3),
+    }
+    classifier = None
+    if args.model:
+        from model_runtime import load_classifier
+        classifier = load_classifier(args.model)
+
+    reference, reference_fps, _ = track_sequence(frames, **configs["full frame"])
+    print(f"[BENCHMARK] {len(frames)} frames from {args.source}")
+    for name, options in configs.items():
+        keypoints, fps, counts = (reference, reference_fps, None) if name == "full frame" \
+            else track_sequence(frames, **options)
+        quality = compare_keypoints(reference, keypoints)
+        line = (f"  {name:20s} {fps:7.1f} fps ({fps / reference_fps:.2f}x)  "
+                f"presence {quality['presence_agreement'] * 100:5.1f}%  "
+                f"error {quality['mean_abs_error']:.4f}")
+        if classifier is not None:
+            agreement = window_agreement(classifier, reference, keypoints, classifier.input_shape[0])
+            if agreement is not None:
+                line += f"  argmax {agreement * 100:5.1f}%"
+        if counts:
+            line += "  " + " ".join(f"{mode}={n}" for mode, n in counts.items())
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
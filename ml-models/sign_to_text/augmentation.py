@@ -0,0 +1,157 @@
+import time
+import argparse
+
+import numpy as np
+
+from hand_features import WRIST, normalize_hands, split_hands
+
+
+def _hand_presence(hands):
+    """(N, T, 2, 21, 3) -> (N, T, 2) bool: which hand slots hold a detection."""
+    return hands.any(axis=(-2, -1))
+
+
+def normalize_sequences(X):
+    """Wrist-relative, palm-scaled (N, T, 126) sequences; frames without a hand stay zero."""
+    normalized, _ = normalize_hands(X)
+    return normalized.reshape(np.shape(X)).astype(np.float32)
+
+
+def mirror(X, flip):
+    """Mirror the selected sequences left-to-right: x -> 1 - x and the left/right slots swap.
+
+    flip is an (N,) bool mask; a right-handed take becomes the left-handed version of the sign.
+    """
+    X = np.array(X, dtype=np.float32)
+    hands = split_hands(X[flip])
+    present = _hand_presence(hands)
+    hands[..., 0] = np.where(present[..., np.newaxis], 1.0 - hands[..., 0], 0.0)
+    X[flip] = hands[..., ::-1, :, :].reshape(hands.shape[:2] + (-1,))
+    return X
+
+
+def rotate_scale_shift(X, angles, scales, shifts):
+    """In-plane rotation (radians), scaling and x/y translation of each sequence.
+
+    Each sequence turns and scales about the mean wrist position of its own
+    hands, so both hands move together and keep their relative layout. z is
+    scaled with x/y. angles and scales are (N,), shifts (N, 2).
+    """
+    hands = split_hands(X).copy()
+    present = _hand_presence(hands)
+    wrists = hands[..., WRIST, :2]  # (N, T, 2 hands, 2)
+    counts = np.maximum(present.sum(axis=(1, 2)), 1)[:, np.newaxis]
+    pivot = (wrists * present[..., np.newaxis]).sum(axis=(1, 2)) / counts  # (N, 2)
+
+    per_sequence = (slice(None), np.newaxis, np.newaxis, np.newaxis)
+    cos = (np.cos(angles) * scales).astype(np.float32)[per_sequence]
+    sin = (np.sin(angles) * scales).astype(np.float32)[per_sequence]
+    x = hands[..., 0] - pivot[:, 0][per_sequence]
+    y = hands[..., 1] - pivot[:, 1][per_sequence]
+    hands[..., 0] = cos * x - sin * y + (pivot[:, 0] + shifts[:, 0])[per_sequence]
+    hands[..., 1] = sin * x + cos * y + (pivot[:, 1] + shifts[:, 1])[per_sequence]
+    hands[..., 2] *= scales.astype(np.float32)[per_sequence]
+    hands *= present[..., np.newaxis, np.newaxis]  # missing hands stay exactly zero
+    return hands.reshape(np.shape(X)).astype(np.float32)
+
+
+def temporal_jitter(X, max_offset, rng):
+    """Resample every frame from up to max_offset frames away, keeping time order.
+
+    Imitates uneven webcam frame timing: some frames repeat, some are dropped.
+    """
+    n, length = X.shape[:2]
+    steps = np.arange(length) + rng.integers(-max_offset, max_offset + 1, size=(n, length))
+    steps = np.maximum.accumulate(np.clip(steps, 0, length - 1), axis=1)
+    return np.asarray(X, dtype=np.float32)[np.arange(n)[:, np.newaxis], steps]
+
+
+def speed_warp(X, factors):
+    """Play each sequence factors[i] times faster (>1) or slower (<1), anchored at its middle frame.
+
+    Frames are linearly interpolated; where either neighbour has no hand in a
+    slot the nearer frame is used instead, so hands never blend with zeros.
+    Past the ends the first/last frame repeats.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    n, length = X.shape[:2]
+    middle = (length - 1) / 2
+    times = np.clip(middle + (np.arange(length) - middle) * np.asarray(factors)[:, np.newaxis], 0, length - 1)
+    before = np.floor(times).astype(np.int64)
+    after = np.minimum(before + 1, length - 1)
+    weight = (times - before)[..., np.newaxis, np.newaxis]  # (N, T, 1, 1)
+
+    rows = np.arange(n)[:, np.newaxis]
+    a = X[rows, before].reshape(n, length, 2, -1)
+    b = X[rows, after].reshape(n, length, 2, -1)
+    both = (a.any(axis=-1) & b.any(axis=-1))[..., np.newaxis]
+    nearest = np.where(weight < 0.5, a, b)
+    return np.where(both, a + (b - a) * weight, nearest).reshape(X.shape)
+
+
+class SequenceAugmenter:
+    """Random, vectorized augmentation of whole (N, T, 126) keypoint batches.
+
+    Works on raw MediaPipe coordinates, so the augmented batches train the
+    same model every runtime path loads. Each call draws fresh parameters
+    per sequence; pass rng for reproducible batches.
+    """
+
+    def __init__(self, mirror_prob=0.5, max_rotation_deg=15.0, scale_range=(0.85, 1.15), max_shift=0.08,
+                 jitter_frames=1, speed_range=(0.8, 1.25), noise_std=0.002, seed=None):
+        self.mirror_prob = mirror_prob
+        self.max_rotation = np.deg2rad(max_rotation_deg)
+        self.scale_range = scale_range
+        self.max_shift = max_shift
+        self.jitter_frames = jitter_frames
+        self.speed_range = speed_range
+        self.noise_std = noise_std
+        self.rng = np.random.default_rng(seed)
+
+    def __call__(self, X, rng=None):
+        rng = self.rng if rng is None else rng
+        X = np.asarray(X, dtype=np.float32)
+        n = len(X)
+        if self.mirror_prob > 0:
+            X = mirror(X, rng.random(n) < self.mirror_prob)
+        if self.speed_range is not None:
+            # Log-uniform, so slowing down and speeding up are equally likely
+            low, high = np.log(self.speed_range)
+            X = speed_warp(X, np.exp(rng.uniform(low, high, n)))
+        if self.jitter_frames:
+            X = temporal_jitter(X, self.jitter_frames, rng)
+        X = rotate_scale_shift(
+            X,
+            rng.uniform(-self.max_rotation, self.max_rotation, n),
+            rng.uniform(*self.scale_range, n),
+            rng.uniform(-self.max_shift, self.max_shift, (n, 2)),
+        )
+        if self.noise_std:
+            # Landmark jitter, only on detected hands
+            present = X.reshape(X.shape[:2] + (2, -1)).any(axis=-1)
+            noise = rng.standard_normal(X.shape, dtype=np.float32) * np.float32(self.noise_std)
+            X += noise * np.repeat(present, X.shape[-1] // 2, axis=-1)
+        return X
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SequenceAugmenter on a synthetic batch.")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = rng.random((args.batch_size, 50, 126), dtype=np.float32)
+    X[:, :, 63:] *= rng.random((args.batch_size, 1, 1)) < 0.5  # about half the takes are one-handed
+    augmenter = SequenceAugmenter(seed=0)
+    augmenter(X)  # warm-up
+
+    started = time.perf_counter()
+    for _ in range(args.runs):
+        augmenter(X)
+    elapsed = (time.perf_counter() - started) / args.runs
+    print(f"[INFO] {args.batch_size} sequences in {elapsed * 1000:.1f} ms ({args.batch_size / elapsed:,.0f} sequences/s)")
+
+
+if __name__ == "__main__":
+    main()
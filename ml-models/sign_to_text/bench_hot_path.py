@@ -0,0 +1,230 @@
+import os
+import sys
+import json
+import time
+import platform
+import resource
+import argparse
+import subprocess
+
+# CPU-only, and keep TensorFlow's startup logging out of the JSON on stdout
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "-1")
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+import numpy as np  # noqa: E402
+
+from dataset_shard import scan_sequences  # noqa: E402
+from keypoints import KeypointRingBuffer, extract_keypoints  # noqa: E402
+
+SEQUENCE_LENGTH = 50
+CONFIDENCE_THRESHOLD = 0.8
+
+
+class StageTimings:
+    def __init__(self):
+        self.samples = {}
+
+    def time(self, stage, fn, *args, **kwargs):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.samples.setdefault(stage, []).append(time.perf_counter() - started)
+        return result
+
+    def summary(self):
+        report = {}
+        for stage, samples in self.samples.items():
+            ms = np.asarray(samples) * 1000
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            total_s = ms.sum() / 1000
+            report[stage] = {
+                "count": len(ms),
+                "throughput_per_s": len(ms) / total_s if total_s > 0 else None,
+                "mean_ms": float(ms.mean()),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+            }
+        return report
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def encoded_frames(images=None, video=None, limit=200):
+    """JPEG bytes to replay, so 'decode' measures decoding and not disk reads."""
+    import cv2
+    frames = []
+    if images:
+        for filename in sorted(os.listdir(images)):
+            with open(os.path.join(images, filename), "rb") as f:
+                frames.append(f.read())
+            if len(frames) >= limit:
+                break
+    elif video:
+        cap = cv2.VideoCapture(video)
+        while len(frames) < limit:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(cv2.imencode(".jpg", frame)[1].tobytes())
+        cap.release()
+    return frames
+
+
+def bench_vision(timings, frames, flip):
+    """decode -> color -> Hands.process -> keypoints -> windowing, frame by frame."""
+    import cv2
+    from mediapipe.python.solutions.hands import Hands
+
+    def to_rgb(image):
+        if flip:
+            image = cv2.flip(image, 1)
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+    def push(keypoints):
+        window.append(keypoints)
+        return window.window()
+
+    window = KeypointRingBuffer(SEQUENCE_LENGTH)
+    with Hands(static_image_mode=False, max_num_hands=2,
+               min_detection_confidence=0.3, min_tracking_confidence=0.3) as hands:
+        for data in frames:
+            image = timings.time("decode", cv2.imdecode, np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+            if image is None:
+                continue
+            rgb = timings.time("color", to_rgb, image)
+            results = timings.time("hands_process", hands.process, rgb)
+            keypoints = timings.time("keypoints", extract_keypoints, results)
+            timings.time("windowing", push, keypoints)
+
+
+def load_windows(data_path, limit):
+    windows = []
+    for _, path in scan_sequences(data_path):
+        sequence = np.load(path)
+        if sequence.shape == (SEQUENCE_LENGTH, 126):
+            windows.append(sequence.astype(np.float32))
+        if len(windows) >= limit:
+            break
+    return windows
+
+
+def bench_models(timings, windows, keras_path, tflite_path, actions):
+    def postprocess(probs):
+        best = int(np.argmax(probs))
+        confidence = float(probs[best])
+        return (actions[best] if actions else best, confidence) if confidence > CONFIDENCE_THRESHOLD else None
+
+    if keras_path:
+        from tensorflow.keras.models import load_model
+        model = load_model(keras_path)
+        model.predict(windows[0][np.newaxis], verbose=0)  # warm-up / graph tracing
+        model(windows[0][np.newaxis], training=False)
+        for window in windows:
+            batch = window[np.newaxis]
+            probs = timings.time("keras_predict", model.predict, batch, verbose=0)[0]
+            timings.time("keras_call", lambda: np.asarray(model(batch, training=False)))
+            timings.time("postprocess", postprocess, probs)
+
+    if tflite_path:
+        import tensorflow as tf
+        interpreter = tf.lite.Interpreter(model_path=tflite_path)
+        interpreter.allocate_tensors()
+        input_index = interpreter.get_input_details()[0]["index"]
+        output_index = interpreter.get_output_details()[0]["index"]
+
+        def invoke(batch):
+            interpreter.set_tensor(input_index, batch)
+            interpreter.invoke()
+            return interpreter.get_tensor(output_index)
+
+        invoke(windows[0][np.newaxis])
+        for window in windows:
+            probs = timings.time("tflite_invoke", invoke, window[np.newaxis])[0]
+            timings.time("postprocess", postprocess, probs)
+
+
+def compare(report, baseline_path):
+    """Per-stage p50/p99 change against an earlier report, printed to stderr."""
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+    print(f"[COMPARE] vs {baseline.get('commit') or baseline_path}", file=sys.stderr)
+    for stage, stats in report["stages"].items():
+        before = baseline.get("stages", {}).get(stage)
+        if not before:
+            continue
+        changes = "  ".join(
+            f"{key} {before[key]:.3f} -> {stats[key]:.3f} ms ({(stats[key] / before[key] - 1) * 100:+.1f}%)"
+            for key in ("p50_ms", "p99_ms") if before[key] > 0
+        )
+        print(f"  {stage:14s} {changes}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless per-stage benchmark of the sign-to-text hot path.")
+    parser.add_argument("--images", help="image folder to replay through the vision stages (e.g. data/A)")
+    parser.add_argument("--video", help="video file to replay through the vision stages")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--no-flip", action="store_true", help="skip the selfie flip in the color stage")
+    parser.add_argument("--sequences", default="processed_sequences", help="stored .npy windows for model stages")
+    parser.add_argument("--windows", type=int, default=200)
+    parser.add_argument("--keras-model", default="lstm_sign_model.h5", help="'' to skip")
+    parser.add_argument("--tflite-model", default="model.tflite", help="'' to skip")
+    parser.add_argument("--actions", default="actions.json")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE_JSON", help="print per-stage deltas against an earlier report")
+    args = parser.parse_args()
+
+    timings = StageTimings()
+    started = time.perf_counter()
+
+    frames = encoded_frames(args.images, args.video, args.frames) if (args.images or args.video) else []
+    if frames:
+        bench_vision(timings, frames, flip=not args.no_flip)
+
+    windows = load_windows(args.sequences, args.windows) if os.path.isdir(args.sequences) else []
+    if windows:
+        actions = None
+        if os.path.exists(args.actions):
+            with open(args.actions, "r") as f:
+                actions = json.load(f)
+        keras_path = args.keras_model if args.keras_model and os.path.exists(args.keras_model) else None
+        tflite_path = args.tflite_model if args.tflite_model and os.path.exists(args.tflite_model) else None
+        bench_models(timings, windows, keras_path, tflite_path, actions)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "host": {"platform": platform.platform(), "python": platform.python_version(),
+                 "cpu_count": os.cpu_count(), "numpy": np.__version__},
+        "inputs": {"frames": len(frames), "windows": len(windows)},
+        "stages": timings.summary(),
+        "wall_s": time.perf_counter() - started,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    if "tensorflow" in sys.modules:
+        report["host"]["tensorflow"] = sys.modules["tensorflow"].__version__
+
+    if args.compare:
+        compare(report, args.compare)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
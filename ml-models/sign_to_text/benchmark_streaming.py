@@ -0,0 +1,74 @@
+import os
+import time
+import argparse
+
+import numpy as np
+from tensorflow.keras.models import load_model
+
+from streaming_lstm import StreamingLSTM
+
+MODEL_PATH = "lstm_sign_model.h5"
+DATA_PATH = "processed_sequences"
+
+
+def load_stream(data_path, num_sequences, seed=0):
+    """Concatenate a few stored sequences into one long frame stream."""
+    paths = []
+    for label in sorted(os.listdir(data_path)):
+        label_path = os.path.join(data_path, label)
+        if os.path.isdir(label_path):
+            paths += [os.path.join(label_path, f) for f in sorted(os.listdir(label_path)) if f.endswith(".npy")]
+    rng = np.random.default_rng(seed)
+    chosen = rng.choice(len(paths), size=min(num_sequences, len(paths)), replace=False)
+    return np.concatenate([np.load(paths[i]) for i in chosen]).astype(np.float32)
+
+
+def per_frame_ms(fn, frames):
+    started = time.perf_counter()
+    outputs = [fn(t) for t in range(len(frames))]
+    return (time.perf_counter() - started) * 1000 / len(frames), outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare windowed vs. streaming LSTM inference per frame.")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--data-path", default=DATA_PATH)
+    parser.add_argument("--sequences", type=int, default=8, help="stored sequences to chain into the test stream")
+    parser.add_argument("--resync-every", type=int, default=25)
+    args = parser.parse_args()
+
+    model = load_model(args.model)
+    window = model.input_shape[1]
+    frames = load_stream(args.data_path, args.sequences)
+    print(f"[INFO] Stream of {len(frames)} frames, window {window}")
+
+    def keras_windowed(t):
+        if t + 1 < window:
+            return None
+        return np.asarray(model(frames[None, t + 1 - window:t + 1], training=False))[0]
+
+    stream = StreamingLSTM.from_keras(model, window=window, resync_every=args.resync_every)
+
+    def numpy_windowed(t):
+        if t + 1 < window:
+            return None
+        return stream.predict_window(frames[t + 1 - window:t + 1])
+
+    keras_ms, reference = per_frame_ms(keras_windowed, frames)
+    numpy_ms, _ = per_frame_ms(numpy_windowed, frames)
+    stream.reset()
+    streaming_ms, streamed = per_frame_ms(lambda t: stream.step(frames[t]), frames)
+
+    pairs = [(r, s) for r, s in zip(reference, streamed) if r is not None]
+    max_diff = max(float(np.abs(r - s).max()) for r, s in pairs)
+    agreement = np.mean([np.argmax(r) == np.argmax(s) for r, s in pairs])
+
+    print(f"Keras windowed   : {keras_ms:8.3f} ms/frame")
+    print(f"NumPy windowed   : {numpy_ms:8.3f} ms/frame")
+    print(f"Streaming        : {streaming_ms:8.3f} ms/frame "
+          f"({keras_ms / streaming_ms:.1f}x faster than Keras windowed, resync every {args.resync_every})")
+    print(f"Max |p_stream - p_window| = {max_diff:.5f}, argmax agreement = {agreement * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
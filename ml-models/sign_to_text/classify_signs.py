@@ -1,56 +1,91 @@
 import cv2
+import time
 import joblib
-import numpy as np
+import argparse
 
 # Import the correct submodules directly from mediapipe
 from mediapipe.python.solutions.hands import Hands, HAND_CONNECTIONS
 from mediapipe.python.solutions.drawing_utils import draw_landmarks
 
+from keypoints import extract_keypoints
+from static_classifier import STATIC_MODEL_PATH
+from pipeline import Pipeline
+from frame_sources import add_source_arguments, source_from_args, sink_from_args
+from metrics import add_metrics_arguments, metrics_from_args
+
+REPORT_INTERVAL = 5  # seconds between pipeline FPS / queue reports
+
+parser = argparse.ArgumentParser(description="Per-frame sign classification with sign_model.pkl.")
+add_source_arguments(parser)
+parser.add_argument("--model", default=STATIC_MODEL_PATH, help="static classifier from train_static_model.py")
+add_metrics_arguments(parser)
+args = parser.parse_args()
+session = metrics_from_args(args)
+
 print("[INFO] Starting sign classification...")
 
-# Load trained model
-model = joblib.load("sign_model.pkl")
+# Load trained model (a StaticSignClassifier)
+model = joblib.load(args.model)
 
-# Start webcam
-cap = cv2.VideoCapture(0)
-if not cap.isOpened():
-    print("[ERROR] Could not open webcam. Try changing the index to 1 or 2.")
+# Start webcam (or --source)
+source = source_from_args(args)
+if not source.isOpened():
+    print("[ERROR] Could not open the frame source. For a webcam, try --source 1 or 2.")
     exit()
+sink = sink_from_args(args, "Sign Language to Text")
 
-with Hands(
+hands = Hands(
     static_image_mode=False,
     max_num_hands=2,
     min_detection_confidence=0.5,
     min_tracking_confidence=0.5
-) as hands:
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            print("[ERROR] Failed to grab frame")
-            break
+)
+
+
+def landmarks(frame):
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    results = hands.process(rgb)
+    if not results.multi_hand_landmarks:
+        return results, None
+    return results, extract_keypoints(results)
 
-        frame = cv2.flip(frame, 1)
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(rgb)
 
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
+def classify(packet):
+    # One prediction per frame from both hand slots: (label, confidence)
+    if packet.keypoints is None:
+        return None
+    return model.predict_one(packet.keypoints)
+
+
+pipeline = Pipeline(source, landmarks, classify, flip=True, metrics=session.metrics).start()
+last_report = time.time()
+
+try:
+    for packet in pipeline:
+        frame = packet.frame
+
+        if packet.prediction is not None:
+            label, confidence = packet.prediction
+            for hand_landmarks in packet.results.multi_hand_landmarks:
                 draw_landmarks(frame, hand_landmarks, HAND_CONNECTIONS)
-                keypoints = []
-                for lm in hand_landmarks.landmark:
-                    keypoints.extend([lm.x, lm.y, lm.z])
-                keypoints_np = np.array(keypoints).reshape(1, -1)
-                prediction = model.predict(keypoints_np)[0]
-                cv2.putText(frame, f"Prediction: {prediction}", (10, 30),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            cv2.putText(frame, f"Prediction: {label} ({confidence:.2f})", (10, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            if args.headless:
+                print(f"[{packet.index}] Prediction: {label} ({confidence:.2f})")
         else:
             cv2.putText(frame, "No Hand Detected", (10, 30),
                         cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
 
-        cv2.imshow("Sign Language to Text", frame)
+        if time.time() - last_report >= REPORT_INTERVAL:
+            print("[PIPELINE]", pipeline.format_report())
+            last_report = time.time()
 
-        if cv2.waitKey(1) & 0xFF == ord("q"):
+        if sink.show(frame, 1) == ord("q"):
             break
-
-cap.release()
-cv2.destroyAllWindows()
+finally:
+    pipeline.stop()
+    print("[PIPELINE]", pipeline.format_report())
+    hands.close()
+    source.release()
+    sink.close()
+    session.close()
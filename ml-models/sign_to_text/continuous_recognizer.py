@@ -0,0 +1,373 @@
+import os
+import argparse
+from collections import deque, namedtuple
+
+import numpy as np
+
+from keypoints import KeypointRingBuffer, HAND_FEATURES
+
+# kind is "sign" (a recognized label) or "word" (letters closed by a pause)
+RecognizerEvent = namedtuple("RecognizerEvent", ["kind", "value", "confidence"])
+
+
+class ContinuousRecognizer:
+    """Turns a stream of keypoint frames into a running text string.
+
+    Instead of clearing the window on every frame without hands and waiting
+    for 50 fresh frames, the window always holds the last sequence_length
+    frames (starting as zeros, and with zeros for frames without hands,
+    like the missed-frame placeholders in recorded sequences). Every
+    `stride` frames the classifier runs and its probabilities are smoothed
+    with an exponential moving average. It starts `min_hand_frames` hand
+    frames into a segment. That keeps the wait after a dropout short, at the
+    price of early predictions on windows still mostly zeros (training
+    windows have at most 20% missed frames). Those can emit a sign early, but
+    once the window is 80% hand frames their smoothed and segment scores are
+    dropped, so they never outvote the classifier on a training-like window.
+
+    Signs are segmented by hand presence and motion: a segment opens when
+    hands appear and closes after `dropout_frames` frames without hands or
+    `pause_frames` nearly still frames (mean landmark change below
+    `pause_motion`). Every sign in actions.json is a held handshape, so a
+    still hand is usually the sign itself, not its end: stillness only ends
+    a segment after `stable_predictions` predictions on windows that are 80%
+    hand frames, so an early guess can still be corrected.
+    Shorter dropouts are bridged. A sign
+    is emitted as soon as its smoothed probability has stayed above
+    `threshold` for `stable_predictions` predictions, or at the end of the
+    segment if its mean smoothed probability over the segment clears the
+    threshold. Each segment emits at most one sign, unless the sign changes
+    while the segment is still open.
+
+    Single-character labels (fingerspelled letters) are joined into words;
+    a gap of `word_gap_frames` without hands ends the word.
+    """
+
+    def __init__(self, actions, sequence_length=50, stride=3, alpha=0.5, threshold=0.8,
+                 stable_predictions=2, dropout_frames=8, pause_frames=10, pause_motion=0.002,
+                 word_gap_frames=30, min_hand_frames=10):
+        self.actions = actions
+        self.window = KeypointRingBuffer(sequence_length)
+        self.min_hand_frames = min_hand_frames
+        self.filled_hand_frames = int(0.8 * sequence_length)  # a training-like window
+        self.presence = deque(maxlen=sequence_length)  # hands or not, per window row
+        self.stride = stride
+        self.alpha = alpha
+        self.threshold = threshold
+        self.stable_predictions = stable_predictions
+        self.dropout_frames = dropout_frames
+        self.pause_frames = pause_frames
+        self.pause_motion = pause_motion
+        self.word_gap_frames = word_gap_frames
+        self.text = ""
+        self.word = ""
+        self.reset()
+
+    def reset(self):
+        """Forget the window and segment state (the text is kept)."""
+        for _ in range(self.window.capacity):
+            self.window.append(0.0)
+        self.presence.extend([False] * self.window.capacity)
+        self.hand_frames = 0  # rows of the window with hands
+        self.smoothed = None
+        self.frames = 0
+        self.present = False
+        self.hands = (False, False)  # left/right presence in the newest window row
+        self.motion = 0.0
+        self.absent = 0
+        self.still = 0
+        self.resting = False
+        self.in_segment = False
+        self.segment_score = None
+        self.segment_predictions = 0
+        self.segment_hand_frames = 0
+        self.segment_filled = False
+        self.emitted = None
+        self.stable_label = None
+        self.stable_count = 0
+
+    @property
+    def current(self):
+        """(label, smoothed confidence) of the latest prediction, or (None, 0.0)."""
+        if self.smoothed is None:
+            return None, 0.0
+        best = int(np.argmax(self.smoothed))
+        return self.actions[best], float(self.smoothed[best])
+
+    def _motion(self, row):
+        # Presence of the previous row is remembered, so each row is only scanned once
+        hands = tuple(row.reshape(2, -1).any(axis=1).tolist())
+        previous_hands, self.hands = self.hands, hands
+        if hands != previous_hands:
+            return np.inf  # a hand appeared or disappeared
+        if not any(hands):
+            return 0.0
+        change = np.abs(row - self.window.window()[-2]).reshape(2, -1).sum(axis=1).tolist()
+        return max(change[slot] for slot in (0, 1) if hands[slot]) / HAND_FEATURES  # mean per landmark value
+
+    def _emit(self, label, confidence, events):
+        if len(label) == 1:
+            self.word += label
+        else:
+            self._close_word(events)
+            self.text = f"{self.text} {label}".strip()
+        self.emitted = label
+        events.append(RecognizerEvent("sign", label, confidence))
+
+    def _close_word(self, events):
+        if self.word:
+            self.text = f"{self.text} {self.word}".strip()
+            events.append(RecognizerEvent("word", self.word, 1.0))
+            self.word = ""
+
+    def _end_segment(self, events):
+        if self.in_segment and self.emitted is None and self.segment_predictions:
+            mean = self.segment_score / self.segment_predictions
+            best = int(np.argmax(mean))
+            if mean[best] >= self.threshold:
+                self._emit(self.actions[best], float(mean[best]), events)
+        self.in_segment = False
+        self.smoothed = None
+        self.segment_score = None
+        self.segment_predictions = 0
+        self.segment_hand_frames = 0
+        self.segment_filled = False
+        self.emitted = None
+        self.stable_label = None
+        self.stable_count = 0
+
+    def push(self, results, predict):
+        """Add one frame of MediaPipe results; returns a (possibly empty) list of RecognizerEvents.
+
+        predict(window) -> class probabilities is only called every `stride`
+        frames, with the (sequence_length, 126) window view.
+        """
+        self.observe(results)
+        return self.update(predict)
+
+    def observe(self, results):
+        """First half of push(): write the frame into the window and return its keypoint row."""
+        self.present = bool(results.multi_hand_landmarks)
+        row = self.window.push(results)
+        self.frames += 1
+        self.motion = self._motion(row)
+        self._count_hands()
+        return row
+
+    def observe_keypoints(self, keypoints):
+        """Like observe(), for a ready 126-value keypoint row (e.g. landmarks computed by a browser client)."""
+        row = self.window.append(keypoints)
+        self.frames += 1
+        self.motion = self._motion(row)
+        self.present = any(self.hands)
+        self._count_hands()
+        return row
+
+    def _count_hands(self):
+        self.hand_frames += self.present - self.presence[0]
+        self.presence.append(self.present)
+
+    def update(self, predict):
+        """Second half of push(): segmentation, smoothing and decoding for the observed frame."""
+        events = []
+        if self.segment(events):
+            self.decode(predict(self.window.window()), events)
+        return events
+
+    def update_prefix(self, classifier, row):
+        """update() for a prefix classifier (streaming_lstm.EarlyExitLSTM) instead of a window one.
+
+        The classifier steps through every row of a segment (bridged dropouts as
+        zero rows) and restarts with it. Its output is only decoded once it has
+        reached an exit, and a still hand does not end the segment while it is
+        still heading for a later one.
+        """
+        events = []
+        hold = classifier.deciding  # before the step, so the frame that commits still gets decoded
+        probs = classifier.step(row) if self.present or self.in_segment else None
+        if self.segment(events, hold=hold) and probs is not None:
+            self.decode(probs, events)
+        if not self.in_segment:
+            classifier.reset()  # the next sign starts from an empty prefix
+        return events
+
+    def segment(self, events, hold=False):
+        """update() up to the classifier call: True if this frame is due a prediction.
+
+        Lets a caller that cannot block on predict (an asyncio server awaiting
+        a shared batch) get the probabilities itself and pass them to decode().
+        hold keeps a still hand from ending the segment (the classifier is not
+        done with it yet).
+        """
+        present, motion = self.present, self.motion
+
+        if present:
+            self.absent = 0
+            if motion < self.pause_motion:
+                self.still += 1
+            else:
+                self.still = 0
+                self.resting = False
+            if not self.in_segment and not self.resting:
+                self.in_segment = True
+            if self.in_segment:
+                self.segment_hand_frames += 1
+        else:
+            self.absent += 1
+            self.resting = False
+            if self.absent == self.word_gap_frames:
+                self._close_word(events)
+
+        if self.in_segment and self.absent >= self.dropout_frames:
+            self._end_segment(events)
+        elif (self.in_segment and self.still >= self.pause_frames and not hold
+              and self.segment_filled and self.segment_predictions >= self.stable_predictions):
+            # Held still after the handshape was classified: the sign is over,
+            # and it must not open a new segment until the hands move again
+            self._end_segment(events)
+            self.resting = True
+
+        return (present and self.in_segment and self.frames % self.stride == 0
+                and self.segment_hand_frames >= self.min_hand_frames)
+
+    def decode(self, probs, events):
+        """Rest of update(): smooth probs for the current window and emit any recognized sign."""
+        probs = np.asarray(probs, dtype=np.float32)
+        if not self.segment_filled and self.hand_frames >= self.filled_hand_frames:
+            # First training-like window: the guesses on mostly empty ones no longer count
+            self.segment_filled = True
+            self.smoothed = self.segment_score = None
+            self.segment_predictions = 0
+            self.stable_label, self.stable_count = None, 0
+        self.smoothed = probs if self.smoothed is None else \
+            self.alpha * probs + (1 - self.alpha) * self.smoothed
+        self.segment_score = self.smoothed.copy() if self.segment_score is None \
+            else self.segment_score + self.smoothed
+        self.segment_predictions += 1
+
+        label, confidence = self.current
+        if confidence >= self.threshold:
+            self.stable_count = self.stable_count + 1 if label == self.stable_label else 1
+            self.stable_label = label
+            if self.stable_count >= self.stable_predictions and label != self.emitted:
+                self._emit(label, confidence, events)
+        else:
+            self.stable_label, self.stable_count = None, 0
+
+
+# --- REPLAY CHECK ---
+def replay(recognizer, sequences, predict, gap_frames=20):
+    """Feed recorded sequences one after another, separated by frames without hands.
+
+    predict(window, index) gets the index of the sequence being replayed (or
+    of the one just before a gap). Returns the signs emitted during each
+    sequence and the gap after it.
+    """
+    gap = np.zeros((gap_frames, sequences[0].shape[1]), dtype=np.float32)
+    emitted = []
+    for index, sequence in enumerate(sequences):
+        signs = []
+        for row in np.concatenate([sequence, gap]):
+            recognizer.observe_keypoints(row)
+            events = recognizer.update(lambda window: predict(window, index))
+            signs += [event.value for event in events if event.kind == "sign"]
+        emitted.append(signs)
+    return emitted
+
+
+class _PrefixOracle:
+    """Stands in for the StreamingLSTM inside an EarlyExitLSTM: unsure of any prefix
+    shorter than `sure_after` frames, certain of class `label` from then on."""
+
+    def __init__(self, num_classes, label, sure_after):
+        self.uniform = np.full(num_classes, 1.0 / num_classes, dtype=np.float32)
+        self.sure = np.eye(num_classes, dtype=np.float32)[label]
+        self.sure_after = sure_after
+
+    def _zero_state(self):
+        return [0]
+
+    def _advance(self, frame, state):
+        state[0] += 1
+        return state[0]
+
+    def _head(self, length):
+        return self.sure if length >= self.sure_after else self.uniform
+
+
+def replay_held_sign(actions, row, sure_after, exits=(10, 20, 30, 50), hold_frames=60, gap_frames=20):
+    """Hold one keypoint row perfectly still in front of the early-exit setup of predict_sign.py,
+    with a classifier that is only sure from `sure_after` frames on.
+
+    Returns the frame of the hold the sign was emitted at, or None.
+    """
+    from streaming_lstm import EarlyExitLSTM
+    recognizer = ContinuousRecognizer(actions, stride=1, alpha=1.0, stable_predictions=1, min_hand_frames=0)
+    early_exit = EarlyExitLSTM(_PrefixOracle(len(actions), 0, sure_after), exits=exits)
+    gap = np.zeros((gap_frames, len(row)), dtype=np.float32)
+    for frame, keypoints in enumerate(np.concatenate([gap, np.repeat(row[np.newaxis], hold_frames, axis=0), gap])):
+        recognizer.observe_keypoints(keypoints)
+        if any(event.kind == "sign" for event in recognizer.update_prefix(early_exit, keypoints)):
+            return frame - gap_frames + 1
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay recorded sequences through the recognizer and check each one's sign is emitted.")
+    parser.add_argument("--data-path", default="processed_sequences")
+    parser.add_argument("--model", default="lstm_sign_model.h5", help=".h5/.keras or .tflite model")
+    parser.add_argument("--oracle", action="store_true",
+                        help="instead of a model, answer the true sign for windows with at least 80%% hand "
+                             "frames (like the training data) and nothing otherwise: checks the decoder alone")
+    parser.add_argument("--per-class", type=int, default=5, help="sequences replayed per sign")
+    parser.add_argument("--stride", type=int, default=3)
+    parser.add_argument("--early-exit", action="store_true",
+                        help="instead, hold a still hand through the early-exit recognizer with a classifier "
+                             "that only becomes sure at each exit in turn")
+    args = parser.parse_args()
+
+    actions = sorted(d for d in os.listdir(args.data_path) if os.path.isdir(os.path.join(args.data_path, d)))
+    sequences, labels = [], []
+    for label in actions:
+        names = sorted(f for f in os.listdir(os.path.join(args.data_path, label)) if f.endswith(".npy"))
+        for name in names[:args.per_class]:
+            sequences.append(np.load(os.path.join(args.data_path, label, name)).astype(np.float32))
+            labels.append(label)
+
+    if args.early_exit:
+        exits = (10, 20, 30, 50)
+        row = next(row for sequence in sequences for row in sequence if row.any())
+        for sure_after in exits:
+            frame = replay_held_sign(actions, row, sure_after, exits)
+            print(f"[INFO] Sure from {sure_after} frames: "
+                  + (f"emitted at frame {frame} of the hold" if frame else "nothing emitted"))
+        return
+
+    if args.oracle:
+        uniform = np.full(len(actions), 1.0 / len(actions), dtype=np.float32)
+
+        def predict(window, index):
+            if window.any(axis=1).mean() < 0.8:
+                return uniform
+            return np.eye(len(actions), dtype=np.float32)[actions.index(labels[index])]
+    else:
+        from model_runtime import load_actions, load_classifier
+        classifier = load_classifier(args.model)
+        actions = load_actions()
+
+        def predict(window, index):
+            return classifier.predict_batch(window[np.newaxis])[0]
+
+    recognizer = ContinuousRecognizer(actions, stride=args.stride)
+    emitted = replay(recognizer, sequences, predict)
+    correct = sum(label in signs for label, signs in zip(labels, emitted))
+    wrong = sum(sign != label for label, signs in zip(labels, emitted) for sign in signs)
+    missed = sorted({label for label, signs in zip(labels, emitted) if label not in signs})
+    print(f"[INFO] {correct}/{len(sequences)} sequences emitted their sign, {wrong} other signs emitted")
+    if missed:
+        print(f"[INFO] Missed at least once: {', '.join(missed)}")
+
+
+if __name__ == "__main__":
+    main()
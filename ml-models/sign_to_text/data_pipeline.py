@@ -0,0 +1,91 @@
+import numpy as np
+import tensorflow as tf
+
+SEQUENCE_LENGTH = 50
+NUM_FEATURES = 126
+
+
+def _finish(dataset, sequence_length):
+    def set_shapes(x, y):
+        x.set_shape((None, sequence_length, NUM_FEATURES))
+        y.set_shape((None,))
+        return x, y
+
+    return dataset.map(set_shapes).prefetch(tf.data.AUTOTUNE)
+
+
+def _augmented(augment, x):
+    # A fresh generator per call: numpy_function batches run on several threads at once
+    return augment(x, rng=np.random.default_rng())
+
+
+def make_shard_dataset(X, y, indices, batch_size=32, shuffle=True, shuffle_buffer=2048, seed=42, augment=None):
+    """Stream batches of rows from a (memory-mapped) shard.
+
+    Only row indices are shuffled and batched in TensorFlow; each batch is then
+    gathered from X in a parallel numpy_function, so peak memory is a few
+    batches no matter how large the shard is. Labels are sparse integers.
+    augment (e.g. augmentation.SequenceAugmenter) is applied to every gathered
+    batch, so each epoch sees new variants.
+    """
+    sequence_length = X.shape[1]
+    indices = np.asarray(indices, dtype=np.int64)
+    y = np.asarray(y, dtype=np.int64)
+
+    def gather(batch_idx):
+        # Order inside a batch does not matter, and sorted reads keep memmap access sequential
+        batch_idx = np.sort(batch_idx)
+        x = np.asarray(X[batch_idx], dtype=np.float32)
+        if augment is not None:
+            x = _augmented(augment, x)
+        return x, y[batch_idx]
+
+    dataset = tf.data.Dataset.from_tensor_slices(indices)
+    if shuffle:
+        dataset = dataset.shuffle(min(shuffle_buffer, len(indices)), seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size)
+    dataset = dataset.map(
+        lambda idx: tf.numpy_function(gather, [idx], (tf.float32, tf.int64)),
+        num_parallel_calls=tf.data.AUTOTUNE,
+        deterministic=not shuffle,
+    )
+    return _finish(dataset, sequence_length)
+
+
+def make_file_dataset(paths, y, batch_size=32, shuffle=True, shuffle_buffer=2048, seed=42,
+                      sequence_length=SEQUENCE_LENGTH, augment=None):
+    """Stream batches straight from per-sequence .npy files, reading them in parallel."""
+    paths = np.asarray(paths)
+    y = np.asarray(y, dtype=np.int64)
+
+    def read(path):
+        return np.load(path.decode()).astype(np.float32)
+
+    dataset = tf.data.Dataset.from_tensor_slices((paths, y))
+    if shuffle:
+        dataset = dataset.shuffle(min(shuffle_buffer, len(paths)), seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.map(
+        lambda path, label: (tf.numpy_function(read, [path], tf.float32), label),
+        num_parallel_calls=tf.data.AUTOTUNE,
+        deterministic=not shuffle,
+    )
+    dataset = dataset.batch(batch_size)
+    if augment is not None:
+        dataset = dataset.map(
+            lambda x, label: (tf.numpy_function(lambda batch: _augmented(augment, batch), [x], tf.float32), label),
+            num_parallel_calls=tf.data.AUTOTUNE,
+            deterministic=not shuffle,
+        )
+    return _finish(dataset, sequence_length)
+
+
+def with_exit_targets(dataset, exit_weights):
+    """(x, y) batches -> (x, y per step, per-step weights) for the early-exit model in train_model.py."""
+    weights = tf.constant(exit_weights, dtype=tf.float32)
+    sequence_length = len(exit_weights)
+
+    def expand(x, y):
+        y_steps = tf.repeat(y[:, tf.newaxis], sequence_length, axis=1)
+        return x, y_steps, tf.broadcast_to(weights, tf.shape(y_steps))
+
+    return dataset.map(expand, num_parallel_calls=tf.data.AUTOTUNE)
@@ -0,0 +1,164 @@
+import os
+import json
+import argparse
+
+import numpy as np
+
+from recording_store import RecordingStore, is_recording_store, store_signature, training_windows, MAX_MISSED_FRACTION
+
+DATA_PATH = "processed_sequences"
+SHARD_PATH = "dataset_shard"  # writes dataset_shard.bin + dataset_shard.json
+SEQUENCE_LENGTH = 50
+NUM_FEATURES = 126
+SHARD_VERSION = 1
+
+
+def shard_files(shard_path):
+    return shard_path + ".bin", shard_path + ".json"
+
+
+def scan_sequences(data_path):
+    """List (label, path) for every .npy sequence, in a stable order."""
+    entries = []
+    for label in sorted(os.listdir(data_path)):
+        label_path = os.path.join(data_path, label)
+        if not os.path.isdir(label_path):
+            continue
+        for file in sorted(os.listdir(label_path)):
+            if file.endswith(".npy"):
+                entries.append((label, os.path.join(label_path, file)))
+    return entries
+
+
+def scan_store_windows(data_path, sequence_length=SEQUENCE_LENGTH, max_missed=MAX_MISSED_FRACTION):
+    """(label, window, source) for every training window of a recording store.
+
+    The missed-frame policy is applied here rather than while recording, so
+    changing max_missed only needs a re-pack. Sources are "<label>/take_<id>"
+    (plus "_<n>" for later windows of a long take); split_dataset.py splits a
+    store by take and keeps every window with its take.
+    """
+    store = RecordingStore(data_path)
+    entries, dropped = [], 0
+    for take in store.takes:
+        keypoints, mask = store.load_take(take)
+        windows = training_windows(keypoints, mask, sequence_length, max_missed)
+        dropped += max(-(-take["length"] // sequence_length), 1) - len(windows)
+        for i, window in enumerate(windows):
+            name = f"{take['label']}/take_{take['take']}" + (f"_{i}" if i else "")
+            entries.append((take["label"], window, {"path": name, "mtime": take["time"]}))
+    if dropped:
+        print(f"[SKIPPED] {dropped} windows with more than {max_missed:.0%} frames without hands")
+    return entries
+
+
+def pack_sequences(data_path=DATA_PATH, shard_path=SHARD_PATH, dtype="float32",
+                   sequence_length=SEQUENCE_LENGTH, max_missed=MAX_MISSED_FRACTION):
+    """Pack every (sequence_length, 126) .npy file under data_path into one contiguous shard.
+
+    data_path may also be a recording store (record_sign.py), whose takes are
+    cut into windows by scan_store_windows().
+    The data goes into a raw .bin file that can be opened with np.memmap, and
+    labels, shape and per-row provenance go into a small .json index next to it.
+    """
+    bin_path, index_path = shard_files(shard_path)
+    from_store = is_recording_store(data_path)
+
+    valid = []
+    if from_store:
+        valid = scan_store_windows(data_path, sequence_length, max_missed)
+    else:
+        # First pass only reads the .npy headers so the output can be sized up front
+        for label, path in scan_sequences(data_path):
+            sequence = np.load(path, mmap_mode="r")
+            if sequence.shape == (sequence_length, NUM_FEATURES):
+                source = {"path": os.path.relpath(path, data_path), "mtime": os.path.getmtime(path)}
+                valid.append((label, path, source))
+            else:
+                print(f"[SKIPPED] {path} has shape {sequence.shape}, expected ({sequence_length}, {NUM_FEATURES})")
+
+    if not valid:
+        raise ValueError(f"No ({sequence_length}, {NUM_FEATURES}) sequences found in '{data_path}'")
+
+    shape = (len(valid), sequence_length, NUM_FEATURES)
+    out = np.memmap(bin_path + ".tmp", dtype=dtype, mode="w+", shape=shape)
+    for row, (_, sequence, _) in enumerate(valid):
+        out[row] = sequence if from_store else np.load(sequence, mmap_mode="r")
+    out.flush()
+    del out
+    os.replace(bin_path + ".tmp", bin_path)
+
+    labels = sorted({label for label, _, _ in valid})
+    label_ids = {label: i for i, label in enumerate(labels)}
+    index = {
+        "version": SHARD_VERSION,
+        "dtype": np.dtype(dtype).name,
+        "shape": list(shape),
+        "labels": labels,
+        "y": [label_ids[label] for label, _, _ in valid],
+        "sources": [source for _, _, source in valid],
+    }
+    if from_store:
+        index["store"] = store_signature(data_path)
+        index["max_missed"] = max_missed
+    with open(index_path, "w") as f:
+        json.dump(index, f)
+
+    print(f"✅ Packed {shape[0]} sequences ({len(labels)} classes) into {bin_path} [{index['dtype']}]")
+    return index
+
+
+def load_shard(shard_path=SHARD_PATH):
+    """Open a packed shard without reading it: returns (X memmap, y int array, index dict)."""
+    bin_path, index_path = shard_files(shard_path)
+    with open(index_path, "r") as f:
+        index = json.load(f)
+    if index.get("version") != SHARD_VERSION:
+        raise ValueError(f"Unsupported shard version {index.get('version')} in {index_path}")
+    X = np.memmap(bin_path, dtype=index["dtype"], mode="r", shape=tuple(index["shape"]))
+    y = np.asarray(index["y"], dtype=np.int64)
+    return X, y, index
+
+
+def shard_is_stale(data_path=DATA_PATH, shard_path=SHARD_PATH):
+    """True if the shard is missing or any source sequence was added, removed or modified."""
+    bin_path, index_path = shard_files(shard_path)
+    if not (os.path.exists(bin_path) and os.path.exists(index_path)):
+        return True
+    with open(index_path, "r") as f:
+        index = json.load(f)
+    if is_recording_store(data_path):
+        # The takes index only ever grows, so its size tells whether anything was recorded since
+        return index.get("store") != store_signature(data_path)
+    packed = {src["path"]: src["mtime"] for src in index.get("sources", [])}
+    current = {os.path.relpath(path, data_path): path for _, path in scan_sequences(data_path)}
+    if set(packed) - set(current):
+        return True
+    # Files skipped for a bad shape are not in the index; only flag them if they changed after packing
+    packed_at = os.path.getmtime(index_path)
+    for rel_path, path in current.items():
+        mtime = os.path.getmtime(path)
+        if rel_path in packed:
+            if packed[rel_path] != mtime:
+                return True
+        elif mtime > packed_at:
+            return True
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack processed .npy sequences (or a recording store) into one memory-mappable shard.")
+    parser.add_argument("--data-path", default=DATA_PATH)
+    parser.add_argument("--shard", default=SHARD_PATH, help="output path prefix (.bin/.json are appended)")
+    parser.add_argument("--dtype", choices=["float32", "float16"], default="float32")
+    parser.add_argument("--sequence-length", type=int, default=SEQUENCE_LENGTH)
+    parser.add_argument("--max-missed", type=float, default=MAX_MISSED_FRACTION,
+                        help="recording stores only: largest share of frames without hands in a window")
+    args = parser.parse_args()
+
+    pack_sequences(args.data_path, args.shard, dtype=args.dtype, sequence_length=args.sequence_length,
+                   max_missed=args.max_missed)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,181 @@
+import time
+import queue
+import argparse
+import threading
+from contextlib import contextmanager
+
 import cv2
 import mediapipe as mp
 
+from frame_sources import add_source_arguments, open_source, source_from_args, sink_from_args
+
 # Initialize MediaPipe hands and drawing utils
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
 
-def detect_hands_from_frame(frame, max_num_hands=2):
-    with mp_hands.Hands(
-        static_image_mode=False,
-        max_num_hands=max_num_hands,
-        min_detection_confidence=0.7,
-        min_tracking_confidence=0.5
-    ) as hands:
+
+class HandDetector:
+    """A persistent MediaPipe Hands graph.
+
+    Building Hands() loads the graph, so it is done once here and reused for
+    every frame. With static_image_mode=False MediaPipe then tracks hands from
+    frame to frame instead of running palm detection every time. One detector
+    belongs to one video stream; use HandDetectorPool to share several between
+    threads or sessions.
+    """
+
+    def __init__(self, max_num_hands=2, min_detection_confidence=0.7, min_tracking_confidence=0.5,
+                 static_image_mode=False):
+        self.hands = mp_hands.Hands(
+            static_image_mode=static_image_mode,
+            max_num_hands=max_num_hands,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence
+        )
+
+    def process(self, frame):
+        """Raw MediaPipe results for one BGR frame."""
         frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(frame_rgb)
+        return self.hands.process(frame_rgb)
 
-        landmarks_list = []
+    def process_frame(self, frame, draw=True):
+        """Returns (frame, landmarks_list) where landmarks_list holds 21 [x, y, z] points per hand."""
+        results = self.process(frame)
 
+        landmarks_list = []
         if results.multi_hand_landmarks:
             for hand_landmarks in results.multi_hand_landmarks:
-                hand_coords = []
-                for lm in hand_landmarks.landmark:
-                    hand_coords.append([lm.x, lm.y, lm.z])
-                landmarks_list.append(hand_coords)
-                # Draw landmarks on the frame
-                mp_drawing.draw_landmarks(
-                    frame, hand_landmarks, mp_hands.HAND_CONNECTIONS
-                )
+                landmarks_list.append([[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark])
+                if draw:
+                    # Draw landmarks on the frame
+                    mp_drawing.draw_landmarks(
+                        frame, hand_landmarks, mp_hands.HAND_CONNECTIONS
+                    )
         return frame, landmarks_list
 
-def main():
-    cap = cv2.VideoCapture(0)
-    while cap.isOpened():
-        ret, frame = cap.read()
+    def process_batch(self, frames, draw=False):
+        """process_frame() over consecutive frames of one stream, keeping tracking state between them."""
+        return [self.process_frame(frame, draw=draw) for frame in frames]
+
+    def close(self):
+        self.hands.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class HandDetectorPool:
+    """A fixed set of HandDetectors handed out to threads or sessions one at a time."""
+
+    def __init__(self, size, **detector_kwargs):
+        self.detectors = [HandDetector(**detector_kwargs) for _ in range(size)]
+        self.available = queue.Queue()
+        for detector in self.detectors:
+            self.available.put(detector)
+
+    def acquire(self, timeout=None):
+        return self.available.get(timeout=timeout)
+
+    def release(self, detector):
+        self.available.put(detector)
+
+    @contextmanager
+    def detector(self, timeout=None):
+        detector = self.acquire(timeout)
+        try:
+            yield detector
+        finally:
+            self.release(detector)
+
+    def close(self):
+        for detector in self.detectors:
+            detector.close()
+
+
+_default_detectors = {}
+_default_lock = threading.Lock()
+
+
+def detect_hands_from_frame(frame, max_num_hands=2):
+    # Reuses one detector per thread instead of rebuilding Hands() on every call
+    key = (threading.get_ident(), max_num_hands)
+    with _default_lock:
+        detector = _default_detectors.get(key)
+        if detector is None:
+            detector = _default_detectors[key] = HandDetector(max_num_hands=max_num_hands)
+    return detector.process_frame(frame)
+
+
+def _per_call_process_frame(frame, max_num_hands=2):
+    # The original implementation: a fresh Hands graph for every frame (benchmark baseline)
+    with HandDetector(max_num_hands=max_num_hands) as detector:
+        return detector.process_frame(frame, draw=False)
+
+
+def load_benchmark_frames(source, limit):
+    """Frames from a video file or an image folder such as data/A."""
+    frames = []
+    capture = open_source(source)
+    while len(frames) < limit:
+        ret, frame = capture.read()
         if not ret:
             break
-        frame = cv2.flip(frame, 1)
-        frame_with_landmarks, landmarks_list = detect_hands_from_frame(frame, max_num_hands=2)
-        if landmarks_list:
-            print("Frame keypoints:", landmarks_list)
-        cv2.imshow('MediaPipe Hands', frame_with_landmarks)
-        if cv2.waitKey(1) & 0xFF == 27:  # Press 'Esc' to exit.
-            break
+        frames.append(frame)
+    capture.release()
+    return frames
+
+
+def benchmark(source, limit=200):
+    frames = load_benchmark_frames(source, limit)
+    if not frames:
+        print(f"[ERROR] No frames could be read from {source}")
+        return
+
+    started = time.perf_counter()
+    for frame in frames:
+        _per_call_process_frame(frame)
+    per_call_fps = len(frames) / (time.perf_counter() - started)
+
+    with HandDetector() as detector:
+        started = time.perf_counter()
+        detector.process_batch(frames)
+        persistent_fps = len(frames) / (time.perf_counter() - started)
+
+    print(f"[BENCHMARK] {len(frames)} frames from {source}")
+    print(f"  Hands() per call   : {per_call_fps:8.1f} frames/s")
+    print(f"  persistent detector: {persistent_fps:8.1f} frames/s ({persistent_fps / per_call_fps:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show MediaPipe hand landmarks from the webcam (or --source).")
+    parser.add_argument("--benchmark", metavar="SOURCE",
+                        help="compare per-call vs persistent detectors on a video file or image folder")
+    parser.add_argument("--frames", type=int, default=200, help="frames to use for --benchmark")
+    add_source_arguments(parser)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark, args.frames)
+        return
+
+    cap = source_from_args(args)
+    sink = sink_from_args(args, 'MediaPipe Hands')
+    with HandDetector(max_num_hands=2) as detector:
+        while cap.isOpened():
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frame = cv2.flip(frame, 1)
+            frame_with_landmarks, landmarks_list = detector.process_frame(frame)
+            if landmarks_list:
+                print("Frame keypoints:", landmarks_list)
+            if sink.show(frame_with_landmarks, 1) == 27:  # Press 'Esc' to exit.
+                break
     cap.release()
-    cv2.destroyAllWindows()
+    sink.close()
 
 if __name__ == "__main__":
     main()
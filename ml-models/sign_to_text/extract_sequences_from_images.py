@@ -1,67 +1,343 @@
 import os
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import cv2
 import numpy as np
 from mediapipe.python.solutions.hands import Hands
 
+from keypoints import extract_keypoints, NUM_FEATURES
+from landmark_cache import CACHE_PATH, LandmarkCache, settings_tag
+from split_dataset import SPLIT_NAME, load_split, save_split
+
 DATA_DIR = "data"
 OUTPUT_DIR = "processed_sequences"
 SEQUENCE_LENGTH = 50
+SEQUENCES_PER_CHUNK = 4  # images per work item = SEQUENCE_LENGTH * SEQUENCES_PER_CHUNK
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# One Hands instance and cache connection per worker process (see _init_worker)
+_hands = None
+_hands_settings = None
+_cache = None
+
+
+# --- MANIFEST ---
+def load_manifest(output_dir):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    return {"version": MANIFEST_VERSION, "images": {}, "chunks": {}}
+
+
+def save_manifest(manifest, output_dir):
+    # Write to a temp file first so an interrupted run never leaves a broken manifest
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+
+def file_digest(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def image_fingerprint(manifest, rel_path, full_path):
+    """Return the content hash of an image, re-hashing only if mtime/size changed."""
+    st = os.stat(full_path)
+    entry = manifest["images"].get(rel_path)
+    if entry and entry["mtime"] == st.st_mtime and entry["size"] == st.st_size:
+        return entry["sha1"]
+    digest = file_digest(full_path)
+    manifest["images"][rel_path] = {"mtime": st.st_mtime, "size": st.st_size, "sha1": digest}
+    return digest
+
+
+# --- WORK PLANNING ---
+def plan_tasks(data_dir, output_dir, manifest, shard, force=False, sequence_length=SEQUENCE_LENGTH, split=None):
+    """Split the data tree into work items and drop the ones whose inputs are unchanged.
+
+    Each task covers a run of consecutive images that is a whole number of
+    sequences long, so sequence numbering is identical to a serial run.
+    split maps "label/image" to "train"/"val" (see split_dataset.py); images
+    it does not list are left out.
+    """
+    chunk_images = sequence_length * SEQUENCES_PER_CHUNK
+    seen_images, seen_chunks = set(), set()
+    tasks, skipped = [], 0
+
+    for label in sorted(os.listdir(data_dir)):
+        input_folder = os.path.join(data_dir, label)
+        if not os.path.isdir(input_folder):
+            continue
+        filenames = sorted(os.listdir(input_folder))
+
+        # With a split manifest, train and val images become separate runs, so no sequence mixes both
+        if split is None:
+            parts = [(None, filenames)]
+        else:
+            parts = [(part, [name for name in filenames if split.get(f"{label}/{name}") == part])
+                     for part in ("train", "val")]
+        seq_base = 0
+
+        for part, part_files in parts:
+            step = len(part_files) if shard == "class" else chunk_images
+            step = max(step, sequence_length)
+
+            for start in range(0, len(part_files), step):
+                chunk_files = part_files[start:start + step]
+                rel_paths = [f"{label}/{name}" for name in chunk_files]
+                seen_images.update(rel_paths)
+
+                h = hashlib.sha1(f"{sequence_length}:{shard}:{step}".encode())
+                digests = []
+                for rel_path, name in zip(rel_paths, chunk_files):
+                    digest = image_fingerprint(manifest, rel_path, os.path.join(input_folder, name))
+                    digests.append(digest)
+                    h.update(f"{rel_path}:{digest}\n".encode())
+                chunk_digest = h.hexdigest()
+
+                chunk_key = f"{label}/{start}" if part is None else f"{label}/{part}/{start}"
+                seen_chunks.add(chunk_key)
+                start_seq = seq_base + start // sequence_length
+                previous = manifest["chunks"].get(chunk_key)
+                outputs_present = previous is not None and all(
+                    os.path.exists(os.path.join(output_dir, label, f"seq_{n}.npy"))
+                    for n in previous["sequences"]
+                )
+                if not force and previous and previous["digest"] == chunk_digest and outputs_present:
+                    skipped += 1
+                    continue
+
+                tasks.append({
+                    "key": chunk_key,
+                    "digest": chunk_digest,
+                    "label": label,
+                    "split": part,
+                    "start_seq": start_seq,
+                    "files": [os.path.join(input_folder, name) for name in chunk_files],
+                    "digests": digests,
+                    "sequence_length": sequence_length,
+                    "output_folder": os.path.join(output_dir, label),
+                })
+            seq_base += -(-len(part_files) // sequence_length)
+
+    # Forget images and chunks that disappeared since the last run
+    for rel_path in list(manifest["images"]):
+        if rel_path not in seen_images:
+            del manifest["images"][rel_path]
+    for chunk_key in list(manifest["chunks"]):
+        if chunk_key not in seen_chunks:
+            del manifest["chunks"][chunk_key]
+
+    return tasks, skipped
+
+
+# --- WORKERS ---
+def _init_worker(min_detection_confidence, cache_path=None, cache_max_bytes=None, cache_tag=""):
+    global _hands_settings, _cache
+    _hands_settings = dict(static_image_mode=True, max_num_hands=2,
+                           min_detection_confidence=min_detection_confidence)
+    if cache_path:
+        _cache = LandmarkCache(cache_path, tag=cache_tag, max_bytes=cache_max_bytes)
+
+
+def _get_hands():
+    # Built on first cache miss, so fully cached re-runs never load the MediaPipe graph
+    global _hands
+    if _hands is None:
+        _hands = Hands(**_hands_settings)
+    return _hands
 
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-def extract_keypoints(results):
-    # 21 landmarks per hand, 3 values (x, y, z) each
-    left_hand = np.zeros(21 * 3)
-    right_hand = np.zeros(21 * 3)
-
-    # mediapipe Hands returns a list of hand_landmarks, but does not label left/right
-    # We'll assign the first hand as right, second as left (mediapipe convention)
-    if results.multi_hand_landmarks and results.multi_handedness:
-        for idx, handedness in enumerate(results.multi_handedness):
-            label = handedness.classification[0].label
-            hand_landmarks = results.multi_hand_landmarks[idx]
-            keypoints = np.array([[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark]).flatten()
-            if label.lower() == "left":
-                left_hand = keypoints
+
+def image_keypoints(filepath, digest):
+    """Keypoints for one image (from the cache if possible), or None if it cannot be decoded."""
+    if _cache is not None:
+        keypoints = _cache.get(digest)
+        if keypoints is not None:
+            return keypoints if keypoints.size else None
+
+    image = cv2.imread(filepath)
+    if image is None:
+        keypoints = None
+    else:
+        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        keypoints = extract_keypoints(_get_hands().process(rgb))
+
+    if _cache is not None:
+        _cache.put(digest, keypoints)
+    return keypoints
+
+
+def process_chunk(task):
+    os.makedirs(task["output_folder"], exist_ok=True)
+    started = time.perf_counter()
+    sequence_length = task["sequence_length"]
+    hits_before = _cache.hits if _cache is not None else 0
+
+    frames = []
+    count = task["start_seq"]
+    saved = []
+    images = 0
+
+    for filepath, digest in zip(task["files"], task["digests"]):
+        keypoints = image_keypoints(filepath, digest)
+        if keypoints is None:
+            continue
+        images += 1
+        frames.append(keypoints)
+
+        if len(frames) == sequence_length:
+            seq_array = np.array(frames)
+            if seq_array.shape == (sequence_length, NUM_FEATURES):
+                np.save(os.path.join(task["output_folder"], f"seq_{count}.npy"), seq_array)
+                saved.append(count)
             else:
-                right_hand = keypoints
-    elif results.multi_hand_landmarks:
-        # If handedness info is missing, just fill right hand
-        keypoints = np.array([[lm.x, lm.y, lm.z] for lm in results.multi_hand_landmarks[0].landmark]).flatten()
-        right_hand = keypoints
-
-    return np.concatenate([left_hand, right_hand])  # shape (126,)
-
-with Hands(static_image_mode=True, max_num_hands=2, min_detection_confidence=0.5) as hands:
-    for label in os.listdir(DATA_DIR):
-        input_folder = os.path.join(DATA_DIR, label)
-        output_folder = os.path.join(OUTPUT_DIR, label)
-        os.makedirs(output_folder, exist_ok=True)
-
-        frames = []
-        count = 0
-        print(f"\nProcessing class: '{label}'")
-
-        for filename in sorted(os.listdir(input_folder)):
-            filepath = os.path.join(input_folder, filename)
-            image = cv2.imread(filepath)
-            if image is None:
-                continue
-            rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            result = hands.process(rgb)
-
-            keypoints = extract_keypoints(result)
-            frames.append(keypoints)
-
-            if len(frames) == SEQUENCE_LENGTH:
-                seq_array = np.array(frames)
-                if seq_array.shape == (SEQUENCE_LENGTH, 126):
-                    seq_filename = os.path.join(output_folder, f"seq_{count}.npy")
-                    np.save(seq_filename, seq_array)
-                    print(f"Saved: {seq_filename}")
-                else:
-                    print(f"[SKIPPED] Sequence shape {seq_array.shape} is not (50, 126)")
-                frames = []
-                count += 1
-
-        print(f"✅ Completed '{label}' - {count} sequences created.")
+                print(f"[SKIPPED] Sequence shape {seq_array.shape} is not ({sequence_length}, {NUM_FEATURES})")
+            frames = []
+            count += 1
+
+    if _cache is not None:
+        _cache.flush()
+
+    return {
+        "key": task["key"],
+        "digest": task["digest"],
+        "label": task["label"],
+        "split": task.get("split"),
+        "sequences": saved,
+        "images": images,
+        "cache_hits": (_cache.hits - hits_before) if _cache is not None else 0,
+        "elapsed": time.perf_counter() - started,
+        "pid": os.getpid(),
+    }
+
+
+def remove_stale_sequences(data_dir, output_dir, manifest):
+    """Delete seq_<n>.npy files that no chunk in the manifest produced anymore."""
+    expected = {}
+    for chunk_key, chunk in manifest["chunks"].items():
+        label = chunk_key.split("/", 1)[0]
+        expected.setdefault(label, set()).update(f"seq_{n}.npy" for n in chunk["sequences"])
+
+    # Only touch classes that are still part of the source tree
+    for label in os.listdir(data_dir):
+        folder = os.path.join(output_dir, label)
+        if not os.path.isdir(folder):
+            continue
+        for filename in os.listdir(folder):
+            if filename.startswith("seq_") and filename.endswith(".npy") \
+                    and filename not in expected.get(label, set()):
+                os.remove(os.path.join(folder, filename))
+                print(f"[REMOVED] Stale sequence {label}/{filename}")
+
+
+def write_sequence_split(output_dir, manifest, image_split):
+    """Carry the image-level split over to the extracted sequences, for train_model.py --split."""
+    parts = {"train": [], "val": []}
+    for chunk_key, chunk in sorted(manifest["chunks"].items()):
+        if chunk.get("split") in parts:
+            label = chunk_key.split("/", 1)[0]
+            parts[chunk["split"]].extend(f"{label}/seq_{n}.npy" for n in chunk["sequences"])
+    split = {key: value for key, value in image_split.items() if key not in ("train", "val")}
+    split.update(parts, labels=sorted({path.split("/", 1)[0] for path in parts["train"] + parts["val"]}))
+    path = os.path.join(output_dir, SPLIT_NAME)
+    save_split(split, path)
+    print(f"[INFO] Sequence split: {len(parts['train'])} train / {len(parts['val'])} val -> {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract hand keypoint sequences from image folders.")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="number of extraction processes (1 = run in this process)")
+    parser.add_argument("--shard", choices=["chunk", "class"], default="chunk",
+                        help="split work by image chunk or by whole class")
+    parser.add_argument("--min-detection-confidence", type=float, default=0.5)
+    parser.add_argument("--force", action="store_true", help="ignore the manifest and re-extract everything")
+    parser.add_argument("--sequence-length", type=int, default=SEQUENCE_LENGTH)
+    parser.add_argument("--cache", default=CACHE_PATH, help="per-image landmark cache (SQLite file)")
+    parser.add_argument("--cache-max-mb", type=int, default=1024, help="evict least recently used entries above this")
+    parser.add_argument("--no-cache", action="store_true", help="always decode images and run MediaPipe")
+    parser.add_argument("--split", metavar="MANIFEST", default=None,
+                        help=f"image split from split_dataset.py (e.g. {DATA_DIR}/{SPLIT_NAME}); builds train and "
+                             f"val sequences separately and writes <output-dir>/{SPLIT_NAME}")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    manifest = load_manifest(args.output_dir)
+    image_split = load_split(args.split) if args.split else None
+    split_of = None
+    if image_split is not None:
+        split_of = {path: part for part in ("train", "val") for path in image_split[part]}
+
+    tasks, skipped = plan_tasks(args.data_dir, args.output_dir, manifest, args.shard, force=args.force,
+                                sequence_length=args.sequence_length, split=split_of)
+    print(f"[INFO] {len(tasks)} chunks to process, {skipped} unchanged chunks skipped.")
+
+    # Cached keypoints are only valid for the same MediaPipe version and detection settings
+    worker_args = (args.min_detection_confidence,)
+    if not args.no_cache:
+        tag = settings_tag(static_image_mode=True, max_num_hands=2,
+                           min_detection_confidence=args.min_detection_confidence)
+        worker_args += (args.cache, args.cache_max_mb * 1024 * 1024, tag)
+
+    per_worker = {}
+    cache_hits = 0
+    started = time.perf_counter()
+
+    def record(result):
+        nonlocal cache_hits
+        cache_hits += result["cache_hits"]
+        manifest["chunks"][result["key"]] = {"digest": result["digest"], "sequences": result["sequences"],
+                                             "split": result["split"]}
+        save_manifest(manifest, args.output_dir)
+        stats = per_worker.setdefault(result["pid"], {"images": 0, "elapsed": 0.0})
+        stats["images"] += result["images"]
+        stats["elapsed"] += result["elapsed"]
+        rate = result["images"] / result["elapsed"] if result["elapsed"] > 0 else 0.0
+        print(f"✅ {result['key']} - {len(result['sequences'])} sequences "
+              f"({result['images']} images, {result['cache_hits']} cached, {rate:.1f} img/s, worker {result['pid']})")
+
+    if args.workers <= 1:
+        _init_worker(*worker_args)
+        for task in tasks:
+            record(process_chunk(task))
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                                 initargs=worker_args) as pool:
+            futures = [pool.submit(process_chunk, task) for task in tasks]
+            for future in as_completed(futures):
+                record(future.result())
+
+    remove_stale_sequences(args.data_dir, args.output_dir, manifest)
+    save_manifest(manifest, args.output_dir)
+    if image_split is not None:
+        write_sequence_split(args.output_dir, manifest, image_split)
+
+    total_images = sum(s["images"] for s in per_worker.values())
+    wall = time.perf_counter() - started
+    print("\n[INFO] Per-worker throughput:")
+    for pid, stats in sorted(per_worker.items()):
+        rate = stats["images"] / stats["elapsed"] if stats["elapsed"] > 0 else 0.0
+        print(f"  worker {pid}: {stats['images']} images in {stats['elapsed']:.1f}s ({rate:.1f} img/s)")
+    if wall > 0:
+        print(f"[INFO] Total: {total_images} images in {wall:.1f}s ({total_images / wall:.1f} img/s overall), "
+              f"{cache_hits} from the landmark cache")
+
+
+if __name__ == "__main__":
+    main()
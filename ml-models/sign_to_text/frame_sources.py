@@ -0,0 +1,228 @@
+import os
+import glob
+import time
+
+import cv2
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+NETWORK_SCHEMES = ("rtsp://", "rtmp://", "http://", "https://", "udp://", "tcp://")
+
+
+class FrameSource:
+    """cv2.VideoCapture-style source: read() -> (ok, frame).
+
+    live:  frames arrive on their own clock and old ones are worth dropping
+           (webcam, network stream, or a file replayed in real time). Pipelines
+           use drop-oldest queues for live sources and process every frame otherwise.
+    fps:   nominal frame rate used for real-time pacing, if known.
+    finished: set once a file or folder has run out, so live pipelines stop
+           instead of retrying the read like they would for a flaky camera.
+    """
+
+    live = False
+    fps = None
+    finished = False
+
+    def __init__(self, realtime=False):
+        self.realtime = realtime
+        self.started = None
+        self.delivered = 0
+
+    def _read(self):
+        raise NotImplementedError
+
+    def read(self):
+        ok, frame = self._read()
+        if ok and self.realtime and self.fps:
+            # Pace to the nominal frame rate instead of reading as fast as possible
+            now = time.monotonic()
+            if self.started is None:
+                self.started = now
+            due = self.started + self.delivered / self.fps
+            if due > now:
+                time.sleep(due - now)
+        if ok:
+            self.delivered += 1
+        return ok, frame
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+
+class CaptureSource(FrameSource):
+    """Anything cv2.VideoCapture opens: webcam index, video file or network URL."""
+
+    def __init__(self, target, live, realtime=False, fps=None):
+        super().__init__(realtime=realtime)
+        self.target = target
+        self.live = live
+        self.cap = cv2.VideoCapture(target)
+        self.fps = fps or self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    def _read(self):
+        return self.cap.read()
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class WebcamSource(CaptureSource):
+    def __init__(self, index=0):
+        # The camera paces itself; never add sleeps
+        super().__init__(index, live=True, realtime=False)
+
+
+class VideoFileSource(CaptureSource):
+    def __init__(self, path, realtime=False, fps=None, loop=False):
+        super().__init__(path, live=realtime, realtime=realtime, fps=fps)
+        self.loop = loop
+
+    def _read(self):
+        ok, frame = self.cap.read()
+        if not ok and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.cap.read()
+        self.finished = not ok
+        return ok, frame
+
+
+class NetworkStreamSource(CaptureSource):
+    """RTSP/HTTP/UDP stream (or a local stand-in such as an ffmpeg/mediamtx restream)."""
+
+    def __init__(self, url, reconnect_after=30):
+        super().__init__(url, live=True, realtime=False)
+        self.reconnect_after = reconnect_after
+        self.failures = 0
+
+    def _read(self):
+        ok, frame = self.cap.read()
+        if ok:
+            self.failures = 0
+            return ok, frame
+        self.failures += 1
+        if self.failures >= self.reconnect_after:
+            self.cap.release()
+            self.cap = cv2.VideoCapture(self.target)
+            self.failures = 0
+        return False, None
+
+
+class ImageFolderSource(FrameSource):
+    """Images in a folder such as data/<label>/, in sorted order, as if they were video frames."""
+
+    def __init__(self, path, realtime=False, fps=10.0, loop=False):
+        super().__init__(realtime=realtime)
+        self.live = realtime
+        self.fps = fps
+        self.loop = loop
+        self.paths = sorted(p for p in glob.glob(os.path.join(path, "*"))
+                            if p.lower().endswith(IMAGE_EXTENSIONS))
+        self.index = 0
+
+    def _read(self):
+        while self.index < len(self.paths) or (self.loop and self.paths):
+            if self.index >= len(self.paths):
+                self.index = 0
+            frame = cv2.imread(self.paths[self.index])
+            self.index += 1
+            if frame is not None:
+                return True, frame
+        self.finished = True
+        return False, None
+
+    def isOpened(self):
+        return bool(self.paths)
+
+
+def open_source(spec=None, realtime=None, fps=None, loop=False):
+    """Build a FrameSource from a CLI-style spec.
+
+    None / "0" / "1"...   webcam index
+    rtsp://, http://...   network stream
+    a directory           image folder (e.g. data/A)
+    anything else         video file
+
+    realtime defaults to False for files and folders (process as fast as
+    possible, every frame) and is ignored for webcams and network streams.
+    """
+    if spec is None or str(spec).isdigit():
+        return WebcamSource(int(spec or 0))
+    if str(spec).startswith(NETWORK_SCHEMES):
+        return NetworkStreamSource(spec)
+    if os.path.isdir(spec):
+        return ImageFolderSource(spec, realtime=bool(realtime), fps=fps or 10.0, loop=loop)
+    return VideoFileSource(spec, realtime=bool(realtime), fps=fps, loop=loop)
+
+
+class WindowSink:
+    """Preview window; show() returns the pressed key (& 0xFF) or -1."""
+
+    def __init__(self, title):
+        self.title = title
+
+    def show(self, frame, wait_ms=1):
+        cv2.imshow(self.title, frame)
+        return cv2.waitKey(wait_ms) & 0xFF
+
+    def close(self):
+        cv2.destroyAllWindows()
+
+
+class NullSink:
+    """Headless sink: drops frames (optionally writing them to a video) and counts throughput."""
+
+    def __init__(self, record_path=None, fps=30.0):
+        self.frames = 0
+        self.started = time.monotonic()
+        self.writer = None
+        self.record_path = record_path
+        self.record_fps = fps
+
+    def show(self, frame, wait_ms=1):
+        if self.record_path is not None:
+            if self.writer is None:
+                height, width = frame.shape[:2]
+                self.writer = cv2.VideoWriter(self.record_path, cv2.VideoWriter_fourcc(*"mp4v"),
+                                              self.record_fps, (width, height))
+            self.writer.write(frame)
+        self.frames += 1
+        return -1
+
+    @property
+    def fps(self):
+        elapsed = time.monotonic() - self.started
+        return self.frames / elapsed if elapsed > 0 else 0.0
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+        print(f"[INFO] Headless sink: {self.frames} frames at {self.fps:.1f} fps")
+
+
+def add_source_arguments(parser):
+    """The shared --source/--headless options of the live scripts."""
+    parser.add_argument("--source", default=None,
+                        help="webcam index, video file, image folder (e.g. data/A) or rtsp:// / http:// URL")
+    parser.add_argument("--video", dest="source", help="alias for --source")
+    parser.add_argument("--realtime", action="store_true",
+                        help="pace files/folders at their frame rate (and drop frames when behind)")
+    parser.add_argument("--fps", type=float, default=None, help="frame rate for --realtime pacing")
+    parser.add_argument("--loop", action="store_true", help="restart files/folders at the end")
+    parser.add_argument("--headless", action="store_true", help="no preview window; print results instead")
+    parser.add_argument("--record", default=None, help="with --headless, write annotated frames to this video")
+
+
+def source_from_args(args):
+    return open_source(args.source, realtime=args.realtime, fps=args.fps, loop=args.loop)
+
+
+def sink_from_args(args, title):
+    if args.headless:
+        return NullSink(record_path=args.record)
+    return WindowSink(title)
@@ -0,0 +1,46 @@
+import numpy as np
+
+from keypoints import NUM_LANDMARKS
+
+WRIST = 0
+MIDDLE_MCP = 9
+FINGERTIPS = [4, 8, 12, 16, 20]
+_TIP_PAIRS = np.array([(a, b) for i, a in enumerate(FINGERTIPS) for b in FINGERTIPS[i + 1:]])
+
+
+def split_hands(keypoints):
+    """(..., 126) keypoint rows -> (..., 2, 21, 3) left/right landmark arrays (a view)."""
+    keypoints = np.asarray(keypoints, dtype=np.float32)
+    return keypoints.reshape(keypoints.shape[:-1] + (2, NUM_LANDMARKS, 3))
+
+
+def normalize_hands(keypoints, eps=1e-6):
+    """Wrist-relative, scale-normalized landmarks for any batch shape.
+
+    Every hand is translated so its wrist is the origin and divided by its
+    palm size (wrist to middle-finger MCP), which removes camera distance and
+    position. Returns (landmarks (..., 2, 21, 3), presence (..., 2) bool);
+    missing hands stay all zeros.
+    """
+    hands = split_hands(keypoints)
+    present = hands.any(axis=(-2, -1))
+    relative = hands - hands[..., WRIST:WRIST + 1, :]
+    palm = np.linalg.norm(relative[..., MIDDLE_MCP, :2], axis=-1)
+    scale = np.where(present, np.maximum(palm, eps), 1.0)
+    return relative / scale[..., np.newaxis, np.newaxis], present
+
+
+def frame_features(keypoints):
+    """Single-frame handshape features: normalized coordinates, fingertip distances and hand presence.
+
+    (..., 126) -> (..., 148); works for one frame or whole batches.
+    """
+    normalized, present = normalize_hands(keypoints)
+    tips = normalized[..., _TIP_PAIRS[:, 0], :] - normalized[..., _TIP_PAIRS[:, 1], :]
+    distances = np.linalg.norm(tips, axis=-1)  # (..., 2, 10)
+    batch_shape = normalized.shape[:-3]
+    return np.concatenate([
+        normalized.reshape(batch_shape + (-1,)),
+        distances.reshape(batch_shape + (-1,)),
+        present.astype(np.float32),
+    ], axis=-1)
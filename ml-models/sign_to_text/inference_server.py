@@ -0,0 +1,108 @@
+import json
+import time
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from micro_batcher import MicroBatcher
+from model_runtime import SEQUENCE_LENGTH, NUM_FEATURES, load_actions, load_classifier
+
+MODEL_PATH = "lstm_sign_model.h5"
+ACTIONS_PATH = "actions.json"
+
+
+class InferenceHandler(BaseHTTPRequestHandler):
+    # Filled in by main() before the server starts
+    batcher = None
+    actions = None
+    window_shape = (SEQUENCE_LENGTH, NUM_FEATURES)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            self._send_json(200, self.batcher.stats.snapshot())
+        elif self.path == "/healthz":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send_json(404, {"error": "not found"})
+            return
+        started = time.monotonic()
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+            window = np.asarray(request["window"], dtype=np.float32)
+        except (ValueError, KeyError, TypeError) as exc:
+            self._send_json(400, {"error": f"bad request: {exc}"})
+            return
+        if window.shape != self.window_shape:
+            self._send_json(400, {"error": f"window must have shape {list(self.window_shape)}, got {list(window.shape)}"})
+            return
+
+        try:
+            probs = self.batcher.predict(window)
+        except Exception as exc:  # a model error from the batch, or the batcher closing on shutdown
+            self._send_json(500, {"error": f"prediction failed: {exc}"})
+            return
+        best = int(np.argmax(probs))
+        self._send_json(200, {
+            "session": request.get("session"),
+            "label": self.actions[best],
+            "confidence": float(probs[best]),
+            "latency_ms": (time.monotonic() - started) * 1000,
+        })
+
+    def log_message(self, format, *args):
+        # Per-request access logs would dominate the cost of small requests
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-batching HTTP inference server for the sign model.")
+    parser.add_argument("--model", default=MODEL_PATH, help=".h5/.keras or .tflite model")
+    parser.add_argument("--actions", default=ACTIONS_PATH)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-latency-ms", type=float, default=5.0,
+                        help="longest a request waits for its batch to fill before it is dispatched")
+    parser.add_argument("--num-threads", type=int, default=None, help="TFLite interpreter threads")
+    args = parser.parse_args()
+
+    classifier = load_classifier(args.model, num_threads=args.num_threads)
+    batcher = MicroBatcher(classifier.predict_batch, args.max_batch_size, args.max_latency_ms)
+    # Warm up so the first client does not pay for graph tracing
+    batcher.predict(np.zeros((SEQUENCE_LENGTH, NUM_FEATURES), dtype=np.float32))
+
+    InferenceHandler.batcher = batcher
+    # Prefer the labels embedded in an exported .tflite over actions.json
+    metadata = getattr(classifier, "metadata", None)
+    InferenceHandler.actions = metadata["labels"] if metadata else load_actions(args.actions)
+    InferenceHandler.window_shape = tuple(classifier.input_shape)
+
+    server = ThreadingHTTPServer((args.host, args.port), InferenceHandler)
+    server.daemon_threads = True
+    print(f"[INFO] Serving {args.model} on http://{args.host}:{args.port} "
+          f"(POST /predict, GET /metrics; batch<={args.max_batch_size}, wait<={args.max_latency_ms}ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("[STOPPED] Shutting down.")
+    finally:
+        server.server_close()
+        batcher.close()
+
+
+if __name__ == "__main__":
+    main()
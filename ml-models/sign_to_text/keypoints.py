@@ -0,0 +1,198 @@
+import time
+import argparse
+from itertools import chain
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+HAND_FEATURES = NUM_LANDMARKS * 3   # x, y, z per landmark
+NUM_FEATURES = 2 * HAND_FEATURES     # [left hand | right hand]
+LEFT_SLOT = slice(0, HAND_FEATURES)
+RIGHT_SLOT = slice(HAND_FEATURES, NUM_FEATURES)
+
+
+def hand_to_array(hand_landmarks, out=None):
+    """Flatten one MediaPipe hand into 63 float32 values, optionally in place."""
+    values = np.fromiter(
+        chain.from_iterable((lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark),
+        dtype=np.float32, count=HAND_FEATURES,
+    )
+    if out is None:
+        return values
+    out[:] = values
+    return out
+
+
+def extract_keypoints(results, out=None):
+    """The shared 126-dim feature vector: left hand in [0:63], right hand in [63:126].
+
+    Hands are slotted by MediaPipe's handedness label, the same way the
+    training sequences were extracted. Without handedness the first hand goes
+    to the right slot; if both hands carry the same label the second one takes
+    the free slot. Missing hands are zeros. Pass `out` (e.g. a ring buffer row)
+    to avoid allocating per frame.
+    """
+    if out is None:
+        out = np.zeros(NUM_FEATURES, dtype=np.float32)
+        zeroed = True
+    else:
+        zeroed = False
+
+    hands = results.multi_hand_landmarks
+    handedness = results.multi_handedness
+    filled = [False, False]  # left, right
+    if hands and not handedness:
+        hand_to_array(hands[0], out[RIGHT_SLOT])
+        filled[1] = True
+    elif hands:
+        for hand_landmarks, classification in zip(hands[:2], handedness[:2]):
+            slot = 0 if classification.classification[0].label.lower() == "left" else 1
+            if filled[slot]:
+                slot = 1 - slot
+            filled[slot] = True
+            hand_to_array(hand_landmarks, out[RIGHT_SLOT if slot else LEFT_SLOT])
+
+    # Only clear what was not just overwritten
+    if not zeroed:
+        if not filled[0]:
+            out[LEFT_SLOT] = 0.0
+        if not filled[1]:
+            out[RIGHT_SLOT] = 0.0
+    return out
+
+
+class KeypointRingBuffer:
+    """Preallocated float32 sliding window of keypoint frames.
+
+    Every frame is written twice (at i and i + capacity), so window() is always
+    a contiguous (capacity, 126) view, oldest frame first, with no copy or
+    per-frame allocation.
+    """
+
+    def __init__(self, capacity, num_features=NUM_FEATURES):
+        self.capacity = capacity
+        self.data = np.zeros((2 * capacity, num_features), dtype=np.float32)
+        self.pos = 0    # next slot to write
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def full(self):
+        return self.count == self.capacity
+
+    def clear(self):
+        self.pos = 0
+        self.count = 0
+
+    def _commit(self):
+        row = self.data[self.pos]
+        self.data[self.pos + self.capacity] = row
+        self.pos = (self.pos + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        return row
+
+    def push(self, results):
+        """Extract MediaPipe results straight into the next slot; returns that row (a view)."""
+        extract_keypoints(results, out=self.data[self.pos])
+        return self._commit()
+
+    def append(self, keypoints):
+        self.data[self.pos] = keypoints
+        return self._commit()
+
+    def window(self):
+        """The last len(self) frames, oldest first, as a view into the buffer."""
+        start = self.pos + self.capacity - self.count
+        return self.data[start:start + self.count]
+
+    def interpolate_gap(self, gap):
+        """Linearly re-fill the `gap` frames before the newest one from their two neighbours.
+
+        Used after frames were skipped and held at the previous keypoints. A
+        hand slot is only blended when it is present at both ends; otherwise
+        the held values stay.
+        """
+        gap = min(gap, self.count - 2)
+        if gap <= 0:
+            return
+        window = self.window()
+        before, after = window[-gap - 2], window[-1]
+        weights = np.arange(1, gap + 1, dtype=np.float32)[:, np.newaxis] / (gap + 1)
+        blended = before + (after - before) * weights
+        for slot in (LEFT_SLOT, RIGHT_SLOT):
+            if before[slot].any() and after[slot].any():
+                window[-gap - 1:-1, slot] = blended[:, slot]
+        # Keep the mirrored copy of each rewritten row in sync
+        end = self.pos + self.capacity - 1
+        for row in range(end - gap, end):
+            mirror = row - self.capacity if row >= self.capacity else row + self.capacity
+            self.data[mirror] = self.data[row]
+
+
+# --- MICRO-BENCHMARK ---
+class _Landmark:
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y, z):
+        self.x, self.y, self.z = x, y, z
+
+
+class _Hand:
+    def __init__(self, rng):
+        self.landmark = [_Landmark(*rng.random(3).tolist()) for _ in range(NUM_LANDMARKS)]
+
+
+class _Category:
+    def __init__(self, label):
+        self.label = label
+
+
+class _Classification:
+    def __init__(self, label):
+        self.classification = [_Category(label)]
+
+
+class _Results:
+    def __init__(self, rng, num_hands):
+        self.multi_hand_landmarks = [_Hand(rng) for _ in range(num_hands)] or None
+        self.multi_handedness = [_Classification(label) for label in ("Right", "Left")[:num_hands]] or None
+
+
+def _loop_keypoints(results):
+    # The previous per-landmark Python implementation (predict_sign / record_sign)
+    keypoints = []
+    if results.multi_hand_landmarks:
+        for hand in results.multi_hand_landmarks[:2]:
+            pts = np.array([[lm.x, lm.y, lm.z] for lm in hand.landmark])
+            keypoints.append(pts.flatten())
+    while len(keypoints) < 2:
+        keypoints.append(np.zeros(63))
+    return np.concatenate(keypoints)
+
+
+def benchmark(frames=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    samples = [_Results(rng, int(n)) for n in rng.integers(0, 3, size=256)]
+    buffer = KeypointRingBuffer(50)
+
+    def run(fn):
+        started = time.perf_counter()
+        for i in range(frames):
+            fn(samples[i % len(samples)])
+        return (time.perf_counter() - started) / frames * 1e6
+
+    loop_us = run(_loop_keypoints)
+    alloc_us = run(extract_keypoints)
+    ring_us = run(buffer.push)
+    print(f"[BENCHMARK] {frames} synthetic frames (0-2 hands)")
+    print(f"  per-landmark loop          : {loop_us:7.2f} us/frame")
+    print(f"  extract_keypoints()        : {alloc_us:7.2f} us/frame ({loop_us / alloc_us:.1f}x)")
+    print(f"  KeypointRingBuffer.push()  : {ring_us:7.2f} us/frame ({loop_us / ring_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmark keypoint extraction on synthetic landmarks.")
+    parser.add_argument("--frames", type=int, default=20000)
+    benchmark(parser.parse_args().frames)
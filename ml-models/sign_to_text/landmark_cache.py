@@ -0,0 +1,106 @@
+import json
+import time
+import sqlite3
+import hashlib
+
+import numpy as np
+
+CACHE_PATH = "landmark_cache.sqlite"
+DEFAULT_MAX_BYTES = 1 << 30  # 1 GiB
+EXTRACTOR_VERSION = 1  # bump when keypoints.extract_keypoints changes its output
+
+
+def settings_tag(**settings):
+    """Short hash of everything besides the image that decides the keypoints."""
+    import mediapipe
+    settings = dict(settings, mediapipe=mediapipe.__version__, extractor=EXTRACTOR_VERSION)
+    return hashlib.sha1(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class LandmarkCache:
+    """Persistent per-image keypoint cache keyed by image content hash + detection settings.
+
+    Entries live in one SQLite file (safe to share between extraction worker
+    processes). When the stored keypoints exceed max_bytes, the least recently
+    used entries are evicted. Images that could not be decoded are cached as
+    empty arrays so they are not re-read either.
+
+    Reads run in autocommit mode and writes (new entries and access times)
+    are buffered until flush(), which applies them in one short transaction,
+    so a worker never holds the write lock while it runs MediaPipe.
+    """
+
+    def __init__(self, path=CACHE_PATH, tag="", max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.tag = tag
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.pending = {}  # key -> (data, last_access), written by flush()
+        self.accessed = {}  # key -> last_access of cache hits, written by flush()
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS keypoints ("
+            " key TEXT PRIMARY KEY, data BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS keypoints_last_access ON keypoints (last_access)")
+
+    def _key(self, digest):
+        return f"{digest}:{self.tag}"
+
+    def get(self, digest):
+        """Cached float32 keypoints for an image hash, an empty array if it was unreadable, or None."""
+        key = self._key(digest)
+        if key in self.pending:
+            self.hits += 1
+            return np.frombuffer(self.pending[key][0], dtype=np.float32)
+        row = self.conn.execute("SELECT data FROM keypoints WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.accessed[key] = time.time()
+        return np.frombuffer(row[0], dtype=np.float32)
+
+    def put(self, digest, keypoints):
+        data = b"" if keypoints is None else np.asarray(keypoints, dtype=np.float32).tobytes()
+        self.pending[self._key(digest)] = (data, time.time())
+
+    def flush(self):
+        """Write buffered entries and access times, and evict LRU entries beyond max_bytes."""
+        if not (self.pending or self.accessed):
+            return
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO keypoints (key, data, size, last_access) VALUES (?, ?, ?, ?)",
+                [(key, data, len(data), accessed) for key, (data, accessed) in self.pending.items()],
+            )
+            self.conn.executemany("UPDATE keypoints SET last_access = ? WHERE key = ?",
+                                  [(accessed, key) for key, accessed in self.accessed.items()])
+            self._evict()
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+        self.pending.clear()
+        self.accessed.clear()
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM keypoints").fetchone()[0]
+        if total > self.max_bytes:
+            # Trim to 90% so eviction does not run again on the next flush
+            excess = total - int(self.max_bytes * 0.9)
+            freed = 0
+            doomed = []
+            for key, size in self.conn.execute("SELECT key, size FROM keypoints ORDER BY last_access"):
+                doomed.append((key,))
+                freed += size
+                if freed >= excess:
+                    break
+            self.conn.executemany("DELETE FROM keypoints WHERE key = ?", doomed)
+
+    def close(self):
+        self.flush()
+        self.conn.close()
@@ -0,0 +1,294 @@
+import os
+import sys
+import json
+import time
+import bisect
+import logging
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LOGGER_NAME = "signbridge"
+# Upper bounds in seconds, from sub-millisecond model steps to slow MediaPipe frames
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.02, 0.035, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+log = logging.getLogger(LOGGER_NAME)
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items()))) if labels else (name, ())
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; observe() is a bisect and three adds."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot: above the largest bucket
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (inf if it is above every bucket)."""
+        if not self.count:
+            return 0.0
+        target, seen = q * self.count, 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.sum / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.quantile(0.5) * 1000,
+            "p99_ms": self.quantile(0.99) * 1000,
+        }
+
+
+class Metrics:
+    """Counters, gauges and latency histograms shared by the recognition threads.
+
+    Recording is a dict lookup and a few adds under one lock, cheap enough for
+    every frame; formatting only happens when a snapshot is exported.
+    Gauges can be callables, read at export time (e.g. rolling FPS).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.started = time.time()
+
+    def inc(self, name, amount=1, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set_gauge(self, name, value, **labels):
+        """value: a number, or a zero-argument callable evaluated on export."""
+        with self.lock:
+            self.gauges[_key(name, labels)] = value
+
+    def observe(self, name, seconds, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    def timer(self, name, **labels):
+        return _Timer(self, name, labels)
+
+    def _gauge_values(self):
+        values = {}
+        for key, value in list(self.gauges.items()):
+            values[key] = value() if callable(value) else value
+        return values
+
+    def snapshot(self):
+        with self.lock:
+            counters = dict(self.counters)
+            histograms = {key: h.snapshot() for key, h in self.histograms.items()}
+        name = lambda key: key[0] + _format_labels(key[1])  # noqa: E731
+        return {
+            "time": time.time(),
+            "uptime_s": time.time() - self.started,
+            "counters": {name(k): v for k, v in counters.items()},
+            "gauges": {name(k): v for k, v in self._gauge_values().items()},
+            "histograms": {name(k): v for k, v in histograms.items()},
+        }
+
+    def prometheus_text(self, prefix=LOGGER_NAME):
+        """Prometheus text exposition format (counters, gauges, histograms in seconds)."""
+        lines, typed = [], set()
+
+        def declare(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self.lock:
+            counters = dict(self.counters)
+            histograms = {key: (h.buckets, list(h.counts), h.count, h.sum) for key, h in self.histograms.items()}
+        for (name, labels), value in sorted(counters.items()):
+            declare(f"{prefix}_{name}", "counter")
+            lines.append(f"{prefix}_{name}{_format_labels(labels)} {value}")
+        for (name, labels), value in sorted(self._gauge_values().items()):
+            declare(f"{prefix}_{name}", "gauge")
+            lines.append(f"{prefix}_{name}{_format_labels(labels)} {float(value):.6g}")
+        for (name, labels), (buckets, counts, count, total) in sorted(histograms.items()):
+            full = f"{prefix}_{name}"
+            declare(full, "histogram")
+            cumulative = 0
+            for bound, n in zip(buckets, counts):
+                cumulative += n
+                lines.append(f"{full}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{full}_bucket{_format_labels(labels, [('le', '+Inf')])} {count}")
+            lines.append(f"{full}_sum{_format_labels(labels)} {total:.6f}")
+            lines.append(f"{full}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "labels", "started")
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.started, **self.labels)
+
+
+def serve_prometheus(metrics, port, host="0.0.0.0"):
+    """Serve GET /metrics in the Prometheus text format from a daemon thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            log.debug("metrics endpoint: " + format, *args)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    log.info("Prometheus metrics on http://%s:%d/metrics", host, port)
+    return server
+
+
+class JsonlExporter:
+    """Appends one metrics snapshot per interval to a JSONL file, from a daemon thread."""
+
+    def __init__(self, metrics, path, interval_s=5.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval_s = interval_s
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="metrics-jsonl", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _write(self):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(self.metrics.snapshot()) + "\n")
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval_s):
+            self._write()
+
+    def close(self):
+        self.stop_event.set()
+        self.thread.join(timeout=2.0)
+        self._write()  # final totals
+
+
+class SamplingProfiler:
+    """Samples the Python stack of every thread at a fixed interval.
+
+    Unlike cProfile (which only sees the thread that enabled it and slows
+    every call), this covers the capture/landmark/classify threads at a small,
+    constant cost. Output is the collapsed-stack format of `py-spy record -f raw`,
+    readable by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, path, interval_s=0.005):
+        self.path = path
+        self.interval_s = interval_s
+        self.samples = Counter()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self.stop_event.wait(self.interval_s):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def close(self):
+        self.stop_event.set()
+        self.thread.join(timeout=2.0)
+        with open(self.path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        print(f"[INFO] {sum(self.samples.values())} stack samples written to {self.path}")
+
+
+def add_metrics_arguments(parser):
+    group = parser.add_argument_group("metrics")
+    group.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                       help="DEBUG adds per-frame details (slow)")
+    group.add_argument("--metrics-port", type=int, default=None, help="serve Prometheus metrics on this port")
+    group.add_argument("--metrics-jsonl", default=None, help="append a metrics snapshot to this file periodically")
+    group.add_argument("--metrics-interval", type=float, default=5.0, help="seconds between JSONL snapshots")
+    group.add_argument("--profile", metavar="PATH", default=None,
+                       help="sample all threads' stacks into PATH (collapsed format for flame graphs)")
+
+
+class MetricsSession:
+    """What add_metrics_arguments() asked for: the Metrics object plus its exporters."""
+
+    def __init__(self, metrics, closers):
+        self.metrics = metrics
+        self.closers = closers
+
+    def close(self):
+        for close in self.closers:
+            close()
+
+
+def metrics_from_args(args):
+    logging.basicConfig(level=getattr(logging, args.log_level), format="[%(levelname)s] %(message)s")
+    metrics = Metrics()
+    closers = []
+    if args.metrics_port is not None:
+        closers.append(serve_prometheus(metrics, args.metrics_port).shutdown)
+    if args.metrics_jsonl:
+        closers.append(JsonlExporter(metrics, args.metrics_jsonl, args.metrics_interval).start().close)
+    if args.profile:
+        closers.append(SamplingProfiler(args.profile).start().close)
+    return MetricsSession(metrics, closers)
@@ -0,0 +1,133 @@
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class LatencyStats:
+    """Thread-safe request counters with a bounded sample of recent latencies."""
+
+    def __init__(self, max_samples=10000):
+        self.lock = threading.Lock()
+        self.samples = deque(maxlen=max_samples)
+        self.started = time.monotonic()
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+
+    def record_batch(self, latencies):
+        with self.lock:
+            self.batches += 1
+            self.requests += len(latencies)
+            self.samples.extend(latencies)
+
+    def record_error(self, count=1):
+        with self.lock:
+            self.errors += count
+
+    def snapshot(self):
+        with self.lock:
+            samples = np.array(self.samples, dtype=np.float64)
+            requests, batches, errors = self.requests, self.batches, self.errors
+        uptime = time.monotonic() - self.started
+        stats = {
+            "requests": requests,
+            "batches": batches,
+            "errors": errors,
+            "mean_batch_size": requests / batches if batches else 0.0,
+            "uptime_s": uptime,
+            "throughput_rps": requests / uptime if uptime > 0 else 0.0,
+        }
+        if len(samples):
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+            stats.update(latency_ms_p50=float(p50) * 1000, latency_ms_p95=float(p95) * 1000,
+                         latency_ms_p99=float(p99) * 1000, latency_ms_max=float(samples.max()) * 1000)
+        return stats
+
+
+class MicroBatcher:
+    """Collects single-window requests from many callers into batched model calls.
+
+    A batch is dispatched as soon as max_batch_size windows are waiting or the
+    oldest waiting window has been queued for max_latency_ms, whichever comes
+    first. submit() returns a concurrent.futures.Future with the probability row.
+    """
+
+    def __init__(self, predict_batch, max_batch_size=32, max_latency_ms=5.0):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000.0
+        self.requests = queue.Queue()
+        self.stats = LatencyStats()
+        self.running = True
+        self.lock = threading.Lock()  # no submit() can slip in between close() and the worker stopping
+        self.worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self.worker.start()
+
+    def submit(self, window):
+        future = Future()
+        window = np.asarray(window, dtype=np.float32)
+        with self.lock:
+            if not self.running:
+                future.set_exception(RuntimeError("MicroBatcher is closed"))
+                return future
+            self.requests.put((window, future, time.monotonic()))
+        return future
+
+    def predict(self, window, timeout=None):
+        return self.submit(window).result(timeout=timeout)
+
+    def close(self):
+        with self.lock:
+            if self.running:
+                self.running = False
+                self.requests.put(None)
+        self.worker.join()
+
+    def _collect(self):
+        item = self.requests.get()
+        if item is None:
+            return []
+        batch = [item]
+        deadline = item[2] + self.max_latency
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                # Past the deadline, still take whatever is already waiting, so a
+                # backlog is cleared in full batches instead of one window at a time
+                item = self.requests.get(timeout=remaining) if remaining > 0 else self.requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self.running = False
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while self.running or not self.requests.empty():
+            batch = self._collect()
+            if not batch:
+                break
+            try:
+                probs = self.predict_batch(np.stack([window for window, _, _ in batch]))
+            except Exception as exc:  # including windows of mismatched shapes
+                self.stats.record_error(len(batch))
+                for _, future, _ in batch:
+                    future.set_exception(exc)
+                continue
+            done = time.monotonic()
+            for row, (_, future, queued) in zip(probs, batch):
+                future.set_result(row)
+            self.stats.record_batch([done - queued for _, _, queued in batch])
+        # Nothing is queued behind the sentinel, but never leave a caller waiting forever
+        while True:
+            try:
+                item = self.requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[1].set_exception(RuntimeError("MicroBatcher is closed"))
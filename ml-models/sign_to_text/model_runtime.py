@@ -0,0 +1,103 @@
+import json
+import zipfile
+
+import numpy as np
+
+SEQUENCE_LENGTH = 50
+NUM_FEATURES = 126
+TFLITE_METADATA_NAME = "signbridge_metadata.json"
+
+
+def write_tflite_model(path, model_bytes, metadata):
+    """Write a .tflite file with labels/input shape embedded as an associated-file zip.
+
+    TFLite ignores bytes after the flatbuffer, and this is the same layout the
+    TFLite metadata tooling uses for associated files, so the model still loads
+    everywhere while zipfile can read the metadata back.
+    """
+    with open(path, "wb") as f:
+        f.write(model_bytes)
+    with zipfile.ZipFile(path, "a") as archive:
+        archive.writestr(TFLITE_METADATA_NAME, json.dumps(metadata))
+        if "labels" in metadata:
+            archive.writestr("labels.txt", "\n".join(metadata["labels"]))
+
+
+def read_tflite_metadata(path):
+    """Metadata embedded by write_tflite_model(), or None for a plain .tflite file."""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            return json.loads(archive.read(TFLITE_METADATA_NAME))
+    except (zipfile.BadZipFile, KeyError):
+        return None
+
+
+class KerasClassifier:
+    """Wraps lstm_sign_model.h5 and predicts whole batches of windows in one call."""
+
+    def __init__(self, model_path):
+        from tensorflow.keras.models import load_model
+        self.model = load_model(model_path)
+        self.input_shape = tuple(self.model.input_shape[1:])
+
+    def predict_batch(self, windows):
+        # Calling the model directly skips most of Keras predict()'s per-call setup
+        return np.asarray(self.model(windows, training=False))
+
+
+def tflite_interpreter(model_path, num_threads=None):
+    """A TFLite interpreter from the small tflite_runtime package if installed, else from TensorFlow."""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter(model_path=model_path, num_threads=num_threads)
+
+
+class TFLiteClassifier:
+    """Wraps model.tflite, resizing the input tensor to the batch size on demand."""
+
+    def __init__(self, model_path, num_threads=None):
+        self.interpreter = tflite_interpreter(model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input_index = self.interpreter.get_input_details()[0]["index"]
+        self.output_index = self.interpreter.get_output_details()[0]["index"]
+        self.input_shape = tuple(self.interpreter.get_input_details()[0]["shape"][1:])
+        self.metadata = read_tflite_metadata(model_path)
+        self.batch_size = 1
+        self.resizable = True
+
+    def _invoke(self, windows):
+        self.interpreter.set_tensor(self.input_index, windows)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self.output_index).copy()
+
+    def predict_batch(self, windows):
+        batch_size = len(windows)
+        if self.resizable and batch_size != self.batch_size:
+            try:
+                self.interpreter.resize_tensor_input(self.input_index, (batch_size,) + self.input_shape)
+                self.interpreter.allocate_tensors()
+                self.batch_size = batch_size
+            except (RuntimeError, ValueError):
+                # Some converted LSTMs have a fixed batch dimension; fall back to one window per invoke
+                self.resizable = False
+                self.interpreter.resize_tensor_input(self.input_index, (1,) + self.input_shape)
+                self.interpreter.allocate_tensors()
+                self.batch_size = 1
+        if self.batch_size == batch_size:
+            return self._invoke(windows)
+        return np.concatenate([self._invoke(windows[i:i + 1]) for i in range(batch_size)])
+
+
+def load_classifier(model_path, num_threads=None):
+    """Load a Keras (.h5/.keras) or TFLite (.tflite) sign model behind a predict_batch() interface."""
+    if model_path.endswith(".tflite"):
+        return TFLiteClassifier(model_path, num_threads=num_threads)
+    return KerasClassifier(model_path)
+
+
+def load_actions(path="actions.json"):
+    with open(path, "r") as f:
+        return json.load(f)
@@ -0,0 +1,230 @@
+import time
+import threading
+from collections import deque
+
+import cv2
+
+
+class DropOldestQueue:
+    """Bounded FIFO between two stages.
+
+    With drop=True a full queue discards its oldest item so the producer never
+    waits (live camera: always work on the freshest frame). With drop=False the
+    producer blocks instead, so a video file is processed frame by frame.
+    """
+
+    def __init__(self, maxsize=2, drop=True):
+        self.maxsize = maxsize
+        self.drop = drop
+        self.items = deque()
+        self.cond = threading.Condition()
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, item):
+        with self.cond:
+            if self.drop:
+                if len(self.items) >= self.maxsize:
+                    self.items.popleft()
+                    self.dropped += 1
+            else:
+                while len(self.items) >= self.maxsize and not self.closed:
+                    self.cond.wait()
+            self.items.append(item)
+            self.cond.notify_all()
+
+    def get(self, timeout=None):
+        """Next item, or None once the queue is closed and drained (or on timeout)."""
+        with self.cond:
+            if not self.items and not self.closed:
+                self.cond.wait(timeout)
+            if self.items:
+                item = self.items.popleft()
+                self.cond.notify_all()
+                return item
+            return None
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def __len__(self):
+        return len(self.items)
+
+
+class StageStats:
+    """Processed count, rolling FPS and mean busy time for one pipeline stage."""
+
+    def __init__(self, window_s=2.0):
+        self.window_s = window_s
+        self.lock = threading.Lock()
+        self.stamps = deque()
+        self.processed = 0
+        self.busy = 0.0
+
+    def record(self, busy):
+        now = time.monotonic()
+        with self.lock:
+            self.processed += 1
+            self.busy += busy
+            self.stamps.append(now)
+            while self.stamps and now - self.stamps[0] > self.window_s:
+                self.stamps.popleft()
+
+    def snapshot(self):
+        with self.lock:
+            fps = 0.0
+            if len(self.stamps) > 1:
+                span = self.stamps[-1] - self.stamps[0]
+                fps = (len(self.stamps) - 1) / span if span > 0 else 0.0
+            mean_ms = self.busy / self.processed * 1000 if self.processed else 0.0
+            return {"fps": fps, "processed": self.processed, "mean_ms": mean_ms}
+
+
+class FramePacket:
+    __slots__ = ("index", "timestamp", "frame", "results", "keypoints", "prediction")
+
+    def __init__(self, index, timestamp, frame):
+        self.index = index
+        self.timestamp = timestamp
+        self.frame = frame
+        self.results = None
+        self.keypoints = None
+        self.prediction = None
+
+
+class Pipeline:
+    """Capture -> landmarks -> classifier, each on its own thread, joined by bounded queues.
+
+    source:     a frame_sources.FrameSource, or anything with a cv2.VideoCapture-style read() -> (ok, frame)
+    landmarks:  fn(frame_bgr) -> (results, keypoints), e.g. MediaPipe Hands + keypoint extraction
+    classify:   fn(packet) -> prediction; called in frame order, may keep its own window state
+
+    Iterate over the pipeline on the main thread to get finished packets
+    (cv2.imshow has to stay on the main thread). With a metrics.Metrics object
+    the stage times, end-to-end frame latency, rolling FPS and dropped frames
+    are exported through it as well.
+    """
+
+    def __init__(self, source, landmarks, classify, flip=True, queue_size=2, live=None, metrics=None):
+        self.source = source
+        self.landmarks = landmarks
+        self.classify = classify
+        self.flip = flip
+        if live is None:
+            live = getattr(source, "live", True)
+        self.live = live
+        # Live sources drop stale frames; files are processed completely
+        self.frames = DropOldestQueue(queue_size, drop=live)
+        self.landmarked = DropOldestQueue(queue_size, drop=live)
+        self.outputs = DropOldestQueue(queue_size, drop=live)
+        self.stages = {"capture": StageStats(), "landmarks": StageStats(), "classify": StageStats()}
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.metrics = metrics
+        if metrics is not None:
+            for name, stage in self.stages.items():
+                metrics.set_gauge("stage_fps", lambda stage=stage: stage.snapshot()["fps"], stage=name)
+            for name, q in (("frames", self.frames), ("landmarked", self.landmarked), ("outputs", self.outputs)):
+                metrics.set_gauge("dropped_frames", lambda q=q: q.dropped, queue=name)
+                metrics.set_gauge("queue_depth", lambda q=q: len(q), queue=name)
+
+    def _record(self, stage, busy):
+        self.stages[stage].record(busy)
+        if self.metrics is not None:
+            self.metrics.observe("stage_seconds", busy, stage=stage)
+
+    def start(self):
+        for name, target in (("capture", self._capture), ("landmarks", self._landmarks),
+                             ("classify", self._classify)):
+            thread = threading.Thread(target=target, name=f"pipeline-{name}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        for q in (self.frames, self.landmarked, self.outputs):
+            q.close()
+        for thread in self.threads:
+            thread.join(timeout=2.0)
+
+    def __iter__(self):
+        while True:
+            packet = self.outputs.get()
+            if packet is None:
+                if self.outputs.closed:
+                    return
+                continue
+            if self.metrics is not None:
+                # Capture to display: what the user actually waits for
+                self.metrics.observe("frame_latency_seconds", time.monotonic() - packet.timestamp)
+            yield packet
+
+    def _capture(self):
+        index = 0
+        try:
+            while not self.stop_event.is_set():
+                started = time.perf_counter()
+                ret, frame = self.source.read()
+                if not ret:
+                    if self.live and not getattr(self.source, "finished", False):
+                        time.sleep(0.005)
+                        continue
+                    break
+                if self.flip:
+                    frame = cv2.flip(frame, 1)
+                self._record("capture", time.perf_counter() - started)
+                self.frames.put(FramePacket(index, time.monotonic(), frame))
+                index += 1
+        finally:
+            self.frames.close()
+
+    def _landmarks(self):
+        try:
+            while True:
+                packet = self.frames.get()
+                if packet is None:
+                    if self.frames.closed:
+                        break
+                    continue
+                started = time.perf_counter()
+                packet.results, packet.keypoints = self.landmarks(packet.frame)
+                self._record("landmarks", time.perf_counter() - started)
+                self.landmarked.put(packet)
+        finally:
+            self.landmarked.close()
+
+    def _classify(self):
+        try:
+            while True:
+                packet = self.landmarked.get()
+                if packet is None:
+                    if self.landmarked.closed:
+                        break
+                    continue
+                started = time.perf_counter()
+                packet.prediction = self.classify(packet)
+                self._record("classify", time.perf_counter() - started)
+                self.outputs.put(packet)
+        finally:
+            self.outputs.close()
+
+    def report(self):
+        stats = {name: stage.snapshot() for name, stage in self.stages.items()}
+        stats["queues"] = {
+            name: {"depth": len(q), "dropped": q.dropped}
+            for name, q in (("frames", self.frames), ("landmarked", self.landmarked), ("outputs", self.outputs))
+        }
+        return stats
+
+    def format_report(self):
+        stats = self.report()
+        stages = " | ".join(
+            f"{name} {stats[name]['fps']:.1f} fps ({stats[name]['mean_ms']:.1f} ms)"
+            for name in self.stages
+        )
+        queues = " ".join(f"{name}={q['depth']}/-{q['dropped']}" for name, q in stats["queues"].items())
+        return f"{stages} | queues(depth/-dropped) {queues}"
+
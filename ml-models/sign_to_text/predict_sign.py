@@ -1,142 +1,314 @@
+from warm_start import BackgroundLoader, StartupTimer, load_streaming, load_windowed
 import cv2
 import numpy as np
-from collections import deque
-from utils import extract_hand_keypoints
+from keypoints import NUM_FEATURES
 import os
 import json
 import time
+import argparse
 
-# Import the correct submodules directly from mediapipe
-from mediapipe.python.solutions.hands import Hands, HAND_CONNECTIONS
-from mediapipe.python.solutions.drawing_utils import draw_landmarks
+from pipeline import Pipeline
+from frame_sources import add_source_arguments, source_from_args, sink_from_args
+from adaptive_tracking import AdaptiveHandTracker, SKIPPED
+from continuous_recognizer import ContinuousRecognizer
+from metrics import add_metrics_arguments, metrics_from_args, log
+
+startup = StartupTimer()
+
+parser = argparse.ArgumentParser(description="Live sign prediction from the webcam, a video, an image folder or a stream.")
+add_source_arguments(parser)
+add_metrics_arguments(parser)
+args = parser.parse_args()
+session = metrics_from_args(args)
+metrics = session.metrics
+
+REPORT_INTERVAL = 5  # seconds between pipeline FPS / queue reports
 
 # Choose which model to load: scikit-learn (joblib) or deep learning (Keras)
 USE_DEEP_LEARNING_MODEL = True  # Set to False to use joblib model
+MODEL_PATH = "lstm_sign_model.h5"
 
-if USE_DEEP_LEARNING_MODEL:
-    from tensorflow.keras.models import load_model
-    model = load_model("lstm_sign_model.h5")
+# Streaming mode advances a stateful copy of the LSTM by one frame per step
+# instead of re-running the whole 50-frame window (deep learning model only)
+USE_STREAMING_INFERENCE = True
+STREAMING_RESYNC_EVERY = 25  # frames between exact re-syncs with the windowed model
+
+# Adaptive hand tracking (see adaptive_tracking.py; measure with
+# `python adaptive_tracking.py <video or image folder> --model lstm_sign_model.h5`)
+USE_ROI_TRACKING = True   # run MediaPipe on a downscaled crop around the last hands
+USE_FRAME_SKIPPING = True  # reuse landmarks on near-static frames, interpolated afterwards
+
+# Early exit: models trained with `train_model.py --early-exit` (which writes
+# early_exit.json) classify a sign from its first 10/20/30/50 frames and stop
+# computing once confident. Takes over from streaming inference when available.
+EARLY_EXIT_CONFIG = "early_exit.json"
+USE_EARLY_EXIT = USE_DEEP_LEARNING_MODEL and os.path.exists(EARLY_EXIT_CONFIG)
+
+if USE_EARLY_EXIT:
+    USE_STREAMING_INFERENCE = False
+    # Early exit keeps no frame history to correct, so held frames could never be interpolated for it
+    USE_FRAME_SKIPPING = False
+
+SEQUENCE_LENGTH = 50  # Make sure this matches your training
+
+
+def load_runtime_model():
+    # Streaming and early exit only need the LSTM weights, which load from a NumPy
+    # cache without TensorFlow after the first run; whole windows prefer a cached TFLite copy
+    if not USE_DEEP_LEARNING_MODEL:
+        import joblib
+        return joblib.load(STATIC_MODEL_PATH)
+    if USE_EARLY_EXIT or USE_STREAMING_INFERENCE:
+        return load_streaming(MODEL_PATH, resync_every=STREAMING_RESYNC_EVERY)
+    return load_windowed(MODEL_PATH)
 
-else:
-    import joblib
-    model = joblib.load("sign_model.pkl")
+
+def warm_up(loaded):
+    window = np.zeros((SEQUENCE_LENGTH, NUM_FEATURES), dtype=np.float32)
+    if not USE_DEEP_LEARNING_MODEL:
+        if hasattr(loaded, "predict_proba"):
+            loaded.predict_proba(window[-1] if isinstance(loaded, StaticSignClassifier) else window.reshape(1, -1))
+    elif USE_EARLY_EXIT or USE_STREAMING_INFERENCE:
+        loaded.predict_window(window)
+    else:
+        loaded.predict_batch(window[np.newaxis])
+
+
+# Heavy imports and model loading run in the background while the camera and MediaPipe start
+if not USE_DEEP_LEARNING_MODEL:
+    from static_classifier import STATIC_MODEL_PATH, StaticSignClassifier
+loader = BackgroundLoader(load_runtime_model, warm_up).start()
+model = None  # set by ensure_model() once the loader is done
+stream = early_exit = None
+static_columns = None
 
 # Load actions (class labels) from actions.json
 with open("actions.json", "r") as f:
     actions = json.load(f)
 
-import pyttsx3
-engine = pyttsx3.init()
+from speech import AsyncSpeaker
+speaker = AsyncSpeaker()  # speaks on its own thread; say() never blocks the frame loop
 
 last_prediction = ""
 last_confidence = 0.0
-spoken_recently = False
 confidence_threshold = 0.8  # Adjust based on your model confidence
 last_prediction_time = 0
 prediction_display_duration = 2  # seconds
 
-SEQUENCE_LENGTH = 50  # Make sure this matches your training
-sequence = deque(maxlen=SEQUENCE_LENGTH)
-
-cap = cv2.VideoCapture(0)
-
-def extract_both_hands_keypoints(multi_hand_landmarks):
-    keypoints = []
-    if multi_hand_landmarks:
-        for hand_landmarks in multi_hand_landmarks[:2]:
-            if hand_landmarks and len(hand_landmarks.landmark) == 21:
-                pts = np.array([[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark])
-                keypoints.append(pts.flatten())
-    while len(keypoints) < 2:
-        keypoints.append(np.zeros(63))  # Pad if only one hand
-    return np.concatenate(keypoints)  # Shape: (126,)
-
-with Hands(
+PREDICTION_STRIDE = 3  # frames between classifier runs
+if USE_EARLY_EXIT:
+    # Early-exit output is already confidence-gated: check it every frame, unsmoothed, and
+    # from the first hand frame since its classifier reads the stream rather than the window
+    recognizer = ContinuousRecognizer(actions, sequence_length=SEQUENCE_LENGTH, stride=1, alpha=1.0,
+                                      stable_predictions=1, threshold=confidence_threshold,
+                                      min_hand_frames=0)
+else:
+    recognizer = ContinuousRecognizer(actions, sequence_length=SEQUENCE_LENGTH, stride=PREDICTION_STRIDE,
+                                      threshold=confidence_threshold)
+sequence = recognizer.window  # preallocated float32 window, zeros for frames without hands
+skipped_frames = 0  # held frames waiting to be interpolated
+had_hands = False  # for the hand-lost counter
+
+source = source_from_args(args)
+sink = sink_from_args(args, "Sign Prediction")
+startup.mark("source_open")
+
+# Import the correct submodules directly from mediapipe
+from mediapipe.python.solutions.hands import Hands, HAND_CONNECTIONS
+from mediapipe.python.solutions.drawing_utils import draw_landmarks
+
+
+def ensure_model():
+    """The model once the background loader has finished (None until then)."""
+    global model, stream, early_exit, static_columns
+    if model is not None or not loader.done or loader.error is not None:
+        return model
+    loaded = loader.get()
+    if USE_EARLY_EXIT:
+        from streaming_lstm import EarlyExitLSTM
+        with open(EARLY_EXIT_CONFIG, "r") as f:
+            early_exit = EarlyExitLSTM(loaded, exits=json.load(f)["exits"], threshold=confidence_threshold)
+    elif USE_DEEP_LEARNING_MODEL and USE_STREAMING_INFERENCE:
+        # Catch up on the frames seen while loading (the window starts zero-filled);
+        # the newest row is stepped by classify() itself
+        stream = loaded
+        for row in sequence.window()[:-1]:
+            stream.step(row)
+    elif not USE_DEEP_LEARNING_MODEL and isinstance(loaded, StaticSignClassifier):
+        static_columns = [actions.index(label) for label in loaded.classes_]
+    model = loaded
+    startup.mark("model_ready")
+    return model
+
+
+def predict_window(window):
+    """Class probabilities for one (SEQUENCE_LENGTH, 126) window."""
+    input_data = window[np.newaxis]
+    if USE_DEEP_LEARNING_MODEL:
+        return model.predict_batch(input_data)[0]
+    if isinstance(model, StaticSignClassifier):
+        # Static handshapes only need the newest frame
+        probs = np.zeros(len(actions), dtype=np.float32)
+        probs[static_columns] = model.predict_proba(window[-1])
+        return probs
+    if hasattr(model, "predict_proba"):
+        return model.predict_proba(input_data.reshape(1, -1))[0]
+    # Plain classifiers only give a label: treat it as certain
+    probs = np.zeros(len(actions), dtype=np.float32)
+    probs[actions.index(model.predict(input_data.reshape(1, -1))[0])] = 1.0
+    return probs
+
+
+def classify(packet):
+    """Classifier stage: feeds the continuous recognizer; returns its events for this frame."""
+    global skipped_frames, had_hands
+    results = packet.results
+    row = recognizer.observe(results)
+    packet.keypoints = row if results.multi_hand_landmarks else None
+
+    has_hands = bool(results.multi_hand_landmarks)
+    metrics.inc("frames_total", hands="yes" if has_hands else "no")
+    if had_hands and not has_hands:
+        metrics.inc("hand_lost_total")
+    had_hands = has_hands
+
+    if not results.multi_hand_landmarks:
+        skipped_frames = 0
+    elif results.mode == SKIPPED:
+        skipped_frames += 1
+    elif skipped_frames:
+        sequence.interpolate_gap(skipped_frames)
+        if stream is not None:
+            # The stream already stepped over the held rows: give it the interpolated ones
+            gap = min(skipped_frames, len(sequence) - 2)
+            if gap > 0:
+                stream.rewrite_recent(sequence.window()[-gap - 1:-1])
+        skipped_frames = 0
+
+    if ensure_model() is None:
+        # Still loading: the window keeps filling and segments open and close, but nothing is decoded,
+        # so a hand held still meanwhile is not taken for a sign that already ended
+        events = []
+        recognizer.segment(events)
+        return events
+    startup.mark("first_prediction")
+
+    if USE_EARLY_EXIT:
+        # Bridged dropouts inside a sign are fed as zero rows, like in the recorded sequences
+        if not (results.multi_hand_landmarks or recognizer.in_segment):
+            return recognizer.update_prefix(early_exit, row)
+        with metrics.timer("prediction_seconds", model="early_exit"):
+            return recognizer.update_prefix(early_exit, row)
+
+    streamed = None
+    if USE_DEEP_LEARNING_MODEL and USE_STREAMING_INFERENCE:
+        # The stateful LSTM has to see every frame, not only the strided predictions
+        with metrics.timer("prediction_seconds", model="streaming"):
+            streamed = stream.step(row)
+    return recognizer.update(lambda window: streamed if streamed is not None else timed_predict_window(window))
+
+
+def timed_predict_window(window):
+    with metrics.timer("prediction_seconds", model="window"):
+        return predict_window(window)
+
+
+hands = Hands(
     static_image_mode=False,
     max_num_hands=2,
     min_detection_confidence=0.3,
     min_tracking_confidence=0.3
-) as hands:
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            continue
+)
+# Crops get their own static-mode graph; the tracking state of `hands` refers to full frames
+roi_hands = Hands(static_image_mode=True, max_num_hands=2, min_detection_confidence=0.3) if USE_ROI_TRACKING else None
+tracker = AdaptiveHandTracker(hands, roi_hands, roi=USE_ROI_TRACKING, skip=USE_FRAME_SKIPPING)
 
-        frame = cv2.flip(frame, 1)
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(rgb)
 
-        # Debug: print Mediapipe hand detection result
-        print("Hand landmarks:", results.multi_hand_landmarks)
+def landmarks(frame):
+    """Landmark stage: MediaPipe on one (already flipped) BGR frame."""
+    results = tracker.process(frame)
+
+    # Formatted only with --log-level DEBUG
+    log.debug("Hand landmarks: %s", results.multi_hand_landmarks)
+
+    # Keypoints are extracted by the classifier stage into its ring buffer
+    return results, None
+
+
+pipeline = Pipeline(source, landmarks, classify, flip=True, metrics=metrics).start()
+for mode in tracker.counts:
+    metrics.set_gauge("tracker_frames", lambda mode=mode: tracker.counts[mode], mode=mode)
+last_report = time.time()
+
+try:
+    for packet in pipeline:
+        frame, results = packet.frame, packet.results
+        startup.mark("first_frame")
+        if loader.error is not None:
+            print(f"❌ Could not load the model: {loader.error}")
+            break
+        if "first_prediction" in startup.marks and startup.mark("reported"):
+            print("[STARTUP]", startup.format_report(), "|", loader.format_report())
+            for milestone, seconds in startup.marks.items():
+                metrics.set_gauge("startup_seconds", seconds, milestone=milestone)
 
         # Draw landmarks for visualization
         if results.multi_hand_landmarks:
             for hand_landmarks in results.multi_hand_landmarks:
                 draw_landmarks(frame, hand_landmarks, HAND_CONNECTIONS)
 
-        # Skip prediction if no hand detected
-        if results.multi_hand_landmarks:
-            keypoints = extract_both_hands_keypoints(results.multi_hand_landmarks)
-            sequence.append(keypoints)
-
-            if len(sequence) == SEQUENCE_LENGTH:
-                input_data = np.expand_dims(sequence, axis=0)
-                print("Input shape to model:", input_data.shape)
-                if input_data.shape != (1, SEQUENCE_LENGTH, 126):
-                    print("⚠️ Wrong input shape:", input_data.shape)
-                    continue  # Skip this frame
-
-                if USE_DEEP_LEARNING_MODEL:
-                    res = model.predict(input_data)[0]
-                    predicted_sign = actions[np.argmax(res)]
-                    confidence = res[np.argmax(res)]
-                else:
-                    if hasattr(model, "predict_proba"):
-                        res = model.predict_proba(input_data.reshape(1, -1))[0]
-                        predicted_sign = actions[np.argmax(res)]
-                        confidence = res[np.argmax(res)]
-                    else:
-                        predicted_sign = model.predict(input_data.reshape(1, -1))[0]
-                        confidence = 1.0
-
-                if confidence > confidence_threshold:
-                    if predicted_sign != last_prediction:
-                        print(f"New Prediction: {predicted_sign} ({confidence:.2f})")
-                        engine.say(predicted_sign)
-                        engine.runAndWait()
-                        last_prediction = predicted_sign
-                        last_confidence = confidence
-                        last_prediction_time = time.time()
-                        spoken_recently = True
-                    else:
-                        # Same as before, but confident
-                        last_confidence = confidence
-                        last_prediction_time = time.time()
-                else:
-                    last_prediction = ""
-                    last_confidence = 0.0
-                    spoken_recently = False
-        else:
-            # No hands detected
-            sequence.clear()
-            last_prediction = ""
-            last_confidence = 0.0
-            spoken_recently = False
+        for event in packet.prediction or ():
+            metrics.inc("recognized_total", kind=event.kind)
+            if event.kind == "sign":
+                print(f"New Prediction: {event.value} ({event.confidence:.2f})  text: {recognizer.text} {recognizer.word}")
+                last_prediction = event.value
+                last_confidence = event.confidence
+                last_prediction_time = time.time()
+                if len(event.value) > 1:
+                    speaker.say(event.value)
+            else:
+                # Fingerspelled letters are spoken as the finished word
+                speaker.say(event.value)
 
         # Display current prediction on screen with timer
         current_time = time.time()
+        if current_time - last_report >= REPORT_INTERVAL:
+            print("[PIPELINE]", pipeline.format_report())
+            last_report = current_time
+
+        if args.headless and args.record is None:
+            continue
+
         if current_time - last_prediction_time < prediction_display_duration and last_prediction:
             label = f"{last_prediction} ({last_confidence:.2f})"
             color = (0, 255, 0)
         else:
             label = "No hand detected"
             color = (0, 0, 255)
-        
+
         cv2.putText(frame, label, (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2)
+        running_text = f"{recognizer.text} {recognizer.word}".strip()
+        if running_text:
+            cv2.putText(frame, running_text[-40:], (10, frame.shape[0] - 20),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
 
-        cv2.imshow("Sign Prediction", frame)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        if sink.show(frame, 1) == ord('q'):
             break
-
-cap.release()
-cv2.destroyAllWindows()
+finally:
+    pipeline.stop()
+    print("[PIPELINE]", pipeline.format_report())
+    print("[TRACKING]", " ".join(f"{mode}={n}" for mode, n in tracker.counts.items()))
+    print("[STARTUP]", startup.format_report(), "|", loader.format_report())
+    if early_exit is not None:
+        exit_stats = early_exit.stats()
+        print(f"[EARLY EXIT] {exit_stats['steps_per_frame']:.2f} LSTM steps per frame, exits {exit_stats['exits']}")
+    speaker.close()
+    tts = speaker.stats()
+    print(f"[TTS] {tts['utterances']} utterances, {tts['dropped']} deduplicated; "
+          f"say() added {tts['say_mean_us']:.1f} us mean / {tts['say_max_us']:.1f} us max per call")
+    hands.close()
+    if roi_hands is not None:
+        roi_hands.close()
+    source.release()
+    sink.close()
+    session.close()
@@ -2,26 +2,44 @@ import cv2
 import os
 import numpy as np
 import time
-import mediapipe as mp
+import argparse
+
+from frame_sources import add_source_arguments, source_from_args, sink_from_args
+from recording_store import RecordingWriter, STORE_PATH
 
 # --- CONFIG ---
 SIGN_RECORD_SECONDS = 5
 TARGET_FPS = 10
 FRAMES_REQUIRED = SIGN_RECORD_SECONDS * TARGET_FPS
-MAX_MISSED_FRAMES = int(FRAMES_REQUIRED * 0.2)  # tolerate 20% missed frames
+MAX_MISSED_FRAMES = int(FRAMES_REQUIRED * 0.2)  # --npy only; the store keeps every take (see recording_store.py)
 HAND_SMOOTH_START = 5  # number of consistent frames before auto start
 
+parser = argparse.ArgumentParser(description="Record sign sequences from the webcam, a video, an image folder or a stream.")
+add_source_arguments(parser)
+parser.add_argument("--store", default=STORE_PATH, help="recording store directory takes are appended to")
+parser.add_argument("--dtype", choices=["float16", "float32"], default="float16",
+                    help="storage precision of a new store (float16 halves the size)")
+parser.add_argument("--npy", action="store_true",
+                    help="write one data/<sign>/seq_<n>.npy per take instead, dropping takes with missed frames")
+args = parser.parse_args()
+
 # --- PATH SETUP ---
 DATA_PATH = "data"
 sign_name = input("Enter the name of the sign to record: ").strip().lower()
-sign_dir = os.path.join(DATA_PATH, sign_name)
-os.makedirs(sign_dir, exist_ok=True)
-existing = [int(f.split('_')[-1].split('.')[0]) for f in os.listdir(sign_dir) if f.startswith("seq_")]
-sequence_num = max(existing, default=0) + 1
+if args.npy:
+    writer = None
+    sign_dir = os.path.join(DATA_PATH, sign_name)
+    os.makedirs(sign_dir, exist_ok=True)
+    existing = [int(f.split('_')[-1].split('.')[0]) for f in os.listdir(sign_dir) if f.startswith("seq_")]
+    sequence_num = max(existing, default=0) + 1
+else:
+    writer = RecordingWriter(args.store, dtype=args.dtype)
 
 # --- MEDIAPIPE SETUP ---
+# Imported only after the prompt above: loading MediaPipe takes a while and is not needed to type a name
 from mediapipe.python.solutions.hands import Hands, HAND_CONNECTIONS
 from mediapipe.python.solutions.drawing_utils import draw_landmarks
+from keypoints import extract_keypoints, NUM_FEATURES, LEFT_SLOT, RIGHT_SLOT
 
 hands = Hands(
     max_num_hands=2,
@@ -29,59 +47,83 @@ hands = Hands(
     min_tracking_confidence=0.5
 )
 
-def extract_landmarks(multi_hand_landmarks):
-    """Extract 2-hand landmarks (pad if 1 or 0)."""
-    keypoints = []
-    if multi_hand_landmarks:
-        for hand in multi_hand_landmarks[:2]:
-            pts = np.array([[lm.x, lm.y, lm.z] for lm in hand.landmark])
-            keypoints.append(pts.flatten())
-    while len(keypoints) < 2:
-        keypoints.append(np.zeros(63))  # 21 landmarks x 3 coords
-    return np.concatenate(keypoints)
-
 # --- CAMERA ---
-cap = cv2.VideoCapture(0)
-print(f"[INFO] Recording sign '{sign_name}' in {sign_dir}/seq_<n>.npy")
+cap = source_from_args(args)
+sink = sink_from_args(args, "Sign Recorder")
+if writer is None:
+    print(f"[INFO] Recording sign '{sign_name}' in {sign_dir}/seq_<n>.npy")
+else:
+    print(f"[INFO] Recording sign '{sign_name}' into the store {args.store}/ [{writer.dtype.name}]")
 
 buffer = []
 smooth_counter = 0
 
-def record_sequence(cap, hands, sign_dir, sequence_num):
-    sequence = []
-    missed = 0
-    while len(sequence) < FRAMES_REQUIRED:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        frame = cv2.flip(frame, 1)
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(rgb)
-
-        if results.multi_hand_landmarks:
-            keypoints = extract_landmarks(results.multi_hand_landmarks)
-            sequence.append(keypoints)
-            for hand_landmarks in results.multi_hand_landmarks:
-                draw_landmarks(frame, hand_landmarks, HAND_CONNECTIONS)
-        else:
-            missed += 1
-            sequence.append(np.zeros(126))  # empty frame placeholder
-
-        remaining = FRAMES_REQUIRED - len(sequence)
-        cv2.putText(frame, f"Recording... {remaining} frames left",
-                    (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-        cv2.imshow("Sign Recorder", frame)
-        if cv2.waitKey(int(1000 / TARGET_FPS)) & 0xFF == ord('q'):
-            raise KeyboardInterrupt
-
-    # Save only if enough valid frames
-    if missed <= MAX_MISSED_FRAMES:
-        np.save(os.path.join(sign_dir, f"seq_{sequence_num}.npy"), np.array(sequence))
+def record_sequence(cap, hands):
+    """Record up to FRAMES_REQUIRED frames: (keypoints, hand mask (frames, 2), stopped by the user).
+
+    Frames without hands stay in the take as zeros, and a take cut short by
+    'q', Ctrl+C or the end of the source is returned as far as it got.
+    """
+    keypoints = np.zeros((FRAMES_REQUIRED, NUM_FEATURES), dtype=np.float32)
+    mask = np.zeros((FRAMES_REQUIRED, 2), dtype=bool)
+    n = 0
+    stopped = False
+    try:
+        while n < FRAMES_REQUIRED:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frame = cv2.flip(frame, 1)
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            results = hands.process(rgb)
+
+            if results.multi_hand_landmarks:
+                row = extract_keypoints(results, out=keypoints[n])
+                mask[n] = row[LEFT_SLOT].any(), row[RIGHT_SLOT].any()
+                for hand_landmarks in results.multi_hand_landmarks:
+                    draw_landmarks(frame, hand_landmarks, HAND_CONNECTIONS)
+            n += 1
+
+            remaining = FRAMES_REQUIRED - n
+            cv2.putText(frame, f"Recording... {remaining} frames left",
+                        (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+            if sink.show(frame, int(1000 / TARGET_FPS)) == ord('q'):
+                stopped = True
+                break
+            if args.headless and cap.live:
+                time.sleep(1 / TARGET_FPS)  # keep the window-mode frame rate without waitKey
+    except KeyboardInterrupt:
+        stopped = True
+    return keypoints[:n], mask[:n], stopped
+
+
+def save_take(keypoints, mask):
+    global sequence_num
+    missed = len(mask) - int(mask.any(axis=1).sum())
+    if writer is not None:
+        if len(keypoints):
+            # Queued for the writer thread; which windows are usable is decided at training time
+            take = writer.write_take(sign_name, keypoints, mask,
+                                     complete=len(keypoints) == FRAMES_REQUIRED, fps=TARGET_FPS)
+            print(f"[SAVED] Take #{take}: {len(keypoints)} frames, {missed} without hands.")
+        return
+
+    # Save only full-length takes with enough valid frames: training loads exactly FRAMES_REQUIRED frames
+    if len(keypoints) < FRAMES_REQUIRED:
+        print(f"[SKIPPED] Take stopped early: {len(keypoints)}/{FRAMES_REQUIRED} frames")
+    elif missed <= MAX_MISSED_FRAMES:
+        np.save(os.path.join(sign_dir, f"seq_{sequence_num}.npy"), keypoints)
         print(f"[SAVED] Sequence #{sequence_num} with {missed} dropped frames.")
-        return True
+        sequence_num += 1
     else:
         print(f"[SKIPPED] Too many missed frames: {missed}/{FRAMES_REQUIRED}")
-        return False
+
+
+def record_take(cap, hands):
+    keypoints, mask, stopped = record_sequence(cap, hands)
+    save_take(keypoints, mask)
+    if stopped:
+        raise KeyboardInterrupt
 
 try:
     while cap.isOpened():
@@ -105,25 +147,19 @@ try:
         # Start recording automatically
         if smooth_counter >= HAND_SMOOTH_START:
             print(f"[INFO] Starting auto recording for {SIGN_RECORD_SECONDS}s...")
-            success = record_sequence(cap, hands, sign_dir, sequence_num)
-            if success:
-                sequence_num += 1
+            record_take(cap, hands)
             smooth_counter = 0  # reset for next recording
 
         # Show preview
         if results.multi_hand_landmarks:
             for hand_landmarks in results.multi_hand_landmarks:
                 draw_landmarks(frame, hand_landmarks, HAND_CONNECTIONS)
-        cv2.imshow("Sign Recorder", frame)
-
-        key = cv2.waitKey(10) & 0xFF
+        key = sink.show(frame, 10)
         if key == ord('q'):
             break
         elif key == ord('m'):
             print(f"[INFO] Manual recording started for {SIGN_RECORD_SECONDS}s...")
-            success = record_sequence(cap, hands, sign_dir, sequence_num)
-            if success:
-                sequence_num += 1
+            record_take(cap, hands)
             smooth_counter = 0  # reset for next recording
 
 except KeyboardInterrupt:
@@ -131,5 +167,8 @@ except KeyboardInterrupt:
 
 finally:
     cap.release()
-    cv2.destroyAllWindows()
+    sink.close()
     hands.close()
+    if writer is not None:
+        print(f"[INFO] Writing {writer.pending()} queued takes...")
+        writer.close()
@@ -0,0 +1,257 @@
+import os
+import json
+import time
+import queue
+import argparse
+import threading
+
+import numpy as np
+
+from keypoints import NUM_FEATURES
+
+STORE_PATH = "recordings"
+STORE_VERSION = 1
+CHUNK_BYTES = 64 * 1024 * 1024  # roll over to a new frames file above this size
+MAX_MISSED_FRACTION = 0.2  # training-time policy: the share of frames without hands a window may have
+HEADER_NAME = "store.json"
+TAKES_NAME = "takes.jsonl"
+
+
+def is_recording_store(path):
+    return os.path.exists(os.path.join(path, HEADER_NAME))
+
+
+def store_signature(path):
+    """Changes whenever a take is added (the takes index is append-only)."""
+    takes_path = os.path.join(path, TAKES_NAME)
+    if not os.path.exists(takes_path):
+        return {"takes_bytes": 0}
+    return {"takes_bytes": os.path.getsize(takes_path)}
+
+
+def _chunk_paths(path, chunk):
+    return (os.path.join(path, f"frames_{chunk:05d}.bin"),
+            os.path.join(path, f"masks_{chunk:05d}.bin"))
+
+
+def _read_header(path):
+    with open(os.path.join(path, HEADER_NAME), "r") as f:
+        header = json.load(f)
+    if header.get("version") != STORE_VERSION:
+        raise ValueError(f"Unsupported recording store version {header.get('version')} in {path}")
+    return header
+
+
+def _read_takes(path):
+    takes_path = os.path.join(path, TAKES_NAME)
+    if not os.path.exists(takes_path):
+        return []
+    takes = []
+    with open(takes_path, "r") as f:
+        for line in f:
+            if line.strip():
+                try:
+                    takes.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # a line cut off by a crash (or still being written); skip only that line
+    return takes
+
+
+def _trim_takes(path):
+    """Cut off a takes.jsonl line a crash left half-written, so the next take starts on its own line."""
+    takes_path = os.path.join(path, TAKES_NAME)
+    if not os.path.exists(takes_path):
+        return
+    with open(takes_path, "r+b") as f:
+        end = f.read().rfind(b"\n") + 1
+        if end != f.tell():
+            f.truncate(end)
+
+
+class RecordingWriter:
+    """Appends recorded takes to a chunked store from a background thread.
+
+    Layout of the store directory:
+      store.json         dtype and feature count, written once
+      frames_NNNNN.bin   raw (frames, 126) rows, float16 or float32, append-only
+      masks_NNNNN.bin    one uint8 per frame: bit 0 = left hand present, bit 1 = right
+      takes.jsonl        one line per take: label, chunk, frame offset, length, ...
+
+    Frames are written before their takes.jsonl line, so a crash can at worst
+    leave unreferenced bytes at the end of a chunk or a half-written last
+    takes.jsonl line, never a broken take; the next writer trims both.
+    write_take() only queues the arrays; the caller never waits for the disk.
+    """
+
+    def __init__(self, path=STORE_PATH, dtype="float16", chunk_bytes=CHUNK_BYTES):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        if is_recording_store(path):
+            self.dtype = np.dtype(_read_header(path)["dtype"])
+            if self.dtype != np.dtype(dtype):
+                print(f"[INFO] Store {path} holds {self.dtype.name}; appending {self.dtype.name} instead of {dtype}")
+        else:
+            self.dtype = np.dtype(dtype)
+            with open(os.path.join(path, HEADER_NAME), "w") as f:
+                json.dump({"version": STORE_VERSION, "dtype": self.dtype.name, "num_features": NUM_FEATURES}, f)
+        self.row_bytes = self.dtype.itemsize * NUM_FEATURES
+        self.chunk_bytes = chunk_bytes
+
+        _trim_takes(path)
+        takes = _read_takes(path)
+        self.next_take = max((take["take"] for take in takes), default=-1) + 1
+        self.chunk = max((take["chunk"] for take in takes), default=0)
+        self.written = 0
+        self.errors = []
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="recording-writer", daemon=True)
+        self.thread.start()
+
+    def write_take(self, label, keypoints, mask, complete=True, fps=None):
+        """Queue one take: keypoints (frames, 126), mask (frames, 2) bool. Returns its take id."""
+        take_id = self.next_take
+        self.next_take += 1
+        self.queue.put({
+            "take": take_id,
+            "label": label,
+            "keypoints": np.asarray(keypoints),
+            "mask": np.asarray(mask, dtype=bool),
+            "complete": bool(complete),
+            "fps": fps,
+            "time": time.time(),
+        })
+        return take_id
+
+    def pending(self):
+        return self.queue.qsize()
+
+    def _recover(self, frames_path, masks_path):
+        """Next frame offset in a chunk; trims bytes a crash left without a matching mask or row."""
+        rows = os.path.getsize(frames_path) // self.row_bytes if os.path.exists(frames_path) else 0
+        masks = os.path.getsize(masks_path) if os.path.exists(masks_path) else 0
+        offset = min(rows, masks)
+        for path, size in ((frames_path, offset * self.row_bytes), (masks_path, offset)):
+            if os.path.exists(path) and os.path.getsize(path) != size:
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+        return offset
+
+    def _append(self, item):
+        frames_path, masks_path = _chunk_paths(self.path, self.chunk)
+        if os.path.exists(frames_path) and os.path.getsize(frames_path) >= self.chunk_bytes:
+            self.chunk += 1
+            frames_path, masks_path = _chunk_paths(self.path, self.chunk)
+        offset = self._recover(frames_path, masks_path)
+
+        keypoints = np.ascontiguousarray(item["keypoints"], dtype=self.dtype)
+        mask = item["mask"]
+        packed = (mask[:, 0].astype(np.uint8) | (mask[:, 1].astype(np.uint8) << 1))
+        with open(frames_path, "ab") as f:
+            f.write(keypoints.tobytes())
+        with open(masks_path, "ab") as f:
+            f.write(packed.tobytes())
+
+        entry = {
+            "take": item["take"],
+            "label": item["label"],
+            "chunk": self.chunk,
+            "offset": offset,
+            "length": len(keypoints),
+            "hand_frames": int(mask.any(axis=1).sum()),
+            "complete": item["complete"],
+            "fps": item["fps"],
+            "time": item["time"],
+        }
+        with open(os.path.join(self.path, TAKES_NAME), "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        self.written += 1
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            try:
+                self._append(item)
+            except OSError as exc:
+                self.errors.append(exc)
+                print(f"❌ Could not write take #{item['take']}: {exc}")
+
+    def close(self):
+        """Finish every queued take, then stop the writer thread."""
+        self.queue.put(None)
+        self.thread.join()
+
+
+class RecordingStore:
+    """Read-only view of a store written by RecordingWriter."""
+
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self.header = _read_header(path)
+        self.dtype = np.dtype(self.header["dtype"])
+        self.takes = _read_takes(path)
+        self._chunks = {}
+
+    def labels(self):
+        return sorted({take["label"] for take in self.takes})
+
+    def _open_chunk(self, chunk):
+        if chunk not in self._chunks:
+            frames_path, masks_path = _chunk_paths(self.path, chunk)
+            rows = os.path.getsize(frames_path) // (self.dtype.itemsize * NUM_FEATURES)
+            frames = np.memmap(frames_path, dtype=self.dtype, mode="r", shape=(rows, NUM_FEATURES))
+            masks = np.fromfile(masks_path, dtype=np.uint8)
+            self._chunks[chunk] = (frames, masks)
+        return self._chunks[chunk]
+
+    def load_take(self, take):
+        """(keypoints (length, 126) float32, mask (length, 2) bool) for one takes.jsonl entry."""
+        frames, masks = self._open_chunk(take["chunk"])
+        start, stop = take["offset"], take["offset"] + take["length"]
+        packed = masks[start:stop]
+        mask = np.stack([(packed & 1) > 0, (packed & 2) > 0], axis=1)
+        return np.asarray(frames[start:stop], dtype=np.float32), mask
+
+
+def training_windows(keypoints, mask, sequence_length=50, max_missed=MAX_MISSED_FRACTION):
+    """The missed-frame policy, applied at training time instead of while recording.
+
+    A take is cut into consecutive sequence_length windows; a short last piece
+    (or a short partial take) is zero-padded, and padded frames count as
+    missed. Windows with more than max_missed of their frames without any hand
+    are dropped.
+    """
+    windows = []
+    for start in range(0, max(len(keypoints), 1), sequence_length):
+        window = np.zeros((sequence_length, keypoints.shape[1]), dtype=np.float32)
+        piece = keypoints[start:start + sequence_length]
+        window[:len(piece)] = piece
+        missed = sequence_length - int(mask[start:start + sequence_length].any(axis=1).sum())
+        if missed <= max_missed * sequence_length:
+            windows.append(window)
+    return windows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a recording store and what training would use from it.")
+    parser.add_argument("--store", default=STORE_PATH)
+    parser.add_argument("--sequence-length", type=int, default=50)
+    parser.add_argument("--max-missed", type=float, default=MAX_MISSED_FRACTION)
+    args = parser.parse_args()
+
+    store = RecordingStore(args.store)
+    files = [name for name in os.listdir(args.store)]
+    size = sum(os.path.getsize(os.path.join(args.store, name)) for name in files)
+    print(f"[INFO] {len(store.takes)} takes of {len(store.labels())} signs in {len(files)} files "
+          f"({size / 1e6:.1f} MB, {store.dtype.name})")
+    for label in store.labels():
+        takes = [take for take in store.takes if take["label"] == label]
+        usable = sum(len(training_windows(*store.load_take(take), args.sequence_length, args.max_missed))
+                     for take in takes)
+        partial = sum(not take["complete"] for take in takes)
+        print(f"  {label:12s} {len(takes):4d} takes ({partial} partial) -> {usable} training windows")
+
+
+if __name__ == "__main__":
+    main()
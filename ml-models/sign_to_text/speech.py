@@ -0,0 +1,94 @@
+import time
+import threading
+from collections import deque
+
+
+class AsyncSpeaker:
+    """Text-to-speech on a dedicated worker thread.
+
+    say() only appends to a small pending list under a lock, so the recognition
+    loop never waits for an utterance to finish. While the engine is busy,
+    repeated words are dropped and the remaining pending words are spoken
+    together as one utterance once it is free.
+    """
+
+    def __init__(self, engine_factory=None, max_pending=5, repeat_cooldown=2.0, joiner=" "):
+        self.engine_factory = engine_factory
+        self.max_pending = max_pending
+        self.repeat_cooldown = repeat_cooldown
+        self.joiner = joiner
+        self.pending = deque()
+        self.cond = threading.Condition()
+        self.running = True
+        self.last_spoken = None
+        self.last_spoken_time = 0.0
+        # say() cost, to show the bound on added frame latency
+        self.calls = 0
+        self.total_call_s = 0.0
+        self.max_call_s = 0.0
+        self.spoken = 0
+        self.dropped = 0
+        self.worker = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+        self.worker.start()
+
+    def say(self, text):
+        started = time.perf_counter()
+        with self.cond:
+            # Deduplicate against what is queued and what was just spoken
+            recent = (text == self.last_spoken
+                      and time.monotonic() - self.last_spoken_time < self.repeat_cooldown)
+            if recent or (self.pending and self.pending[-1] == text):
+                self.dropped += 1
+            else:
+                if len(self.pending) >= self.max_pending:
+                    self.pending.popleft()
+                    self.dropped += 1
+                self.pending.append(text)
+                self.cond.notify()
+            elapsed = time.perf_counter() - started
+            self.calls += 1
+            self.total_call_s += elapsed
+            self.max_call_s = max(self.max_call_s, elapsed)
+
+    def close(self, timeout=5.0):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        self.worker.join(timeout)
+
+    def stats(self):
+        with self.cond:
+            return {
+                "say_calls": self.calls,
+                "say_mean_us": self.total_call_s / self.calls * 1e6 if self.calls else 0.0,
+                "say_max_us": self.max_call_s * 1e6,
+                "utterances": self.spoken,
+                "dropped": self.dropped,
+                "pending": len(self.pending),
+            }
+
+    def _run(self):
+        # pyttsx3 engines must be driven from the thread that created them
+        if self.engine_factory is None:
+            import pyttsx3
+            engine = pyttsx3.init()
+        else:
+            engine = self.engine_factory()
+
+        while True:
+            with self.cond:
+                while self.running and not self.pending:
+                    self.cond.wait()
+                if not self.running:
+                    break
+                words = list(self.pending)
+                self.pending.clear()
+                self.last_spoken = words[-1]
+                self.last_spoken_time = time.monotonic()
+
+            engine.say(self.joiner.join(words))
+            engine.runAndWait()
+            with self.cond:
+                self.spoken += 1
+                # Cooldown counts from the end of the utterance
+                self.last_spoken_time = time.monotonic()
@@ -1,40 +1,214 @@
 import os
-import shutil
-import random
+import re
+import json
+import time
+import zlib
+import argparse
 
-# Source directory (original)
-src_dir = 'data'  # current folder is ~/s/m/s/
+import numpy as np
 
-# Destination
-dst_dir = 'data_split'
-train_dir = os.path.join(dst_dir, 'train')
-val_dir = os.path.join(dst_dir, 'val')
+from recording_store import RecordingStore, is_recording_store
 
-# Create folders
-os.makedirs(train_dir, exist_ok=True)
-os.makedirs(val_dir, exist_ok=True)
+# Source directory: raw images (data/) or extracted sequences (processed_sequences/)
+SRC_DIR = "data"
+SPLIT_NAME = "split.json"  # written inside the source directory
+SPLIT_VERSION = 1
+VAL_FRACTION = 0.2
+SEED = 42
+FRAMES_PER_TAKE = 50  # default image grouping: one extracted sequence worth of consecutive frames
+# Shard sources of recording-store windows (see dataset_shard.scan_store_windows): "<label>/take_<id>[_<n>]"
+TAKE_SOURCE = re.compile(r"(.+/take_\d+)(?:_\d+)?$")
 
-# Get class folders A-Z, 1–9
-classes = sorted([d for d in os.listdir(src_dir) if os.path.isdir(os.path.join(src_dir, d))])
 
-split_ratio = 0.8  # 80% for training
+def natural_key(name):
+    """Sort key that puts 2.jpg before 10.jpg."""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
 
-for cls in classes:
-    cls_path = os.path.join(src_dir, cls)
-    files = [f for f in os.listdir(cls_path) if os.path.isfile(os.path.join(cls_path, f))]
-    random.shuffle(files)
 
-    split_index = int(len(files) * split_ratio)
-    train_files = files[:split_index]
-    val_files = files[split_index:]
+def scan_items(src_dir, extensions=None):
+    """(label, file name) for every file in the class folders, in natural order."""
+    items = []
+    for label in sorted(os.listdir(src_dir)):
+        label_path = os.path.join(src_dir, label)
+        if not os.path.isdir(label_path):
+            continue
+        for name in sorted(os.listdir(label_path), key=natural_key):
+            if not os.path.isfile(os.path.join(label_path, name)):
+                continue
+            if extensions is None or os.path.splitext(name)[1].lower() in extensions:
+                items.append((label, name))
+    return items
 
-    os.makedirs(os.path.join(train_dir, cls), exist_ok=True)
-    os.makedirs(os.path.join(val_dir, cls), exist_ok=True)
 
-    for f in train_files:
-        shutil.copy(os.path.join(cls_path, f), os.path.join(train_dir, cls, f))
+def scan_takes(src_dir):
+    """(label, "take_<id>") for every take of a recording store (record_sign.py)."""
+    return [(take["label"], f"take_{take['take']}") for take in RecordingStore(src_dir).takes]
 
-    for f in val_files:
-        shutil.copy(os.path.join(cls_path, f), os.path.join(val_dir, cls, f))
 
-print("✅ Done: Data split into 'data_split/train' and 'data_split/val'")
+def take_of(path):
+    """The "<label>/take_<id>" a recording-store window came from, or None for any other source."""
+    match = TAKE_SOURCE.match(path.replace(os.sep, "/"))
+    return match.group(1) if match else None
+
+
+def group_keys(items, group_size=0, group_pattern=None):
+    """Group id per item; items of one group always land in the same split.
+
+    group_pattern: regex on the file name whose first group names the recording
+    session (e.g. r"(.+)_\\d+\\.jpg"). group_size: runs of that many consecutive
+    files per class (frames of one take are numbered consecutively).
+    Otherwise every item is its own group.
+    """
+    if group_pattern:
+        pattern = re.compile(group_pattern)
+        keys = []
+        for label, name in items:
+            match = pattern.match(name)
+            keys.append(f"{label}/{match.group(1) if match else name}")
+        return keys
+    keys, position = [], {}
+    for label, name in items:
+        i = position.get(label, 0)
+        position[label] = i + 1
+        keys.append(f"{label}/{i // group_size if group_size else i}")
+    return keys
+
+
+def assign_val(labels, groups, val_fraction=VAL_FRACTION, seed=SEED):
+    """Stratified, seeded, grouped split: (N,) bool mask of the validation items.
+
+    Per class, groups are shuffled and taken until they cover val_fraction of
+    the items. Each class is seeded from (seed, class name), so adding a class
+    leaves the others' split unchanged. Classes with at least two groups always
+    get one validation group; a class with a single group is kept for training.
+    """
+    labels = np.asarray(labels)
+    _, group_ids, group_sizes = np.unique(np.asarray(groups), return_inverse=True, return_counts=True)
+    val_groups = np.zeros(len(group_sizes), dtype=bool)
+    for label in np.unique(labels):
+        members = np.unique(group_ids[labels == label])
+        if len(members) == 1:
+            print(f"[SKIPPED] '{label}' is a single group: no validation items, all for training")
+            continue
+        rng = np.random.default_rng([seed, zlib.crc32(str(label).encode())])
+        order = rng.permutation(members)
+        covered = np.cumsum(group_sizes[order]) - group_sizes[order]  # items before each group
+        chosen = covered < val_fraction * group_sizes[members].sum()
+        if val_fraction > 0:
+            chosen[0] = True
+            chosen[-1] = False  # keep at least one group for training
+        val_groups[order[chosen]] = True
+    return val_groups[group_ids]
+
+
+def make_split(src_dir=SRC_DIR, val_fraction=VAL_FRACTION, seed=SEED, group_size=0, group_pattern=None,
+               extensions=None):
+    # A recording store is split by take: every window cut from a take follows it (see split_indices)
+    items = scan_takes(src_dir) if is_recording_store(src_dir) else scan_items(src_dir, extensions)
+    if not items:
+        raise ValueError(f"No files found in the class folders of '{src_dir}'")
+    labels = [label for label, _ in items]
+    val = assign_val(labels, group_keys(items, group_size, group_pattern), val_fraction, seed)
+    paths = np.array([f"{label}/{name}" for label, name in items])
+    return {
+        "version": SPLIT_VERSION,
+        "seed": seed,
+        "val_fraction": val_fraction,
+        "group_size": group_size,
+        "group_pattern": group_pattern,
+        "labels": sorted(set(labels)),
+        "train": paths[~val].tolist(),
+        "val": paths[val].tolist(),
+    }
+
+
+def save_split(split, path):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(split, f)
+    os.replace(tmp_path, path)
+
+
+def load_split(path):
+    with open(path, "r") as f:
+        split = json.load(f)
+    if split.get("version") != SPLIT_VERSION:
+        raise ValueError(f"Unsupported split version {split.get('version')} in {path}")
+    return split
+
+
+def split_indices(split, rel_paths):
+    """Train/val row indices for items listed by path relative to the split's source directory.
+
+    rel_paths is e.g. a shard index's sources; windows of a recording store are
+    looked up by their take. Rows the split does not list are left out (and
+    reported), so they can never leak into validation.
+    """
+    part = {path: "train" for path in split["train"]}
+    part.update((path, "val") for path in split["val"])
+    names = np.array([part.get(path.replace(os.sep, "/")) or part.get(take_of(path), "") for path in rel_paths])
+    missing = int((names == "").sum())
+    if missing:
+        print(f"[SKIPPED] {missing} items are not in the split manifest; re-run split_dataset.py")
+    return np.flatnonzero(names == "train"), np.flatnonzero(names == "val")
+
+
+def train_val_indices(rel_paths, split_path=None):
+    """Rows of rel_paths for training and validation.
+
+    With a split manifest the rows follow it; without one this is the seeded
+    80/20 split the training scripts have always used, except that windows of
+    a recording store are grouped by take so a take never lands on both sides.
+    """
+    if split_path:
+        print(f"[INFO] Using split manifest {split_path}")
+        return split_indices(load_split(split_path), rel_paths)
+    takes = [take_of(path) for path in rel_paths]
+    if takes and all(takes):
+        val = assign_val([take.split("/")[0] for take in takes], takes)
+        return np.flatnonzero(~val), np.flatnonzero(val)
+    from sklearn.model_selection import train_test_split
+    return train_test_split(np.arange(len(rel_paths)), test_size=0.2, random_state=42)
+
+
+def add_split_argument(parser):
+    parser.add_argument("--split", metavar="MANIFEST", default=None,
+                        help=f"train/val manifest from split_dataset.py (e.g. processed_sequences/{SPLIT_NAME}); "
+                             "default: seeded random 80/20 split")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write a stratified train/val split manifest (no files are copied).")
+    parser.add_argument("--src-dir", default=SRC_DIR,
+                        help="class folders to split: raw images (data/) or sequences (processed_sequences/), "
+                             "or a recording store (recordings/, split by take)")
+    parser.add_argument("--output", default=None, help=f"manifest path (default <src-dir>/{SPLIT_NAME})")
+    parser.add_argument("--val-fraction", type=float, default=VAL_FRACTION)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--group-size", type=int, default=None,
+                        help=f"keep runs of this many consecutive files together (default {FRAMES_PER_TAKE} "
+                             "for image folders, 0 = no grouping for sequence folders)")
+    parser.add_argument("--group-pattern", default=None,
+                        help="regex on the file name; its first group names the recording session")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    group_size = args.group_size
+    if group_size is None and is_recording_store(args.src_dir):
+        group_size = 0  # takes are the items
+    elif group_size is None:
+        # Neighbouring frames of an image folder are near-duplicates; sequences are separate takes
+        first_label = next(d for d in sorted(os.listdir(args.src_dir)) if os.path.isdir(os.path.join(args.src_dir, d)))
+        is_sequences = any(name.endswith(".npy") for name in os.listdir(os.path.join(args.src_dir, first_label)))
+        group_size = 0 if is_sequences else FRAMES_PER_TAKE
+    split = make_split(args.src_dir, args.val_fraction, args.seed, group_size, args.group_pattern)
+    output = args.output or os.path.join(args.src_dir, SPLIT_NAME)
+    save_split(split, output)
+    print(f"✅ Split {len(split['train']) + len(split['val'])} items of {len(split['labels'])} classes: "
+          f"{len(split['train'])} train / {len(split['val'])} val -> {output} "
+          f"({(time.perf_counter() - started) * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
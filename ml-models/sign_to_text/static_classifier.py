@@ -0,0 +1,65 @@
+import numpy as np
+
+from hand_features import frame_features
+
+STATIC_MODEL_PATH = "sign_model.pkl"
+
+
+class StaticSignClassifier:
+    """Single-frame handshape classifier for static signs (digits and letters).
+
+    Wraps a fitted scikit-learn model trained on hand_features.frame_features().
+    For an MLP the forward pass is re-implemented in NumPy from the fitted
+    weights, which skips scikit-learn's per-call input validation and keeps a
+    single-frame prediction in the tens of microseconds. Other models (e.g.
+    gradient boosting) go through predict_proba().
+
+    Saved with joblib as sign_model.pkl (see train_static_model.py).
+    """
+
+    def __init__(self, model, classes, mean=None, scale=None):
+        self.model = model
+        self.classes_ = list(classes)
+        self.mean = mean
+        self.scale = scale
+        self.layers = None
+        if (type(model).__name__ == "MLPClassifier" and model.activation == "relu"
+                and model.out_activation_ == "softmax"):
+            self.layers = [(w.astype(np.float32), b.astype(np.float32))
+                           for w, b in zip(model.coefs_, model.intercepts_)]
+
+    def _features(self, keypoints):
+        features = frame_features(keypoints)
+        if self.mean is not None:
+            features = (features - self.mean) / self.scale
+        return features
+
+    def predict_proba(self, keypoints):
+        """(126,) or (N, 126) raw keypoints -> class probabilities ((C,) or (N, C))."""
+        keypoints = np.asarray(keypoints, dtype=np.float32)
+        single = keypoints.ndim == 1
+        x = self._features(np.atleast_2d(keypoints))
+        if self.layers is None:
+            probs = self.model.predict_proba(x)
+        else:
+            for w, b in self.layers[:-1]:
+                x = np.maximum(x @ w + b, 0.0)
+            w, b = self.layers[-1]
+            logits = x @ w + b
+            logits -= logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+        return probs[0] if single else probs
+
+    def predict(self, keypoints):
+        """Class labels for (126,) or (N, 126) raw keypoints."""
+        probs = self.predict_proba(keypoints)
+        if probs.ndim == 1:
+            return self.classes_[int(np.argmax(probs))]
+        return [self.classes_[i] for i in probs.argmax(axis=1)]
+
+    def predict_one(self, keypoints):
+        """(label, confidence) for one frame."""
+        probs = self.predict_proba(keypoints)
+        best = int(np.argmax(probs))
+        return self.classes_[best], float(probs[best])
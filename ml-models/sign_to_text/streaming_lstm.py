@@ -0,0 +1,256 @@
+import json
+from collections import deque
+
+import numpy as np
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _softmax(x):
+    e = np.exp(x - x.max())
+    return e / e.sum()
+
+
+_ACTIVATIONS = {
+    "relu": lambda x: np.maximum(x, 0.0),
+    "tanh": np.tanh,
+    "sigmoid": _sigmoid,
+    "linear": lambda x: x,
+    "softmax": _softmax,
+}
+
+
+class _LSTMCell:
+    def __init__(self, kernel, recurrent_kernel, bias, activation, recurrent_activation):
+        self.kernel = kernel.astype(np.float32)
+        self.recurrent_kernel = recurrent_kernel.astype(np.float32)
+        self.bias = bias.astype(np.float32)
+        self.units = recurrent_kernel.shape[0]
+        self.activation_names = (activation, recurrent_activation)
+        self.activation = _ACTIVATIONS[activation]
+        self.recurrent_activation = _ACTIVATIONS[recurrent_activation]
+
+    def step(self, x, h, c):
+        # Keras gate order: input, forget, cell candidate, output
+        z = x @ self.kernel + h @ self.recurrent_kernel + self.bias
+        u = self.units
+        i = self.recurrent_activation(z[:u])
+        f = self.recurrent_activation(z[u:2 * u])
+        g = self.activation(z[2 * u:3 * u])
+        o = self.recurrent_activation(z[3 * u:])
+        c = f * c + i * g
+        h = o * self.activation(c)
+        return h, c
+
+
+class StreamingLSTM:
+    """Stateful, frame-at-a-time copy of a trained Keras LSTM stack (LSTM... -> Dense...).
+
+    The windowed model restarts from zero state on every 50-frame window, so
+    it re-runs all 50 recurrent steps per new frame. This keeps each layer's
+    hidden and cell state and advances them by one step per frame instead.
+    Carried-over state slowly drifts from what the windowed model would see,
+    so every `resync_every` frames the state is rebuilt from zero over the
+    last `window` frames, which makes the output match the windowed model
+    exactly on those frames.
+    """
+
+    def __init__(self, cells, dense_layers, window=50, resync_every=25):
+        self.cells = cells
+        self.dense_layers = dense_layers
+        self.window = window
+        self.resync_every = resync_every
+        self.history = deque(maxlen=window)
+        self.states = deque(maxlen=window)  # recurrent state before each frame in history
+        self.reset()
+
+    @classmethod
+    def from_keras(cls, model, window=None, resync_every=25):
+        cells, dense_layers = [], []
+        for layer in model.layers:
+            kind = type(layer).__name__
+            config = layer.get_config()
+            if kind == "LSTM":
+                if dense_layers:
+                    raise ValueError("LSTM layers after Dense layers are not supported")
+                kernel, recurrent_kernel, bias = layer.get_weights()
+                cells.append(_LSTMCell(kernel, recurrent_kernel, bias,
+                                       config["activation"], config["recurrent_activation"]))
+            elif kind == "Dense":
+                kernel, bias = layer.get_weights()
+                dense_layers.append((kernel.astype(np.float32), bias.astype(np.float32),
+                                     config["activation"]))
+            elif kind not in ("InputLayer", "Dropout"):
+                raise ValueError(f"Unsupported layer type for streaming inference: {kind}")
+        if window is None:
+            window = model.input_shape[1]
+        return cls(cells, dense_layers, window=window, resync_every=resync_every)
+
+    def save(self, path):
+        """Write the weights to an .npz file that load() reads back without TensorFlow."""
+        arrays = {}
+        for i, cell in enumerate(self.cells):
+            arrays[f"lstm_{i}_kernel"] = cell.kernel
+            arrays[f"lstm_{i}_recurrent_kernel"] = cell.recurrent_kernel
+            arrays[f"lstm_{i}_bias"] = cell.bias
+        for i, (kernel, bias, _) in enumerate(self.dense_layers):
+            arrays[f"dense_{i}_kernel"] = kernel
+            arrays[f"dense_{i}_bias"] = bias
+        config = {
+            "window": self.window,
+            "lstm": [cell.activation_names for cell in self.cells],
+            "dense": [activation for _, _, activation in self.dense_layers],
+        }
+        with open(path, "wb") as f:
+            np.savez(f, config=np.array(json.dumps(config)), **arrays)
+
+    @classmethod
+    def load(cls, path, resync_every=25):
+        with np.load(path) as data:
+            config = json.loads(str(data["config"]))
+            cells = [_LSTMCell(data[f"lstm_{i}_kernel"], data[f"lstm_{i}_recurrent_kernel"], data[f"lstm_{i}_bias"],
+                               activation, recurrent_activation)
+                     for i, (activation, recurrent_activation) in enumerate(config["lstm"])]
+            dense_layers = [(data[f"dense_{i}_kernel"], data[f"dense_{i}_bias"], activation)
+                            for i, activation in enumerate(config["dense"])]
+        return cls(cells, dense_layers, window=config["window"], resync_every=resync_every)
+
+    def _zero_state(self):
+        return [(np.zeros(cell.units, np.float32), np.zeros(cell.units, np.float32)) for cell in self.cells]
+
+    def reset(self):
+        self.state = self._zero_state()
+        self.history.clear()
+        self.states.clear()
+        self.since_resync = 0
+
+    def _advance(self, frame, state):
+        x = frame
+        for layer, (cell, (h, c)) in enumerate(zip(self.cells, state)):
+            h, c = cell.step(x, h, c)
+            state[layer] = (h, c)
+            x = h
+        return x
+
+    def _head(self, x):
+        for kernel, bias, activation in self.dense_layers:
+            x = _ACTIVATIONS[activation](x @ kernel + bias)
+        return x
+
+    def resync(self):
+        """Rebuild the recurrent state from zero over the buffered window."""
+        self.state = self._zero_state()
+        self.states.clear()
+        x = None
+        for frame in self.history:
+            self.states.append(list(self.state))
+            x = self._advance(frame, self.state)
+        self.since_resync = 0
+        return x
+
+    def rewrite_recent(self, frames):
+        """Replace the newest len(frames) frames already stepped (e.g. held frames that were
+        interpolated afterwards): the state is rewound to before them and only they are re-stepped."""
+        frames = np.asarray(frames, dtype=np.float32)
+        count = min(len(frames), len(self.history))
+        if count == 0:
+            return
+        first = len(self.history) - count
+        self.state = list(self.states[first])
+        for i, frame in enumerate(frames[len(frames) - count:]):
+            self.history[first + i] = frame.copy()
+            self.states[first + i] = list(self.state)
+            self._advance(self.history[first + i], self.state)
+
+    def step(self, frame):
+        """Feed one 126-dim frame; returns class probabilities (None until the window has filled)."""
+        # Copy: callers may pass a ring-buffer row that gets overwritten later
+        frame = np.array(frame, dtype=np.float32)
+        full_before = len(self.history) == self.window
+        self.history.append(frame)
+        self.since_resync += 1
+
+        if full_before and self.since_resync >= self.resync_every:
+            x = self.resync()
+        else:
+            self.states.append(list(self.state))
+            x = self._advance(frame, self.state)
+
+        if len(self.history) < self.window:
+            return None
+        return self._head(x)
+
+    def predict_window(self, window):
+        """Reference: run a full window from zero state, like the windowed Keras model."""
+        state = self._zero_state()
+        x = None
+        for frame in np.asarray(window, dtype=np.float32):
+            x = self._advance(frame, state)
+        return self._head(x)
+
+
+class EarlyExitLSTM:
+    """Classifies a sign from its first frames and stops as soon as it is sure.
+
+    For models trained with `train_model.py --early-exit`, where the same
+    Dense head was trained on the LSTM output after 10/20/30/50 frames. The
+    recurrent state starts at zero when a sign starts (reset()) and advances
+    one step per frame. At each exit the head runs; once the top probability
+    reaches `threshold` the result is committed and later frames cost nothing
+    until the next reset(). If the last exit is not confident either, the
+    prefix restarts, so long stretches of signing keep being classified.
+    """
+
+    def __init__(self, stream, exits=(10, 20, 30, 50), threshold=0.8):
+        self.stream = stream
+        self.exits = sorted(exits)
+        self.threshold = threshold
+        self.exit_counts = {e: 0 for e in self.exits}
+        self.steps = 0
+        self.frames_seen = 0
+        self.reset()
+
+    @classmethod
+    def from_keras(cls, model, exits=(10, 20, 30, 50), threshold=0.8):
+        return cls(StreamingLSTM.from_keras(model), exits=exits, threshold=threshold)
+
+    def reset(self):
+        self.state = self.stream._zero_state()
+        self.length = 0
+        self.committed = None
+        self.latest = None
+
+    @property
+    def deciding(self):
+        """True while the current prefix has neither committed nor come out of its last exit."""
+        return self.committed is None and self.length > 0
+
+    def step(self, frame):
+        """Feed one frame; returns the latest exit's probabilities (None before the first exit)."""
+        self.frames_seen += 1
+        if self.committed is not None:
+            return self.committed
+        x = self.stream._advance(np.asarray(frame, dtype=np.float32), self.state)
+        self.steps += 1
+        self.length += 1
+        if self.length in self.exit_counts:
+            probs = self.stream._head(x)
+            self.latest = probs
+            if probs.max() >= self.threshold:
+                self.committed = probs
+                self.exit_counts[self.length] += 1
+            elif self.length == self.exits[-1]:
+                self.exit_counts[self.length] += 1
+                self.state = self.stream._zero_state()
+                self.length = 0
+        return self.latest
+
+    def stats(self):
+        """Recurrent steps actually computed per frame fed, and how often each exit fired."""
+        return {
+            "frames": self.frames_seen,
+            "steps_per_frame": self.steps / self.frames_seen if self.frames_seen else 0.0,
+            "exits": dict(self.exit_counts),
+        }
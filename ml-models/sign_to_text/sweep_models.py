@@ -0,0 +1,301 @@
+import os
+import json
+import time
+import random
+import shutil
+import argparse
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from dataset_shard import DATA_PATH, SEQUENCE_LENGTH, SHARD_PATH, load_shard, pack_sequences, shard_is_stale
+from split_dataset import add_split_argument, train_val_indices
+
+SWEEP_DIR = "sweeps"
+SEARCH_SPACE = {
+    "encoder": ["lstm", "gru", "conv1d", "transformer"],
+    "width": [32, 64, 128],
+    "sequence_length": [20, 30, 50],
+    "learning_rate": [1e-3, 3e-4],
+}
+# What --deploy may overwrite lstm_sign_model.h5 with: predict_sign.py streams an LSTM over a 50-frame window
+DEPLOYABLE = {"encoder": "lstm", "sequence_length": SEQUENCE_LENGTH}
+
+# Set per worker process by _init_worker
+_threads = 1
+_shared_history = None
+
+
+def sample_trials(space, num_trials=None, seed=0):
+    """The full grid, or a seeded random subset of it."""
+    keys = sorted(space)
+    grid = [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+    if num_trials is not None and num_trials < len(grid):
+        grid = random.Random(seed).sample(grid, num_trials)
+    return [dict(config, trial=i) for i, config in enumerate(grid)]
+
+
+def trial_name(config):
+    return (f"trial{config['trial']:03d}_{config['encoder']}_w{config['width']}"
+            f"_t{config['sequence_length']}_lr{config['learning_rate']:g}")
+
+
+# --- WORKERS ---
+def _init_worker(threads, shared_history):
+    # Thread limits have to be in place before TensorFlow is imported in this process
+    global _threads, _shared_history
+    _threads = threads
+    _shared_history = shared_history
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+    os.environ.setdefault("CUDA_VISIBLE_DEVICES", "-1")
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def build_sweep_model(config, num_classes, num_features=126):
+    """One candidate encoder + the same small Dense head as train_model.build_model."""
+    from tensorflow.keras import layers, models, optimizers
+
+    width = config["width"]
+    inputs = layers.Input(shape=(config["sequence_length"], num_features))
+    if config["encoder"] == "lstm":
+        x = layers.LSTM(width, return_sequences=True)(inputs)
+        x = layers.LSTM(max(width // 2, 16))(x)
+    elif config["encoder"] == "gru":
+        x = layers.GRU(width, return_sequences=True)(inputs)
+        x = layers.GRU(max(width // 2, 16))(x)
+    elif config["encoder"] == "conv1d":
+        x = layers.Conv1D(width, 5, padding="same", activation="relu")(inputs)
+        x = layers.Conv1D(width, 5, padding="same", activation="relu")(x)
+        x = layers.GlobalAveragePooling1D()(x)
+    elif config["encoder"] == "transformer":
+        # Transformer-lite: one pre-norm attention block over projected frames,
+        # with a convolutional position encoding instead of a position table
+        x = layers.Dense(width)(inputs)
+        x = layers.Add()([x, layers.Conv1D(width, 3, padding="same")(x)])
+        normed = layers.LayerNormalization()(x)
+        x = layers.Add()([x, layers.MultiHeadAttention(num_heads=2, key_dim=max(width // 2, 8))(normed, normed)])
+        x = layers.Add()([x, layers.Dense(width, activation="relu")(layers.LayerNormalization()(x))])
+        x = layers.GlobalAveragePooling1D()(x)
+    else:
+        raise ValueError(f"Unknown encoder {config['encoder']!r}")
+    x = layers.Dense(64, activation="relu")(x)
+    x = layers.Dense(32, activation="relu")(x)
+    outputs = layers.Dense(num_classes, activation="softmax")(x)
+
+    model = models.Model(inputs, outputs)
+    model.compile(optimizer=optimizers.Adam(config["learning_rate"]),
+                  loss="sparse_categorical_crossentropy", metrics=["accuracy"])
+    return model
+
+
+def _median_pruner(config, warmup_epochs, min_trials):
+    """Median stopping rule: stop a trial whose val_accuracy is below the median of other trials at that epoch."""
+    from tensorflow.keras.callbacks import Callback
+
+    class MedianPruner(Callback):
+        def __init__(self):
+            super().__init__()
+            self.pruned_at = None
+
+        def on_epoch_end(self, epoch, logs=None):
+            accuracy = (logs or {}).get("val_accuracy")
+            if accuracy is None or _shared_history is None:
+                return
+            _shared_history[(config["trial"], epoch)] = accuracy
+            if epoch < warmup_epochs:
+                return
+            others = [acc for (trial, e), acc in _shared_history.items()
+                      if e == epoch and trial != config["trial"]]
+            if len(others) >= min_trials and accuracy < float(np.median(others)):
+                self.pruned_at = epoch + 1
+                self.model.stop_training = True
+
+    return MedianPruner()
+
+
+def measure_latency(model, sequence_length, runs=100):
+    """Single-window model(x) latency in ms (the live scripts classify one window at a time)."""
+    window = np.random.default_rng(0).random((1, sequence_length, 126), dtype=np.float32)
+    for _ in range(5):
+        model(window, training=False)
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        model(window, training=False)
+        samples.append((time.perf_counter() - started) * 1000)
+    p50, p95 = np.percentile(samples, [50, 95])
+    return float(p50), float(p95)
+
+
+def run_trial(config, shard_path, train_idx, val_idx, epochs, patience, warmup_epochs, min_trials, out_dir):
+    from tensorflow.keras.callbacks import EarlyStopping
+
+    started = time.perf_counter()
+    X, y, index = load_shard(shard_path)
+    # Shorter windows are the most recent frames, like a shorter live window
+    frames = slice(X.shape[1] - config["sequence_length"], X.shape[1])
+    X_train = np.asarray(X[np.sort(train_idx)][:, frames], dtype=np.float32)
+    X_val = np.asarray(X[np.sort(val_idx)][:, frames], dtype=np.float32)
+    y_train, y_val = y[np.sort(train_idx)], y[np.sort(val_idx)]
+
+    model = build_sweep_model(config, len(index["labels"]))
+    pruner = _median_pruner(config, warmup_epochs, min_trials)
+    history = model.fit(
+        X_train, y_train, validation_data=(X_val, y_val), epochs=epochs, verbose=0,
+        callbacks=[EarlyStopping(monitor="val_accuracy", patience=patience, restore_best_weights=True), pruner],
+    )
+    val_loss, val_accuracy = model.evaluate(X_val, y_val, verbose=0)
+    latency_p50, latency_p95 = measure_latency(model, config["sequence_length"])
+
+    path = os.path.join(out_dir, trial_name(config) + ".h5")
+    model.save(path)
+    return dict(
+        config,
+        name=trial_name(config),
+        path=path,
+        val_accuracy=float(val_accuracy),
+        val_loss=float(val_loss),
+        epochs=len(history.history["loss"]),
+        pruned=pruner.pruned_at is not None,
+        latency_ms_p50=latency_p50,
+        latency_ms_p95=latency_p95,
+        params=int(model.count_params()),
+        train_s=time.perf_counter() - started,
+        threads=_threads,
+        pid=os.getpid(),
+    )
+
+
+# --- RANKING ---
+def pareto_front(results):
+    """Trials no other trial beats on both validation accuracy (higher) and latency (lower)."""
+    front = []
+    for r in results:
+        dominated = any(
+            o["val_accuracy"] >= r["val_accuracy"] and o["latency_ms_p50"] <= r["latency_ms_p50"]
+            and (o["val_accuracy"] > r["val_accuracy"] or o["latency_ms_p50"] < r["latency_ms_p50"])
+            for o in results
+        )
+        if not dominated:
+            front.append(r)
+    return sorted(front, key=lambda r: r["latency_ms_p50"])
+
+
+def pick_deployment(front, tolerance):
+    """The fastest Pareto trial within `tolerance` of the best validation accuracy."""
+    best = max(r["val_accuracy"] for r in front)
+    return min((r for r in front if r["val_accuracy"] >= best - tolerance), key=lambda r: r["latency_ms_p50"])
+
+
+def is_deployable(result):
+    return all(result[key] == value for key, value in DEPLOYABLE.items())
+
+
+def print_table(title, results):
+    print(f"\n{title}")
+    for r in results:
+        flag = " (pruned)" if r["pruned"] else ""
+        print(f"  {r['name']:45s} val acc {r['val_accuracy'] * 100:5.1f}%  p50 {r['latency_ms_p50']:6.2f} ms  "
+              f"{r['params']:7d} params  {r['epochs']:3d} epochs{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train encoder/width/window/learning-rate variants in parallel and rank them.")
+    parser.add_argument("--data-path", default=DATA_PATH)
+    parser.add_argument("--shard", default=SHARD_PATH)
+    add_split_argument(parser)
+    parser.add_argument("--out-dir", default=SWEEP_DIR)
+    parser.add_argument("--trials", type=int, default=None, help="random subset of the grid (default: all)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--parallel", type=int, default=None,
+                        help="concurrent trials (default: cores // --threads-per-trial)")
+    parser.add_argument("--threads-per-trial", type=int, default=2)
+    parser.add_argument("--epochs", type=int, default=100)
+    parser.add_argument("--patience", type=int, default=10, help="early stopping on val_accuracy")
+    parser.add_argument("--prune-after", type=int, default=5, help="epochs before the median pruner may stop a trial")
+    parser.add_argument("--prune-min-trials", type=int, default=3)
+    parser.add_argument("--accuracy-tolerance", type=float, default=0.01,
+                        help="deploy the fastest Pareto model within this much of the best accuracy")
+    parser.add_argument("--deploy", metavar="PATH", default=None,
+                        help="copy the best 50-frame LSTM trial here (the only kind predict_sign.py can run)")
+    args = parser.parse_args()
+
+    if shard_is_stale(args.data_path, args.shard):
+        print(f"[INFO] Packing '{args.data_path}' into {args.shard}.bin ...")
+        pack_sequences(args.data_path, args.shard)
+    _, y, index = load_shard(args.shard)
+
+    # Same held-out split as train_model.py
+    train_idx, val_idx = train_val_indices([src["path"] for src in index["sources"]], args.split)
+
+    trials = sample_trials(SEARCH_SPACE, args.trials, args.seed)
+    parallel = args.parallel or max(1, (os.cpu_count() or 1) // args.threads_per_trial)
+    os.makedirs(args.out_dir, exist_ok=True)
+    print(f"[INFO] {len(trials)} trials, {parallel} at a time with {args.threads_per_trial} threads each")
+
+    results = []
+    results_path = os.path.join(args.out_dir, "results.jsonl")
+    started = time.perf_counter()
+    # spawn: TensorFlow must not be inherited through fork, and each worker sets its own thread limits
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager, open(results_path, "w") as out:
+        shared_history = manager.dict()
+        with ProcessPoolExecutor(max_workers=parallel, mp_context=context, initializer=_init_worker,
+                                 initargs=(args.threads_per_trial, shared_history)) as pool:
+            futures = {
+                pool.submit(run_trial, config, args.shard, train_idx, val_idx, args.epochs, args.patience,
+                            args.prune_after, args.prune_min_trials, args.out_dir): config
+                for config in trials
+            }
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as exc:  # one broken configuration should not end the sweep
+                    print(f"❌ {trial_name(futures[future])}: {exc}")
+                    continue
+                results.append(result)
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+                print(f"✅ {result['name']}: val acc {result['val_accuracy'] * 100:.1f}%, "
+                      f"p50 {result['latency_ms_p50']:.2f} ms, {result['epochs']} epochs"
+                      f"{' (pruned)' if result['pruned'] else ''}")
+
+    if not results:
+        print("❌ No trial finished")
+        return
+    print(f"\n[INFO] {len(results)} trials in {time.perf_counter() - started:.0f}s, results in {results_path}")
+    print_table("By validation accuracy:", sorted(results, key=lambda r: -r["val_accuracy"])[:10])
+    print_table("By latency:", sorted(results, key=lambda r: r["latency_ms_p50"])[:10])
+    front = pareto_front(results)
+    print_table("Pareto front (accuracy vs latency):", front)
+
+    selected = pick_deployment(front, args.accuracy_tolerance)
+    summary = {"selected": selected, "pareto_front": [r["name"] for r in front], "labels": index["labels"]}
+    print(f"\n✅ Selected {selected['name']} ({selected['val_accuracy'] * 100:.1f}%, "
+          f"{selected['latency_ms_p50']:.2f} ms)")
+    if args.deploy:
+        # Only trials the live scripts can load are candidates, ranked among themselves
+        deployable = [r for r in results if is_deployable(r)]
+        if deployable:
+            deployed = pick_deployment(pareto_front(deployable), args.accuracy_tolerance)
+            if deployed is not selected:
+                print(f"⚠️ {selected['name']} is not a {SEQUENCE_LENGTH}-frame LSTM; deploying {deployed['name']} "
+                      f"({deployed['val_accuracy'] * 100:.1f}%, {deployed['latency_ms_p50']:.2f} ms) instead")
+            shutil.copyfile(deployed["path"], args.deploy)
+            summary["deployed"] = deployed["name"]
+            print(f"✅ Copied {deployed['name']} to {args.deploy}")
+        else:
+            print(f"❌ No {SEQUENCE_LENGTH}-frame LSTM trial finished; {args.deploy} was not replaced")
+    with open(os.path.join(args.out_dir, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 import os
+import argparse
 import numpy as np
-from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense
@@ -8,61 +8,272 @@ from tensorflow.keras.utils import to_categorical
 import json
 import joblib
 
+from dataset_shard import SHARD_PATH, load_shard, pack_sequences, scan_sequences, shard_is_stale
+from recording_store import is_recording_store
+from split_dataset import add_split_argument, train_val_indices
+
 DATA_PATH = 'processed_sequences'
 SEQUENCE_LENGTH = 50
+EARLY_EXITS = [10, 20, 30, 50]  # frames after which the early-exit model must already classify
+EARLY_EXIT_CONFIG = "early_exit.json"
+
+
+def load_from_folders(data_path):
+    actions = sorted([folder for folder in os.listdir(data_path) if os.path.isdir(os.path.join(data_path, folder))])
+    print("✅ Detected classes:", actions)
+
+    X, y, sources = [], [], []
+    for label in actions:
+        label_path = os.path.join(data_path, label)
+        for file in os.listdir(label_path):
+            if file.endswith('.npy'):
+                path = os.path.join(label_path, file)
+                sequence = np.load(path)
+                if sequence.shape == (SEQUENCE_LENGTH, 126):
+                    X.append(sequence)
+                    y.append(label)
+                    sources.append(f"{label}/{file}")
+                else:
+                    print(f"[SKIPPED] {path} has shape {sequence.shape}, expected ({SEQUENCE_LENGTH}, 126)")
+    return actions, np.array(X), y, sources
+
+
+def load_from_shard(data_path, shard_path):
+    # Repack only when processed_sequences/ changed since the last pack
+    if shard_is_stale(data_path, shard_path):
+        print(f"[INFO] Packing '{data_path}' into {shard_path}.bin ...")
+        pack_sequences(data_path, shard_path, sequence_length=SEQUENCE_LENGTH)
+    X, y_ids, index = load_shard(shard_path)
+    actions = index["labels"]
+    print("✅ Detected classes:", actions)
+    if X.shape[1:] != (SEQUENCE_LENGTH, 126):
+        raise ValueError(f"Shard has sequences of shape {X.shape[1:]}, expected ({SEQUENCE_LENGTH}, 126)")
+    return actions, X, [actions[i] for i in y_ids], [src["path"] for src in index["sources"]]
+
+
+def list_sequence_files(data_path):
+    """Like load_from_folders, but only reads .npy headers (for streaming mode)."""
+    actions = sorted([folder for folder in os.listdir(data_path) if os.path.isdir(os.path.join(data_path, folder))])
+    print("✅ Detected classes:", actions)
+
+    paths, y = [], []
+    for label, path in scan_sequences(data_path):
+        shape = np.load(path, mmap_mode='r').shape
+        if shape == (SEQUENCE_LENGTH, 126):
+            paths.append(path)
+            y.append(label)
+        else:
+            print(f"[SKIPPED] {path} has shape {shape}, expected ({SEQUENCE_LENGTH}, 126)")
+    return actions, paths, y, [os.path.relpath(path, data_path) for path in paths]
+
+
+def build_model(num_classes, loss='categorical_crossentropy', early_exit=False):
+    # Build improved LSTM model
+    # With early_exit the second LSTM returns every step and the Dense head runs
+    # on each of them, so the same weights learn to classify partial windows
+    model = Sequential()
+    model.add(LSTM(128, return_sequences=True, activation='relu', input_shape=(SEQUENCE_LENGTH, 126)))
+    model.add(LSTM(64, return_sequences=early_exit, activation='relu'))
+    model.add(Dense(64, activation='relu'))
+    model.add(Dense(32, activation='relu'))
+    model.add(Dense(num_classes, activation='softmax'))
+
+    if early_exit:
+        # Per-step sample weights pick the exit steps, so the accuracy has to be weighted too
+        model.compile(optimizer='adam', loss=loss, weighted_metrics=['accuracy'])
+    else:
+        model.compile(optimizer='adam', loss=loss, metrics=['accuracy'])
+    model.summary()
+    return model
+
+
+def exit_weights(exits, sequence_length=SEQUENCE_LENGTH):
+    """Per-step loss weights: 1 at each exit (frame counts are 1-based), 0 elsewhere."""
+    weights = np.zeros(sequence_length, dtype=np.float32)
+    weights[np.asarray(exits) - 1] = 1.0
+    return weights
+
+
+def exit_targets(y, exits, sequence_length=SEQUENCE_LENGTH):
+    """Sparse labels repeated over time plus matching per-step sample weights."""
+    y = np.asarray(y)
+    y_steps = np.repeat(y[:, np.newaxis], sequence_length, axis=1)
+    weights = np.broadcast_to(exit_weights(exits, sequence_length), y_steps.shape)
+    return y_steps, np.ascontiguousarray(weights)
+
+
+def to_final_model(early_exit_model, num_classes):
+    """The same weights in the regular last-step model, so every other script can load it unchanged."""
+    model = build_model(num_classes)
+    model.set_weights(early_exit_model.get_weights())
+    return model
+
+
+def evaluate_early_exit(model, batches, exits, threshold=0.8):
+    """Per-exit validation accuracy, and what the confidence-gated runtime would do on the same windows.
+
+    batches yields (X, sparse y) validation batches.
+    """
+    probs, y_val = [], []
+    for X_batch, y_batch in batches:
+        probs.append(np.asarray(model.predict_on_batch(X_batch)))  # (batch, SEQUENCE_LENGTH, classes)
+        y_val.append(np.asarray(y_batch))
+    probs, y_val = np.concatenate(probs), np.concatenate(y_val)
+    report = {"exits": list(exits), "threshold": threshold, "exit_accuracy": {}}
+    for e in exits:
+        report["exit_accuracy"][str(e)] = float((probs[:, e - 1].argmax(axis=1) == y_val).mean())
+
+    frames_used, correct = [], 0
+    for sample, label in zip(probs, y_val):
+        for e in exits:
+            if sample[e - 1].max() >= threshold or e == exits[-1]:
+                frames_used.append(e)
+                correct += int(sample[e - 1].argmax() == label)
+                break
+    report["gated_accuracy"] = correct / len(y_val)
+    report["mean_frames_to_commit"] = float(np.mean(frames_used))
+    print("✅ Early-exit accuracy per exit:",
+          ", ".join(f"{e} frames {acc * 100:.1f}%" for e, acc in report["exit_accuracy"].items()))
+    print(f"✅ Gated at {threshold}: {report['gated_accuracy'] * 100:.1f}% accuracy, "
+          f"{report['mean_frames_to_commit']:.1f} frames to commit on average")
+    return report
+
+
+def save_outputs(model, actions, early_exit_report=None):
+    # Save the model
+    model.save("lstm_sign_model.h5")
+
+    # Save actions (labels) for prediction
+    with open("actions.json", "w") as f:
+        json.dump(actions, f)
+
+    # Tells predict_sign.py the model can classify partial windows
+    if early_exit_report is not None:
+        with open(EARLY_EXIT_CONFIG, "w") as f:
+            json.dump(early_exit_report, f, indent=2)
+    elif os.path.exists(EARLY_EXIT_CONFIG):
+        os.remove(EARLY_EXIT_CONFIG)
+
+
+def train_streaming(args):
+    """Train from tf.data pipelines over the on-disk data; memory is bounded by the batch size."""
+    from data_pipeline import make_file_dataset, make_shard_dataset, with_exit_targets
+
+    if args.no_shard:
+        actions, source, y, sources = list_sequence_files(args.data_path)
+    else:
+        actions, source, y, sources = load_from_shard(args.data_path, args.shard)
+
+    if len(source) == 0:
+        print(f"❌ No .npy sequences found in '{args.data_path}/'. Please check your folder.")
+        exit(1)
+    le = LabelEncoder()
+    y_encoded = le.fit_transform(y)  # sparse integer labels, no one-hot copy
+    joblib.dump(le, "label_encoder.pkl")
+
+    train_idx, test_idx = train_val_indices(sources, args.split)
+    options = dict(batch_size=args.batch_size, shuffle_buffer=args.shuffle_buffer)
+    augment = None
+    if args.augment:
+        from augmentation import SequenceAugmenter
+        # Training batches only; validation stays on the recorded sequences
+        augment = SequenceAugmenter(mirror_prob=0.0 if args.no_mirror else 0.5)
+        print("[INFO] Augmenting training batches on the fly")
+    if args.no_shard:
+        paths = np.asarray(source)
+        train_ds = make_file_dataset(paths[train_idx], y_encoded[train_idx], augment=augment, **options)
+        val_ds = make_file_dataset(paths[test_idx], y_encoded[test_idx], shuffle=False, **options)
+    else:
+        train_ds = make_shard_dataset(source, y_encoded, train_idx, augment=augment, **options)
+        val_ds = make_shard_dataset(source, y_encoded, test_idx, shuffle=False, **options)
+
+    print(f"[INFO] Streaming {len(train_idx)} training / {len(test_idx)} validation sequences "
+          f"in batches of {args.batch_size}")
+    model = build_model(len(actions), loss='sparse_categorical_crossentropy', early_exit=args.early_exit)
+    if not args.early_exit:
+        model.fit(train_ds, epochs=args.epochs, validation_data=val_ds)
+        return model, actions, None
+
+    weights = exit_weights(args.exits)
+    model.fit(with_exit_targets(train_ds, weights), epochs=args.epochs,
+              validation_data=with_exit_targets(val_ds, weights))
+    report = evaluate_early_exit(model, val_ds.as_numpy_iterator(), args.exits)
+    return to_final_model(model, len(actions)), actions, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the LSTM sign classifier.")
+    parser.add_argument("--data-path", default=DATA_PATH)
+    parser.add_argument("--shard", default=SHARD_PATH,
+                        help="memory-mapped dataset shard prefix (packed from --data-path when stale)")
+    parser.add_argument("--no-shard", action="store_true",
+                        help="load the per-sequence .npy files directly instead of the packed shard")
+    add_split_argument(parser)
+    parser.add_argument("--epochs", type=int, default=100)
+    parser.add_argument("--stream", action="store_true",
+                        help="stream batches from disk with tf.data instead of loading the dataset into RAM")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--shuffle-buffer", type=int, default=2048)
+    parser.add_argument("--early-exit", action="store_true",
+                        help="also train the head on partial windows so predict_sign.py can commit early")
+    parser.add_argument("--exits", type=lambda v: sorted(int(e) for e in v.split(",")), default=EARLY_EXITS,
+                        help="comma-separated frame counts for --early-exit (default 10,20,30,50)")
+    parser.add_argument("--augment", action="store_true",
+                        help="mirror/rotate/scale/shift/time-warp training batches on the fly (uses the --stream pipeline)")
+    parser.add_argument("--no-mirror", action="store_true",
+                        help="with --augment, never mirror (for signs whose meaning depends on the hand used)")
+    args = parser.parse_args()
+    if args.early_exit and (args.exits[-1] != SEQUENCE_LENGTH or args.exits[0] < 1):
+        parser.error(f"--exits must lie in 1..{SEQUENCE_LENGTH} and end at {SEQUENCE_LENGTH}")
+    if args.no_shard and is_recording_store(args.data_path):
+        parser.error("a recording store is read through the shard; drop --no-shard")
+
+    if args.stream or args.augment:
+        model, actions, report = train_streaming(args)
+        save_outputs(model, actions, report)
+        return
+
+    if args.no_shard:
+        actions, X, y, sources = load_from_folders(args.data_path)
+    else:
+        actions, X, y, sources = load_from_shard(args.data_path, args.shard)
+
+    if len(X) == 0:
+        print(f"❌ No .npy sequences found in '{args.data_path}/'. Please check your folder.")
+        exit(1)
+    le = LabelEncoder()
+    y_encoded = le.fit_transform(y)
+    y_cat = to_categorical(y_encoded)  # One-hot encode before split
+
+    # Save LabelEncoder for inference
+    joblib.dump(le, "label_encoder.pkl")
+
+    # Split row indices so the memmapped shard is only read once, into the train/test arrays
+    train_idx, test_idx = train_val_indices(sources, args.split)
+    train_idx.sort()
+    test_idx.sort()
+    X_train, X_test = np.asarray(X[train_idx], dtype=np.float32), np.asarray(X[test_idx], dtype=np.float32)
+    y_train, y_test = y_cat[train_idx], y_cat[test_idx]
+
+    # Debug prints
+    print("X_train shape:", X_train.shape)
+    print("y_train shape:", y_train.shape)
+    print("y_train example (one-hot):", y_train[0])
+
+    if args.early_exit:
+        y_train_steps, w_train = exit_targets(y_encoded[train_idx], args.exits)
+        y_test_steps, w_test = exit_targets(y_encoded[test_idx], args.exits)
+        model = build_model(len(actions), loss='sparse_categorical_crossentropy', early_exit=True)
+        model.fit(X_train, y_train_steps, sample_weight=w_train, epochs=args.epochs,
+                  validation_data=(X_test, y_test_steps, w_test))
+        report = evaluate_early_exit(model, [(X_test, y_encoded[test_idx])], args.exits)
+        save_outputs(to_final_model(model, len(actions)), actions, report)
+        return
+
+    model = build_model(len(actions))
+    model.fit(X_train, y_train, epochs=args.epochs, validation_data=(X_test, y_test))
+    save_outputs(model, actions)
+
 
-actions = sorted([folder for folder in os.listdir(DATA_PATH) if os.path.isdir(os.path.join(DATA_PATH, folder))])
-print("✅ Detected classes:", actions)
-
-X, y = [], []
-
-for label in actions:
-    label_path = os.path.join(DATA_PATH, label)
-    for file in os.listdir(label_path):
-        if file.endswith('.npy'):
-            path = os.path.join(label_path, file)
-            sequence = np.load(path)
-            if sequence.shape == (SEQUENCE_LENGTH, 126):
-                X.append(sequence)
-                y.append(label)
-            else:
-                print(f"[SKIPPED] {path} has shape {sequence.shape}, expected ({SEQUENCE_LENGTH}, 126)")
-
-X = np.array(X)
-if len(X) == 0:
-    print("❌ No .npy sequences found in 'processed_sequences/'. Please check your folder.")
-    exit(1)
-le = LabelEncoder()
-y_encoded = le.fit_transform(y)
-y_cat = to_categorical(y_encoded)  # One-hot encode before split
-
-# Save LabelEncoder for inference
-joblib.dump(le, "label_encoder.pkl")
-
-# Train-test split (with one-hot encoded y)
-X_train, X_test, y_train, y_test = train_test_split(X, y_cat, test_size=0.2, random_state=42)
-
-# Debug prints
-print("X_train shape:", X_train.shape)
-print("y_train shape:", y_train.shape)
-print("y_train example (one-hot):", y_train[0])
-
-# Build improved LSTM model
-model = Sequential()
-model.add(LSTM(128, return_sequences=True, activation='relu', input_shape=(SEQUENCE_LENGTH, 126)))
-model.add(LSTM(64, return_sequences=False, activation='relu'))
-model.add(Dense(64, activation='relu'))
-model.add(Dense(32, activation='relu'))
-model.add(Dense(len(actions), activation='softmax'))
-
-model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
-model.summary()
-
-model.fit(X_train, y_train, epochs=100, validation_data=(X_test, y_test))
-
-# Save the model
-model.save("lstm_sign_model.h5")
-
-# Save actions (labels) for prediction
-with open("actions.json", "w") as f:
-    json.dump(actions, f)
+if __name__ == "__main__":
+    main()
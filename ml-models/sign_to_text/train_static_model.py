@@ -0,0 +1,156 @@
+import os
+import json
+import time
+import argparse
+
+import joblib
+import numpy as np
+
+from dataset_shard import DATA_PATH, SHARD_PATH, load_shard, pack_sequences, shard_is_stale
+from hand_features import frame_features
+from split_dataset import add_split_argument, train_val_indices
+from static_classifier import STATIC_MODEL_PATH, StaticSignClassifier
+
+
+def load_frames(X, y, indices):
+    """Every frame with at least one hand from the given sequences, and its label."""
+    sequences = np.asarray(X[np.sort(indices)], dtype=np.float32)
+    frames = sequences.reshape(-1, sequences.shape[-1])
+    labels = np.repeat(y[np.sort(indices)], sequences.shape[1])
+    has_hand = frames.any(axis=1)
+    return frames[has_hand], labels[has_hand]
+
+
+def fit_model(kind, features, labels):
+    if kind == "mlp":
+        from sklearn.neural_network import MLPClassifier
+        # Standardized inputs; the scaler is folded into StaticSignClassifier
+        mean = features.mean(axis=0)
+        scale = np.maximum(features.std(axis=0), 1e-6)
+        model = MLPClassifier(hidden_layer_sizes=(128, 64), early_stopping=True, max_iter=300, random_state=42)
+        model.fit((features - mean) / scale, labels)
+        return model, mean.astype(np.float32), scale.astype(np.float32)
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    model = HistGradientBoostingClassifier(max_iter=300, early_stopping=True, random_state=42)
+    model.fit(features, labels)
+    return model, None, None
+
+
+def latency_ms(fn, inputs, runs):
+    for item in inputs[:10]:
+        fn(item)  # warm-up
+    samples = []
+    for i in range(runs):
+        item = inputs[i % len(inputs)]
+        started = time.perf_counter()
+        fn(item)
+        samples.append((time.perf_counter() - started) * 1000)
+    p50, p99 = np.percentile(samples, [50, 99])
+    return float(p50), float(p99)
+
+
+def evaluate_static(classifier, X, y, val_idx, label_ids, runs):
+    frames, frame_labels = load_frames(X, y, val_idx)
+    probs = classifier.predict_proba(frames)
+    predicted = np.array([label_ids[classifier.classes_[i]] for i in probs.argmax(axis=1)])
+    frame_accuracy = float((predicted == frame_labels).mean())
+
+    # Whole-sequence accuracy from the mean of its per-frame probabilities
+    correct = 0
+    for i in np.sort(val_idx):
+        sequence = np.asarray(X[i], dtype=np.float32)
+        sequence = sequence[sequence.any(axis=1)]
+        if len(sequence):
+            best = classifier.classes_[int(classifier.predict_proba(sequence).mean(axis=0).argmax())]
+            correct += int(label_ids[best] == y[i])
+    p50, p99 = latency_ms(classifier.predict_one, frames, runs)
+    return {
+        "frame_accuracy": frame_accuracy,
+        "sequence_accuracy": correct / len(val_idx),
+        "latency_ms_p50": p50,
+        "latency_ms_p99": p99,
+        "latency_scope": "one frame: features + classifier",
+    }
+
+
+def evaluate_lstm(model_path, actions_path, X, y, val_idx, labels, runs):
+    """The windowed LSTM (and its streaming copy) on the same held-out sequences."""
+    from tensorflow.keras.models import load_model
+    from streaming_lstm import StreamingLSTM
+
+    model = load_model(model_path)
+    with open(actions_path, "r") as f:
+        actions = json.load(f)
+    X_val = np.asarray(X[np.sort(val_idx)], dtype=np.float32)
+    probs = np.asarray(model.predict(X_val, verbose=0))
+    predicted = [actions[i] for i in probs.argmax(axis=1)]
+    accuracy = float(np.mean([p == labels[t] for p, t in zip(predicted, y[np.sort(val_idx)])]))
+
+    windows = [window[np.newaxis] for window in X_val]
+    p50, p99 = latency_ms(lambda w: model(w, training=False), windows, runs)
+    report = {"sequence_accuracy": accuracy, "latency_ms_p50": p50, "latency_ms_p99": p99,
+              "latency_scope": "one 50-frame window: Keras model(x)"}
+    try:
+        stream = StreamingLSTM.from_keras(model)
+        frames = X_val.reshape(-1, X_val.shape[-1])
+        s50, s99 = latency_ms(stream.step, frames, runs)
+        report.update(streaming_latency_ms_p50=s50, streaming_latency_ms_p99=s99)
+    except ValueError:
+        pass
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the single-frame static sign classifier (sign_model.pkl).")
+    parser.add_argument("--data-path", default=DATA_PATH)
+    parser.add_argument("--shard", default=SHARD_PATH)
+    add_split_argument(parser)
+    parser.add_argument("--model", choices=["mlp", "gbm"], default="mlp",
+                        help="small MLP (NumPy fast path) or histogram gradient boosting")
+    parser.add_argument("--output", default=STATIC_MODEL_PATH)
+    parser.add_argument("--runs", type=int, default=2000, help="timed single predictions for the latency numbers")
+    parser.add_argument("--compare-lstm", metavar="MODEL", nargs="?", const="lstm_sign_model.h5", default=None,
+                        help="also evaluate the LSTM (default lstm_sign_model.h5) on the same split")
+    parser.add_argument("--actions", default="actions.json")
+    parser.add_argument("--report", default="static_model_report.json")
+    args = parser.parse_args()
+
+    if shard_is_stale(args.data_path, args.shard):
+        print(f"[INFO] Packing '{args.data_path}' into {args.shard}.bin ...")
+        pack_sequences(args.data_path, args.shard)
+    X, y, index = load_shard(args.shard)
+    labels = index["labels"]
+    label_ids = {label: i for i, label in enumerate(labels)}
+
+    # Split whole sequences, the same way as train_model.py, so frames of one take never straddle the split
+    train_idx, val_idx = train_val_indices([src["path"] for src in index["sources"]], args.split)
+    frames, frame_labels = load_frames(X, y, train_idx)
+    print(f"[INFO] {len(frames)} training frames from {len(train_idx)} sequences, {len(labels)} classes")
+
+    started = time.perf_counter()
+    model, mean, scale = fit_model(args.model, frame_features(frames), np.asarray(labels)[frame_labels])
+    classifier = StaticSignClassifier(model, model.classes_, mean=mean, scale=scale)
+    print(f"[INFO] Trained {args.model} in {time.perf_counter() - started:.1f}s")
+    joblib.dump(classifier, args.output)
+    print(f"✅ Saved {args.output}")
+
+    report = {"static": dict(evaluate_static(classifier, X, y, val_idx, label_ids, args.runs), model=args.model)}
+    if args.compare_lstm and os.path.exists(args.compare_lstm):
+        report["lstm"] = evaluate_lstm(args.compare_lstm, args.actions, X, y, val_idx, labels, args.runs)
+
+    for name, stats in report.items():
+        line = f"  {name:7s}"
+        if "frame_accuracy" in stats:
+            line += f" frame acc {stats['frame_accuracy'] * 100:5.1f}%"
+        line += (f"  sequence acc {stats['sequence_accuracy'] * 100:5.1f}%  "
+                 f"p50 {stats['latency_ms_p50']:.3f} ms  p99 {stats['latency_ms_p99']:.3f} ms ({stats['latency_scope']})")
+        if "streaming_latency_ms_p50" in stats:
+            line += f"; streaming p50 {stats['streaming_latency_ms_p50']:.3f} ms/frame"
+        print(line)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[INFO] Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+import os
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+from mediapipe.python.solutions.hands import Hands
+
+from frame_sources import VideoFileSource
+from keypoints import extract_keypoints, NUM_FEATURES
+
+SEQUENCE_LENGTH = 50
+CONFIDENCE_THRESHOLD = 0.8
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v")
+
+# Per-worker MediaPipe settings (see _init_worker)
+_hands_settings = None
+
+
+def list_videos(video_dir):
+    videos = []
+    for root, _, files in os.walk(video_dir):
+        for filename in files:
+            if filename.lower().endswith(VIDEO_EXTENSIONS):
+                videos.append(os.path.join(root, filename))
+    return sorted(videos)
+
+
+def already_transcribed(output_path):
+    """Videos with a transcript in an existing JSONL output, so interrupted runs can resume.
+
+    Videos recorded as failed are retried.
+    """
+    done = set()
+    if os.path.exists(output_path):
+        with open(output_path, "r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # a line cut off by an interrupted run
+                if "video" in entry and "error" not in entry:
+                    done.add(entry["video"])
+    return done
+
+
+# --- WORKERS (landmarks only; the model stays in the parent process) ---
+def _init_worker(min_detection_confidence, min_tracking_confidence, flip):
+    global _hands_settings
+    _hands_settings = dict(static_image_mode=False, max_num_hands=2,
+                           min_detection_confidence=min_detection_confidence,
+                           min_tracking_confidence=min_tracking_confidence,
+                           flip=flip)
+
+
+def video_keypoints(path):
+    """(frames, 126) float32 keypoints and a per-frame hands-present mask for one video."""
+    settings = dict(_hands_settings)
+    flip = settings.pop("flip")
+    started = time.perf_counter()
+    source = VideoFileSource(path)
+    keypoints, present = [], []
+    # A fresh graph per video so hand tracking never carries over between files
+    with Hands(**settings) as hands:
+        while True:
+            ret, frame = source.read()
+            if not ret:
+                break
+            if flip:
+                frame = cv2.flip(frame, 1)
+            results = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            keypoints.append(extract_keypoints(results))
+            present.append(bool(results.multi_hand_landmarks))
+    fps = source.fps
+    source.release()
+
+    return {
+        "video": path,
+        "fps": fps,
+        "keypoints": np.asarray(keypoints, dtype=np.float32).reshape(-1, NUM_FEATURES),
+        "present": np.asarray(present, dtype=bool),
+        "elapsed": time.perf_counter() - started,
+        "pid": os.getpid(),
+    }
+
+
+# --- WINDOWS AND SEGMENTS ---
+def make_windows(keypoints, sequence_length, stride):
+    """Strided (W, sequence_length, 126) view over a video's keypoints (no copy)."""
+    if len(keypoints) < sequence_length:
+        return keypoints[:0].reshape(0, sequence_length, keypoints.shape[1])
+    view = np.lib.stride_tricks.sliding_window_view(keypoints, sequence_length, axis=0)
+    return view[::stride].transpose(0, 2, 1)
+
+
+def build_segments(probs, present, fps, actions, sequence_length, stride,
+                   threshold=CONFIDENCE_THRESHOLD, min_hand_fraction=0.5):
+    """Merge consecutive confident windows with the same label into timestamped segments."""
+    segments = []
+    if len(probs) == 0:
+        return segments
+    hands_seen = np.concatenate([[0], np.cumsum(present)])
+    best = probs.argmax(axis=1)
+    confidence = probs.max(axis=1)
+
+    current = None
+    for i, (label_id, conf) in enumerate(zip(best, confidence)):
+        start = i * stride
+        end = start + sequence_length
+        hand_fraction = (hands_seen[end] - hands_seen[start]) / sequence_length
+        label = actions[label_id] if conf >= threshold and hand_fraction >= min_hand_fraction else None
+
+        if current is not None and label == current["label"]:
+            current["end_frame"] = end
+            current["confidences"].append(float(conf))
+            continue
+        if current is not None:
+            segments.append(current)
+        current = {"label": label, "start_frame": start, "end_frame": end, "confidences": [float(conf)]} \
+            if label is not None else None
+    if current is not None:
+        segments.append(current)
+
+    for segment in segments:
+        confidences = segment.pop("confidences")
+        segment.update({
+            "start_s": round(segment["start_frame"] / fps, 3),
+            "end_s": round(segment["end_frame"] / fps, 3),
+            "confidence": max(confidences),
+            "mean_confidence": float(np.mean(confidences)),
+            "windows": len(confidences),
+        })
+    return segments
+
+
+class CrossVideoBatcher:
+    """Queues windows from many videos and predicts them in large batches.
+
+    Videos finish landmark extraction at different times; their windows are
+    pooled so every predict_batch() call is close to batch_size even when
+    individual videos are short. A video is returned by run() once all of its
+    windows have been scored, or with an "error" if a batch it was in failed.
+    """
+
+    def __init__(self, classifier, batch_size=256):
+        self.classifier = classifier
+        self.batch_size = batch_size
+        self.pending = []  # (video record, window index)
+        self.videos = {}
+        self.batches = 0
+        self.windows = 0
+        self.predict_s = 0.0
+
+    def add(self, record, windows):
+        record["windows"] = windows
+        record["probs"] = None
+        record["remaining"] = len(windows)
+        self.videos[record["video"]] = record
+        self.pending.extend((record, i) for i in range(len(windows)))
+
+    def run(self, flush=False):
+        finished = [r for r in self.videos.values() if r["remaining"] == 0]
+        while len(self.pending) >= self.batch_size or (flush and self.pending):
+            chunk, self.pending = self.pending[:self.batch_size], self.pending[self.batch_size:]
+            started = time.perf_counter()
+            try:
+                probs = self.classifier.predict_batch(np.stack([record["windows"][i] for record, i in chunk]))
+            except Exception as exc:
+                # Every video with a window in the chunk fails, not only the one that arrived last
+                failed = {record["video"]: record for record, _ in chunk}
+                for record in failed.values():
+                    record["error"] = f"prediction failed: {exc}"
+                self.pending = [(record, i) for record, i in self.pending if record["video"] not in failed]
+                finished.extend(failed.values())
+                continue
+            self.predict_s += time.perf_counter() - started
+            self.batches += 1
+            self.windows += len(chunk)
+            for (record, i), row in zip(chunk, probs):
+                if record["probs"] is None:
+                    record["probs"] = np.empty((len(record["windows"]), len(row)), dtype=np.float32)
+                record["probs"][i] = row
+                record["remaining"] -= 1
+                if record["remaining"] == 0:
+                    finished.append(record)
+        for record in finished:
+            del self.videos[record["video"]]
+        return finished
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe a folder of sign videos to timestamped JSONL segments.")
+    parser.add_argument("video_dir", help="folder of videos (searched recursively)")
+    parser.add_argument("--output", default="transcripts.jsonl")
+    parser.add_argument("--model", default="lstm_sign_model.h5", help=".h5/.keras or .tflite model")
+    parser.add_argument("--actions", default="actions.json")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="landmark extraction processes (1 = run in this process)")
+    parser.add_argument("--batch-size", type=int, default=256, help="windows per predict call, across videos")
+    parser.add_argument("--stride", type=int, default=5, help="frames between window starts")
+    parser.add_argument("--threshold", type=float, default=CONFIDENCE_THRESHOLD)
+    parser.add_argument("--min-hand-fraction", type=float, default=0.5,
+                        help="ignore windows where hands are visible in fewer frames than this")
+    parser.add_argument("--min-detection-confidence", type=float, default=0.3)
+    parser.add_argument("--min-tracking-confidence", type=float, default=0.3)
+    parser.add_argument("--no-flip", action="store_true",
+                        help="do not mirror frames (record_sign.py and predict_sign.py mirror the webcam)")
+    parser.add_argument("--num-threads", type=int, default=None, help="TFLite interpreter threads")
+    parser.add_argument("--resume", action="store_true", help="skip videos already in --output")
+    args = parser.parse_args()
+
+    videos = list_videos(args.video_dir)
+    if args.resume:
+        done = already_transcribed(args.output)
+        videos = [v for v in videos if v not in done]
+    print(f"[INFO] {len(videos)} videos to transcribe with {args.workers} workers.")
+    if not videos:
+        return
+
+    from model_runtime import load_actions, load_classifier
+    classifier = load_classifier(args.model, num_threads=args.num_threads)
+    actions = (getattr(classifier, "metadata", None) or {}).get("labels") or load_actions(args.actions)
+    sequence_length = classifier.input_shape[0]
+    batcher = CrossVideoBatcher(classifier, args.batch_size)
+
+    per_worker = {}
+    total_frames = 0
+    started = time.perf_counter()
+    output = open(args.output, "a" if args.resume else "w")
+
+    def write(record):
+        if "error" in record:
+            output.write(json.dumps({"video": record["video"], "error": record["error"]}) + "\n")
+            output.flush()
+            print(f"❌ {record['video']}: {record['error']}")
+            return
+        segments = build_segments(record["probs"] if record["probs"] is not None else np.empty((0, len(actions))),
+                                  record["present"], record["fps"], actions, sequence_length, args.stride,
+                                  args.threshold, args.min_hand_fraction)
+        frames = len(record["keypoints"])
+        output.write(json.dumps({
+            "video": record["video"],
+            "fps": record["fps"],
+            "frames": frames,
+            "duration_s": round(frames / record["fps"], 3),
+            "hand_frames": int(record["present"].sum()),
+            "text": " ".join(segment["label"] for segment in segments),
+            "segments": segments,
+        }) + "\n")
+        output.flush()
+        print(f"✅ {record['video']}: {len(segments)} segments")
+
+    def collect(record):
+        nonlocal total_frames
+        frames = len(record["keypoints"])
+        total_frames += frames
+        stats = per_worker.setdefault(record["pid"], {"frames": 0, "elapsed": 0.0})
+        stats["frames"] += frames
+        stats["elapsed"] += record["elapsed"]
+        batcher.add(record, make_windows(record["keypoints"], sequence_length, args.stride))
+        for finished in batcher.run():
+            write(finished)
+
+    worker_args = (args.min_detection_confidence, args.min_tracking_confidence, not args.no_flip)
+    try:
+        if args.workers <= 1:
+            _init_worker(*worker_args)
+            for video in videos:
+                try:
+                    collect(video_keypoints(video))
+                except Exception as exc:
+                    print(f"❌ {video}: {exc}")
+        else:
+            with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                                     initargs=worker_args) as pool:
+                futures = {pool.submit(video_keypoints, video): video for video in videos}
+                for future in as_completed(futures):
+                    try:
+                        collect(future.result())
+                    except Exception as exc:  # one unreadable video should not stop the archive
+                        print(f"❌ {futures[future]}: {exc}")
+        for finished in batcher.run(flush=True):
+            write(finished)
+    finally:
+        output.close()
+
+    wall = time.perf_counter() - started
+    print("\n[INFO] Per-worker landmark throughput:")
+    for pid, stats in sorted(per_worker.items()):
+        rate = stats["frames"] / stats["elapsed"] if stats["elapsed"] > 0 else 0.0
+        print(f"  worker {pid}: {stats['frames']} frames in {stats['elapsed']:.1f}s ({rate:.1f} frames/s)")
+    if batcher.batches:
+        print(f"[INFO] Model: {batcher.windows} windows in {batcher.batches} batches "
+              f"({batcher.windows / batcher.batches:.1f} per batch, "
+              f"{batcher.windows / batcher.predict_s if batcher.predict_s else 0:.0f} windows/s)")
+    if wall > 0:
+        print(f"[INFO] Total: {total_frames} frames in {wall:.1f}s ({total_frames / wall:.1f} frames/s overall), "
+              f"results in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
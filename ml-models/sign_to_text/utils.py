@@ -1,11 +1,9 @@
-def extract_hand_keypoints(multi_hand_landmarks):
-    keypoints = [0.0] * 126
-    if multi_hand_landmarks:
-        for hand_idx, hand_landmarks in enumerate(multi_hand_landmarks):
-            for i, lm in enumerate(hand_landmarks.landmark):
-                if hand_idx == 0:
-                    keypoints[i*3:i*3+3] = [lm.x, lm.y, lm.z]
-                elif hand_idx == 1:
-                    offset = 63
-                    keypoints[offset + i*3:offset + i*3+3] = [lm.x, lm.y, lm.z]
-    return keypoints
+from types import SimpleNamespace
+
+from keypoints import extract_keypoints, hand_to_array, KeypointRingBuffer, NUM_FEATURES  # noqa: F401
+
+
+def extract_hand_keypoints(multi_hand_landmarks, multi_handedness=None):
+    """126-dim keypoints as a list; kept for older callers, see keypoints.extract_keypoints."""
+    results = SimpleNamespace(multi_hand_landmarks=multi_hand_landmarks, multi_handedness=multi_handedness)
+    return extract_keypoints(results).tolist()
@@ -0,0 +1,176 @@
+import os
+import time
+import hashlib
+import argparse
+import threading
+
+import numpy as np
+
+from streaming_lstm import StreamingLSTM
+from model_runtime import KerasClassifier, TFLiteClassifier
+
+PROCESS_START = time.perf_counter()  # import this module first so startup is measured from launch
+
+PREPARED_DIR = ".prepared_models"
+PREPARED_VERSION = 1
+
+
+def prepared_path(model_path, kind, cache_dir=PREPARED_DIR):
+    """Cache path for a prepared copy of model_path; the name changes whenever the model file does."""
+    h = hashlib.sha1(f"{PREPARED_VERSION}:{kind}".encode())
+    with open(model_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    name = os.path.splitext(os.path.basename(model_path))[0]
+    return os.path.join(cache_dir, f"{name}.{h.hexdigest()[:16]}.{kind}")
+
+
+def _write_atomic(path, write):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def load_streaming(model_path, resync_every=25, cache_dir=PREPARED_DIR):
+    """StreamingLSTM for a Keras model; after the first run it loads from a NumPy cache without TensorFlow."""
+    path = prepared_path(model_path, "stream.npz", cache_dir)
+    if os.path.exists(path):
+        return StreamingLSTM.load(path, resync_every=resync_every)
+    from tensorflow.keras.models import load_model
+    stream = StreamingLSTM.from_keras(load_model(model_path), resync_every=resync_every)
+    _write_atomic(path, stream.save)
+    print(f"[INFO] Cached streaming weights in {path}")
+    return stream
+
+
+def load_windowed(model_path, cache_dir=PREPARED_DIR, prefer_tflite=True, num_threads=None):
+    """predict_batch() model for whole windows: a cached TFLite conversion when possible, else Keras.
+
+    The TFLite interpreter starts much faster than Keras (and without
+    TensorFlow when tflite_runtime is installed). A model the converter cannot
+    handle is remembered, so later runs go straight to Keras.
+    """
+    if model_path.endswith(".tflite"):
+        return TFLiteClassifier(model_path, num_threads=num_threads)
+    path = prepared_path(model_path, "tflite", cache_dir)
+    failed_marker = path + ".failed"
+    if prefer_tflite and not os.path.exists(path) and not os.path.exists(failed_marker):
+        import tensorflow as tf
+        try:
+            converter = tf.lite.TFLiteConverter.from_keras_model(tf.keras.models.load_model(model_path))
+            model_bytes = converter.convert()
+        except Exception as exc:  # e.g. recurrent layers that need TF select ops
+            print(f"[INFO] TFLite conversion of {model_path} failed ({exc}); using Keras")
+            _write_atomic(failed_marker, lambda p: open(p, "w").close())
+        else:
+            def write(tmp_path):
+                with open(tmp_path, "wb") as f:
+                    f.write(model_bytes)
+            _write_atomic(path, write)
+            print(f"[INFO] Cached TFLite conversion in {path}")
+    if prefer_tflite and os.path.exists(path):
+        return TFLiteClassifier(path, num_threads=num_threads)
+    return KerasClassifier(model_path)
+
+
+class BackgroundLoader:
+    """Loads a model (and runs one warm-up inference) on a daemon thread.
+
+    The caller keeps starting the camera and MediaPipe meanwhile and polls
+    `done`; get() returns the model or re-raises the load error.
+    """
+
+    def __init__(self, load, warmup=None, name="model"):
+        self.load = load
+        self.warmup = warmup
+        self.name = name
+        self.value = None
+        self.error = None
+        self.load_s = self.warmup_s = None
+        self.ready_at = None  # seconds since process start
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"load-{name}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        started = time.perf_counter()
+        try:
+            value = self.load()
+            loaded = time.perf_counter()
+            if self.warmup is not None:
+                self.warmup(value)  # first inference pays for allocation and kernel selection
+            self.load_s = loaded - started
+            self.warmup_s = time.perf_counter() - loaded
+            self.value = value
+        except Exception as exc:
+            self.error = exc
+        finally:
+            self.ready_at = time.perf_counter() - PROCESS_START
+            self._done.set()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def get(self, timeout=None):
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"{self.name} is still loading")
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    def format_report(self):
+        if not self.done:
+            return f"{self.name}: loading"
+        if self.error is not None:
+            return f"{self.name}: failed ({self.error})"
+        return (f"{self.name}: load {self.load_s * 1000:.0f} ms, warm-up {self.warmup_s * 1000:.0f} ms, "
+                f"ready at {self.ready_at * 1000:.0f} ms")
+
+
+class StartupTimer:
+    """Milliseconds from launch to each startup milestone (first frame, first prediction, ...)."""
+
+    def __init__(self):
+        self.marks = {}
+
+    def mark(self, name):
+        """Record the first time name is reached; True only on that first call."""
+        if name in self.marks:
+            return False
+        self.marks[name] = time.perf_counter() - PROCESS_START
+        return True
+
+    def format_report(self):
+        return " ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in self.marks.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Prepare cached inference artifacts for a Keras sign model and time cold vs. cached loads.")
+    parser.add_argument("--model", default="lstm_sign_model.h5")
+    parser.add_argument("--cache-dir", default=PREPARED_DIR)
+    parser.add_argument("--no-tflite", action="store_true", help="only prepare the streaming weights")
+    args = parser.parse_args()
+
+    window = np.zeros((1, 50, 126), dtype=np.float32)
+    for name, load in (("streaming", lambda: load_streaming(args.model, cache_dir=args.cache_dir)),
+                       ("windowed", lambda: load_windowed(args.model, args.cache_dir, not args.no_tflite))):
+        started = time.perf_counter()
+        model = load()
+        loaded = time.perf_counter()
+        if name == "streaming":
+            model.predict_window(window[0])
+        else:
+            model.predict_batch(window)
+        print(f"  {name:9s} {type(model).__name__:16s} load {(loaded - started) * 1000:7.1f} ms, "
+              f"first prediction {(time.perf_counter() - loaded) * 1000:6.1f} ms")
+    print(f"✅ Prepared artifacts in {args.cache_dir}/ (run again to time the cached load)")
+
+
+if __name__ == "__main__":
+    main()